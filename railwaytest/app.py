@@ -1,19 +1,214 @@
-from fastapi import FastAPI, HTTPException
+import time
+
+# Importdauer von app.py (Teil des Kaltstarts), siehe /startup/stats
+IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from typing import List, Optional
 import asyncio
+import json
+import math
+import os
+
+from scrapers import load_backend, load_timings, loaded_backends, preload
+from scrapers.admission import AdmissionRejected, ScrapeDeadlineExceeded, default_admission
+from scrapers.browser_pool import BrowserPool
+from scrapers.rate_limit import CRAWL_BACKOFF_BASE, BlockedError
+from scrapers.result_cache import ResultCache
+from scrapers.batch import iter_batch
+from scrapers.resource_blocking import blocking_stats
+from scrapers.jobs import JOB_DB_PATH, JobQueue, SQLiteJobBackend
+from scrapers.metrics import http_request_seconds, render as render_metrics, startup_seconds
+from scrapers.supabase_writer import default_writer
 
-from scrapers import scraper_öffentlich_spotify  # dein Skript
+# Optionales Warm-up nach dem Start (im Hintergrund, der Dienst nimmt sofort Requests an):
+# Backends vorab importieren und die Chromium-Instanzen des Pools starten
+BACKEND_PRELOAD = [name.strip() for name in os.getenv("BACKEND_PRELOAD", "spotify_public").split(",") if name.strip()]
+BROWSER_WARMUP = os.getenv("BROWSER_WARMUP", "1") == "1"
 
 app = FastAPI()
 
+# Zulassung nach Speicherbudget (503 mit Retry-After statt OOM-Kill) und Watchdog für die Browser
+admission = default_admission()
+
+# Langlebige Browser; starten beim Warm-up oder mit dem ersten Browser-Scrape
+browser_pool = BrowserPool(admission=admission)
+
+# Optional: Ergebnisse gepuffert nach Supabase schreiben (SUPABASE_URL / SUPABASE_KEY)
+supabase_writer = default_writer()
+
+async def load_artist_tracks(artist_id):
+    # Backend (Playwright, requests) wird beim ersten Scrape importiert, falls nicht vorgeladen;
+    # im Thread, damit ein laufender Import (auch der des Warm-ups) die Event-Loop nicht blockiert
+    spotify_public = await asyncio.to_thread(load_backend, "spotify_public")
+    result = await spotify_public.scrape_spotify_artist_tracks(artist_id, pool=browser_pool)
+    if supabase_writer:
+        await supabase_writer.write_spotify_public(artist_id, result)
+    return result
+
+# Ergebnis-Cache pro artist_id vor dem eigentlichen Scrape
+spotify_cache = ResultCache(load_artist_tracks)
+
+async def run_spotify_job(payload):
+    # Hintergrund-Jobs warten bei erschöpftem Speicherbudget, statt zu scheitern
+    while True:
+        try:
+            return await spotify_cache.get(payload["artist_id"])
+        except AdmissionRejected as e:
+            await asyncio.sleep(e.retry_after)
+
+# Hintergrund-Worker für eingereichte Scrapes (optional dauerhaft in SQLite)
+job_queue = JobQueue(
+    {"spotify_artist": run_spotify_job},
+    backend=SQLiteJobBackend(JOB_DB_PATH) if JOB_DB_PATH else None,
+)
+
 class ArtistRequest(BaseModel):
     artist_id: str
 
+class JobRequest(BaseModel):
+    artist_id: str
+    priority: int = 0
+
+class BatchRequest(BaseModel):
+    artist_ids: List[str]
+    concurrency: Optional[int] = None
+
+@app.middleware("http")
+async def record_request_timing(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Routen-Muster statt konkreter Pfade (z. B. /jobs/{job_id}), damit die Label-Anzahl begrenzt bleibt
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        http_request_seconds.observe((request.method, path, str(status)), time.perf_counter() - start)
+
+startup_timings = {"import": round(time.perf_counter() - IMPORT_STARTED, 3)}
+startup_seconds.set(("import",), startup_timings["import"])
+warmup_task = None
+
+async def warm_up():
+    start = time.perf_counter()
+    try:
+        if BACKEND_PRELOAD:
+            await asyncio.to_thread(preload, BACKEND_PRELOAD)
+        if BROWSER_WARMUP:
+            await browser_pool.start()
+    except Exception as e:
+        print(f"[WARN] Warm-up fehlgeschlagen: {e}")
+    startup_timings["warmup"] = round(time.perf_counter() - start, 3)
+    startup_seconds.set(("warmup",), startup_timings["warmup"])
+    print(f"[INFO] Warm-up abgeschlossen ({startup_timings['warmup']}s)")
+
+@app.on_event("startup")
+async def start_browser_pool():
+    global warmup_task
+    start = time.perf_counter()
+    if admission:
+        await admission.start()
+    if supabase_writer:
+        await supabase_writer.start()
+    await job_queue.start()
+    if BACKEND_PRELOAD or BROWSER_WARMUP:
+        warmup_task = asyncio.ensure_future(warm_up())
+    startup_timings["startup"] = round(time.perf_counter() - start, 3)
+    startup_seconds.set(("startup",), startup_timings["startup"])
+
+@app.on_event("shutdown")
+async def stop_browser_pool():
+    if warmup_task is not None:
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+    await job_queue.stop()
+    await browser_pool.stop()
+    if supabase_writer:
+        await supabase_writer.stop()
+    if admission:
+        await admission.stop()
+
 @app.post("/scrape/spotify")
 async def scrape_spotify(data: ArtistRequest):
     artist_id = data.artist_id
     try:
-        scraped_data = await scraper_öffentlich_spotify.scrape_spotify_artist_tracks(artist_id)
+        scraped_data = await spotify_cache.get(artist_id)
         return {"success": True, "data": scraped_data}
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except BlockedError as e:
+        # Spotify drosselt: an den Client weitergeben, statt als Scraper-Fehler zu melden
+        retry_after = math.ceil(e.retry_after if e.retry_after is not None else CRAWL_BACKOFF_BASE)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(retry_after)})
+    except ScrapeDeadlineExceeded as e:
+        # Vom Watchdog abgebrochen (hängender Scrape), kein Fehler im Scraper
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/scrape/spotify/batch")
+async def scrape_spotify_batch(data: BatchRequest):
+    # Standard: so viele parallele Scrapes, wie der Browser-Pool Kontexte erlaubt
+    concurrency = data.concurrency or browser_pool.max_concurrency
+
+    async def ndjson_lines():
+        async for result in iter_batch(data.artist_ids, spotify_cache.get, concurrency):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+@app.post("/jobs/spotify", status_code=202)
+async def submit_spotify_job(data: JobRequest):
+    job = job_queue.submit(
+        "spotify_artist", {"artist_id": data.artist_id}, data.priority, dedup_key=f"spotify_artist:{data.artist_id}",
+    )
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job nicht gefunden")
+    return job.to_dict()
+
+@app.get("/jobs")
+async def job_stats():
+    return job_queue.stats()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return spotify_cache.stats()
+
+@app.get("/supabase/stats")
+async def supabase_stats():
+    if supabase_writer is None:
+        return {"enabled": False}
+    return {"enabled": True, **supabase_writer.stats()}
+
+@app.get("/startup/stats")
+async def startup_stats():
+    return {
+        "seconds": startup_timings,
+        "backends_loaded": loaded_backends(),
+        "backend_import_seconds": load_timings,
+        "browser_pool_started": browser_pool.started,
+    }
+
+@app.get("/admission/stats")
+async def admission_stats():
+    if admission is None:
+        return {"enabled": False}
+    return {"enabled": True, **admission.stats()}
+
+@app.get("/blocking/stats")
+async def resource_blocking_stats():
+    return blocking_stats()
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,116 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+# Lokaler Ersatz für Browserless: startet ein Chromium mit Remote-Debugging und stellt dessen
+# DevTools-WebSocket als BROWSERLESS_WS_URL bereit. So verbindet sich der Session-Pool (remote_pool) wie in
+# Produktion mit einem entfernten Browser, nur ohne Netz und ohne Browserless-Kontingent.
+#
+#   python -m benchmarks.fake_browserless   -> gibt "export BROWSERLESS_WS_URL=..." aus
+
+CHROME_CANDIDATES = ("chromium", "chromium-browser", "google-chrome", "google-chrome-stable", "chrome")
+
+
+def find_chrome():
+    """CHROME_PATH, sonst das Chromium von Playwright, sonst ein Chrome aus dem PATH."""
+    path = os.getenv("CHROME_PATH")
+    if path:
+        return path
+    try:
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            if os.path.exists(p.chromium.executable_path):
+                return p.chromium.executable_path
+    except Exception:
+        pass
+    for name in CHROME_CANDIDATES:
+        found = shutil.which(name)
+        if found:
+            return found
+    raise RuntimeError("Kein Chromium gefunden (CHROME_PATH setzen)")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class FakeBrowserless:
+    def __init__(self, chrome=None, port=None, startup_timeout=15):
+        self.chrome = chrome or find_chrome()
+        self.port = port or _free_port()
+        self.startup_timeout = startup_timeout
+        self.ws_url = None
+        self._process = None
+        self._profile = None
+
+    def start(self):
+        self._profile = tempfile.mkdtemp(prefix="fake-browserless-")
+        self._process = subprocess.Popen(
+            [
+                self.chrome,
+                "--headless=new",
+                "--no-sandbox",
+                "--disable-gpu",
+                "--no-first-run",
+                "--no-default-browser-check",
+                f"--remote-debugging-port={self.port}",
+                f"--user-data-dir={self._profile}",
+                "about:blank",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/json/version", timeout=1) as response:
+                    self.ws_url = json.load(response)["webSocketDebuggerUrl"]
+                return self
+            except Exception:
+                if self._process.poll() is not None:
+                    raise RuntimeError(f"Chromium beendet mit Code {self._process.returncode}")
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError("Chromium-DevTools nicht erreichbar")
+
+    @property
+    def pid(self):
+        return self._process.pid if self._process else None
+
+    def env(self):
+        return {"BROWSERLESS_WS_URL": self.ws_url}
+
+    def stop(self):
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._process = None
+        if self._profile:
+            shutil.rmtree(self._profile, ignore_errors=True)
+            self._profile = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    browser = FakeBrowserless().start()
+    print(f"export BROWSERLESS_WS_URL={browser.ws_url}")
+    try:
+        browser._process.wait()
+    except KeyboardInterrupt:
+        browser.stop()
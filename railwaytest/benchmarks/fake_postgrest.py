@@ -0,0 +1,141 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Lokaler Ersatz für die PostgREST-Schnittstelle von Supabase (/rest/v1/<tabelle>): nimmt Upserts mit
+# on_conflict entgegen und hält die Zeilen im Speicher. Mit latency und fail_rate lassen sich eine
+# langsame bzw. unzuverlässige Datenbank nachstellen (Retries, Backpressure des SupabaseWriter).
+#
+#   python -m benchmarks.fake_postgrest --port 8766 --latency 0.2 --fail-rate 0.1
+#   SUPABASE_URL=http://127.0.0.1:8766 SUPABASE_KEY=test ...
+
+
+class FakePostgrest:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, fail_rate=0.0, seed=0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.tables = {}  # tabelle -> {konfliktschlüssel: zeile}
+        self.requests = 0
+        self.failures = 0
+        self.rows_received = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        return {"SUPABASE_URL": self.base_url, "SUPABASE_KEY": "fake-postgrest"}
+
+    def rows(self, table):
+        with self._lock:
+            return list(self.tables.get(table, {}).values())
+
+    def _upsert(self, table, rows, conflict, merge):
+        with self._lock:
+            stored = self.tables.setdefault(table, {})
+            for row in rows:
+                key = tuple(row.get(column) for column in conflict) if conflict else len(stored)
+                if key in stored and not merge:
+                    continue
+                stored[key] = row
+            self.rows_received += len(rows)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send_json(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _table(self):
+                parts = urlsplit(self.path)
+                prefix = "/rest/v1/"
+                if not parts.path.startswith(prefix):
+                    return None, {}
+                return parts.path[len(prefix):], parse_qs(parts.query)
+
+            def do_POST(self):
+                table, query = self._table()
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with server._lock:
+                    server.requests += 1
+                    fail = server._random.random() < server.fail_rate
+                    if fail:
+                        server.failures += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if table is None:
+                    self._send_json(404, {"message": "not found"})
+                    return
+                if fail:
+                    self._send_json(503, {"message": "simulated outage"})
+                    return
+                rows = json.loads(body or b"[]")
+                rows = rows if isinstance(rows, list) else [rows]
+                conflict = [c for c in (query.get("on_conflict") or [""])[0].split(",") if c]
+                prefer = self.headers.get("Prefer", "")
+                server._upsert(table, rows, conflict, merge="resolution=ignore-duplicates" not in prefer)
+                if "return=representation" in prefer:
+                    self._send_json(201, rows)
+                else:
+                    self.send_response(201)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+
+            def do_GET(self):
+                table, _ = self._table()
+                if table is None:
+                    self._send_json(404, {"message": "not found"})
+                    return
+                self._send_json(200, server.rows(table))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="PostgREST-Ersatz für den Supabase-Writer")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="Künstliche Verzögerung pro Request (s)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Anteil der Requests mit 503")
+    args = parser.parse_args()
+    server = FakePostgrest(port=args.port, latency=args.latency, fail_rate=args.fail_rate)
+    for key, value in server.env().items():
+        print(f"export {key}={value}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,122 @@
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fixtures import FIXTURE_DIR
+
+# Lokaler Ersatz für open.spotify.com, artists.spotify.com und insights-ui.soundcloud.com.
+# Liefert die Fixtures unter denselben Pfaden wie die Live-Seiten; die API-Pfade passen zu den
+# Mustern der Netzwerk-Aufzeichnung. Mit api=False antworten die APIs mit 404 (DOM-Fallback).
+#
+#   python -m benchmarks.fixture_server --port 8765
+#   SPOTIFY_PUBLIC_BASE_URL=http://127.0.0.1:8765 ... (siehe base_url_env)
+
+ROUTES = [
+    (r"^/artist/[^/]+$", "spotify_artist.html", False),
+    (r"^/pathfinder/v\d/query$", "spotify_artist_overview.json", True),
+    (r"^/c/artist/[^/]+/audience/stats$", "spotify_stats.html", False),
+    (r"^/s4x-insights-api/", "spotify_stats_timeline.json", True),
+    (r"^/$", "soundcloud_chart.html", False),
+    (r"^/insights-api/", "soundcloud_insights.json", True),
+]
+
+
+class FixtureServer:
+    def __init__(self, host="127.0.0.1", port=0, api=True, latency=0.0, directory=FIXTURE_DIR):
+        self.api = api
+        self.latency = latency
+        self.directory = directory
+        self.requests = 0
+        self.bytes_sent = 0
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def base_url_env(self):
+        """Umgebungsvariablen, mit denen die Scraper diesen Server statt der Live-Seiten nutzen."""
+        return {
+            "SPOTIFY_PUBLIC_BASE_URL": self.base_url,
+            "SPOTIFY_ARTISTS_BASE_URL": self.base_url,
+            "SOUNDCLOUD_INSIGHTS_BASE_URL": self.base_url,
+        }
+
+    def _load(self, filename):
+        if filename not in self._cache:
+            with open(os.path.join(self.directory, filename), "rb") as f:
+                self._cache[filename] = f.read()
+        return self._cache[filename]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                path = self.path.split("?", 1)[0]
+                for pattern, filename, is_api in ROUTES:
+                    if re.search(pattern, path):
+                        break
+                else:
+                    filename, is_api = None, False
+                if server.latency:
+                    time.sleep(server.latency)
+                if filename is None or (is_api and not server.api):
+                    self.send_error(404)
+                    return
+                body = server._load(filename)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json" if is_api else "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+                with server._lock:
+                    server.requests += 1
+                    server.bytes_sent += len(body)
+
+            do_GET = do_POST = do_HEAD = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fixture-Server für die Benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--no-api", action="store_true", help="API-Antworten abschalten (DOM-Fallback)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Künstliche Verzögerung pro Antwort (s)")
+    args = parser.parse_args()
+    server = FixtureServer(port=args.port, api=not args.no_api, latency=args.latency)
+    for key, value in server.base_url_env().items():
+        print(f"export {key}={value}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,217 @@
+import base64
+import datetime
+import json
+import os
+import random
+
+# Fixtures für die Offline-Benchmarks: Artist-Seite (open.spotify.com), Statistik-Seite (Spotify for
+# Artists) und Insights-Diagramm (SoundCloud) samt der JSON-Antworten, die die Seiten nachladen.
+# Aufbau und Selektoren entsprechen den Live-Seiten; Werte sind deterministisch erzeugt, Füll-Markup
+# bringt die Seiten auf eine realistische Größe (HTML-Transfer und Parser-Laufzeit).
+#
+#   python -m benchmarks.fixtures [--filler-kb 400]
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FILLER_KB = 400
+
+ARTIST_ID = "3OOeP2opYuTEm0QIU4gQ6M"
+TRACK_COUNT = 10
+HIDDEN_TRACK_COUNT = 5  # erscheinen erst nach "Mehr anzeigen"
+STATS_DAYS = 28
+STATS_TO_DATE = datetime.date(2025, 3, 9)
+CHART_DAYS = 30
+CHART_TO_DATE = datetime.date(2025, 3, 10)
+
+
+def _filler(kb):
+    """Navigations-/Empfehlungs-Markup ohne Bezug zu den Selektoren, etwa kb Kilobyte."""
+    item = (
+        '<li class="Rr7kQ3Jb2M9bbSxIXuFf"><a class="Gi2RmuwgO9gOUwr6rhJU" href="/playlist/{i}">'
+        '<div class="e-91000-text encore-text-body-small">Empfehlung {i}</div></a></li>'
+    )
+    parts, size, i = [], 0, 0
+    while size < kb * 1024:
+        part = item.format(i=i)
+        parts.append(part)
+        size += len(part)
+        i += 1
+    return '<nav aria-label="Bibliothek"><ul>' + "".join(parts) + "</ul></nav>"
+
+
+def _script(api_path, method="GET"):
+    # Die Seite lädt ihre Daten wie das Original per fetch nach (für die Netzwerk-Aufzeichnung)
+    return f"<script>fetch({json.dumps(api_path)}, {{method: {json.dumps(method)}}}).catch(() => null);</script>"
+
+
+def spotify_artist(rng, filler_kb):
+    listeners = rng.randint(200_000, 2_000_000)
+    tracks = [
+        {"name": f"Track {i + 1}", "playcount": rng.randint(100_000, 90_000_000)}
+        for i in range(TRACK_COUNT + HIDDEN_TRACK_COUNT)
+    ]
+
+    def row(track, hidden=False):
+        return (
+            f'<div data-testid="tracklist-row" class="h4HgbO_Uu1JYg5UGANeQ"{" hidden" if hidden else ""}>'
+            '<div class="e-91000-text encore-text-body-medium encore-internal-color-text-base '
+            f'eYJgrgW01l7dHKuMJidG standalone-ellipsis-one-line">{track["name"]}</div>'
+            f'<div class="e-91000-text encore-text-body-small htbmhRXsxePzCR3HsX0V">{track["playcount"]:,}</div>'
+            "</div>"
+        )
+
+    overview = {
+        "data": {
+            "artistUnion": {
+                "__typename": "Artist",
+                "id": ARTIST_ID,
+                "profile": {"name": "Fixture Artist"},
+                "stats": {"monthlyListeners": listeners, "followers": rng.randint(10_000, 500_000)},
+                "discography": {
+                    "topTracks": {
+                        "items": [
+                            {"uid": f"uid{i}", "track": {"name": t["name"], "playcount": str(t["playcount"])}}
+                            for i, t in enumerate(tracks[:TRACK_COUNT])
+                        ]
+                    }
+                },
+            }
+        },
+        "extensions": {},
+    }
+    # Eingebetteter Seitenzustand (Base64-JSON) wie auf der Live-Seite; liest die HTTP-Stufe
+    state = {"entities": {"items": {f"spotify:artist:{ARTIST_ID}": overview["data"]["artistUnion"]}}}
+    state_script = (
+        '<script id="initialState" type="text/plain">'
+        + base64.b64encode(json.dumps(state).encode()).decode()
+        + "</script>"
+    )
+
+    visible = "".join(row(t) for t in tracks[:TRACK_COUNT])
+    hidden = "".join(row(t, hidden=True) for t in tracks[TRACK_COUNT:])
+    html = f"""<!DOCTYPE html>
+<html lang="de"><head><meta charset="utf-8"><title>Fixture Artist | Spotify</title>{state_script}</head>
+<body>
+{_filler(filler_kb // 2)}
+<main>
+<h1>Fixture Artist</h1>
+<span class="VmDxGgs77HhmKczsLLBQ">{listeners:,} monthly listeners</span>
+<section aria-label="Popular"><div id="tracks">{visible}</div><div id="more" hidden>{hidden}</div>
+<div class="e-91000-text encore-text-body-small-bold" data-encore-id="text" id="show-more">Mehr anzeigen</div>
+</section>
+<div id="onetrust-banner-sdk"><button data-testid="cookie-policy-accept">Akzeptieren</button></div>
+</main>
+{_filler(filler_kb - filler_kb // 2)}
+<script>
+document.querySelector('button[data-testid="cookie-policy-accept"]').addEventListener('click', e => e.target.remove());
+document.getElementById('show-more').addEventListener('click', e => {{
+  const tracks = document.getElementById('tracks');
+  for (const row of Array.from(document.querySelectorAll('#more > div'))) {{ row.hidden = false; tracks.appendChild(row); }}
+  e.target.remove();
+}});
+</script>
+{_script("/pathfinder/v1/query?operationName=queryArtistOverview", "POST")}
+</body></html>
+"""
+    return html, overview
+
+
+def spotify_stats(rng, filler_kb):
+    days = [STATS_TO_DATE - datetime.timedelta(days=STATS_DAYS - 1 - i) for i in range(STATS_DAYS)]
+    values = [rng.randint(800, 6_000) for _ in days]
+    rects = "".join(
+        f'<rect x="{i * 20}" y="{200 - v // 40}" width="16" height="{v // 40}" '
+        f'aria-label="{d:%b} {d.day}, {d.year}, {v:,} Streams"></rect>'
+        for i, (d, v) in enumerate(zip(days, values))
+    )
+    html = f"""<!DOCTYPE html>
+<html lang="de"><head><meta charset="utf-8"><title>Audience – Spotify for Artists</title></head>
+<body>
+{_filler(filler_kb // 2)}
+<main>
+<button data-testid="hero-stats-button-streams"><span>Streams</span><p data-encore-id="text">{sum(values):,}</p></button>
+<svg class="recharts-surface" width="600" height="220"><g class="recharts-bar">{rects}</g></svg>
+</main>
+{_filler(filler_kb - filler_kb // 2)}
+{_script(f"/s4x-insights-api/v1/artist/{ARTIST_ID}/streams?aggregation=recording")}
+</body></html>
+"""
+    timeline = {
+        "timelinePoint": [
+            {"date": d.isoformat(), "num": v} for d, v in zip(days, values)
+        ],
+        "total": sum(values),
+    }
+    return html, timeline
+
+
+def soundcloud_chart(rng, filler_kb):
+    days = [CHART_TO_DATE - datetime.timedelta(days=CHART_DAYS - 1 - i) for i in range(CHART_DAYS)]
+    chart_bottom, px_per_play = 290.0, 0.5  # Achse bei y=290, 2 Plays pro Pixel
+    plays = [rng.randint(20, 500) for _ in days]
+    ticks = "".join(
+        f'<g class="MuiChartsAxis-tickContainer mui-1ha5ytj" transform="translate(0, {chart_bottom - value * px_per_play})">'
+        f'<line class="MuiChartsAxis-tick"></line><text class="MuiChartsAxis-valueLabel">{value}</text></g>'
+        for value in range(0, 600, 100)
+    )
+    bars = "".join(
+        f'<rect class="MuiBarElement-root mui-3h2nkf" aria-label="{d:%b %d}: {p}" '
+        f'style="transform: translate3d({i * 18}px, {chart_bottom - p * px_per_play:.1f}px, 0px); height: {p * px_per_play:.1f}px;"></rect>'
+        for i, (d, p) in enumerate(zip(days, plays))
+    )
+    labels = "".join(
+        f'<g class="MuiChartsAxis-tickContainer"><text class="MuiChartsAxis-tickLabel">{d:%b %d}</text></g>'
+        for d in days
+    )
+    html = f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Insights | SoundCloud</title></head>
+<body>
+{_filler(filler_kb // 2)}
+<main style="min-height: 1200px">
+<svg class="MuiChartsSurface-root mui-1ht4czs" width="620" height="320">
+<g class="MuiChartsAxis-root MuiChartsAxis-directionY mui-1s4lk9h" transform="translate(40, 0)">{ticks}</g>
+<g clip-path="url(#clip)">{bars}</g>
+<g class="MuiChartsAxis-root MuiChartsAxis-directionX mui-ks7u1c" transform="translate(0, {chart_bottom})">{labels}</g>
+</svg>
+</main>
+{_filler(filler_kb - filler_kb // 2)}
+{_script("/insights-api/v1/timeseries?metric=plays&resolution=DAY")}
+</body></html>
+"""
+    series = {"data": {"timeseries": [{"timestamp": f"{d.isoformat()}T00:00:00Z", "value": p} for d, p in zip(days, plays)]}}
+    return html, series
+
+
+GENERATORS = {
+    "spotify_artist": (spotify_artist, "spotify_artist_overview"),
+    "spotify_stats": (spotify_stats, "spotify_stats_timeline"),
+    "soundcloud_chart": (soundcloud_chart, "soundcloud_insights"),
+}
+
+
+def write_fixtures(directory=FIXTURE_DIR, filler_kb=FILLER_KB, seed=42):
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for name, (generate, json_name) in GENERATORS.items():
+        html, data = generate(random.Random(f"{seed}:{name}"), filler_kb)
+        for filename, content in ((f"{name}.html", html), (f"{json_name}.json", json.dumps(data, indent=1))):
+            path = os.path.join(directory, filename)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            written.append(path)
+    return written
+
+
+def load_fixture(filename, directory=FIXTURE_DIR):
+    with open(os.path.join(directory, filename), encoding="utf-8") as f:
+        return f.read()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark-Fixtures erzeugen")
+    parser.add_argument("--filler-kb", type=int, default=FILLER_KB)
+    parser.add_argument("--directory", default=FIXTURE_DIR)
+    args = parser.parse_args()
+    for path in write_fixtures(args.directory, args.filler_kb):
+        print(f"{path} ({os.path.getsize(path) // 1024} KB)")
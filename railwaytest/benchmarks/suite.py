@@ -0,0 +1,497 @@
+import argparse
+import asyncio
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+from benchmarks.fixtures import ARTIST_ID, load_fixture
+from scrapers.admission import process_tree, rss_mb
+
+# Benchmarks ohne Live-Seiten: Parse-Durchsatz auf den Fixtures und End-to-End-Latenz/Speicher
+# gegen Fixture-Server + lokales Chromium (Playwright bzw. nodriver über den Browserless-Ersatz).
+# Ergebnisse als JSON; "compare" meldet Regressionen gegenüber einem früheren Lauf.
+#
+#   python -m benchmarks.suite run [--only parse|e2e|startup] [--output datei.json]
+#   python -m benchmarks.suite compare alt.json neu.json [--threshold 0.1]
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+MIN_TIME = 1.0  # Sekunden pro Parse-Benchmark
+E2E_RUNS = 10
+# Kennzahlen, bei denen ein höherer Wert schlechter ist (für compare)
+COMPARED_KEYS = ("mean_ms", "p95_ms", "peak_rss_mb", "peak_python_mb")
+
+
+# ---------------------------------------------------------------------------
+# Messen
+# ---------------------------------------------------------------------------
+
+def summarize(times, **extra):
+    times = sorted(times)
+    return {
+        "runs": len(times),
+        "mean_ms": round(statistics.fmean(times) * 1000, 3),
+        "p50_ms": round(times[len(times) // 2] * 1000, 3),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 3),
+        "min_ms": round(times[0] * 1000, 3),
+        "ops_per_sec": round(len(times) / sum(times), 2) if sum(times) else None,
+        **extra,
+    }
+
+
+def measure(fn, min_time=MIN_TIME, min_runs=5):
+    fn()  # Aufwärmen (Imports, Caches)
+    times = []
+    start = time.perf_counter()
+    while len(times) < min_runs or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+class RssSampler:
+    """Höchster RSS-Wert des Prozessbaums (Python + Playwright-Treiber + Browser) während der Messung."""
+
+    def __init__(self, roots=(), interval=0.05):
+        self.roots = [os.getpid(), *roots]
+        self.interval = interval
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        pids = {pid for root in self.roots for pid in process_tree(root)}
+        return sum(rss_mb(pid) for pid in pids)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_mb = max(self.peak_mb or 0.0, self._sample())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if os.path.isdir("/proc"):
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+
+def _phase_snapshot():
+    from scrapers.metrics import phase_seconds
+
+    return {labels: (entry[1], entry[2]) for labels, entry in phase_seconds.values.items()}
+
+
+def _phase_breakdown(before, after, scrapes):
+    """Mittlere Dauer pro Phase und Scrape aus der Differenz zweier Metrik-Schnappschüsse."""
+    breakdown = {}
+    for labels, (total, count) in after.items():
+        old_total, old_count = before.get(labels, (0.0, 0))
+        if count > old_count:
+            phase = labels[0] if labels[2] == "ok" else f"{labels[0]}:{labels[2]}"
+            breakdown[phase] = breakdown.get(phase, 0.0) + (total - old_total) * 1000 / scrapes
+    return {phase: round(ms, 2) for phase, ms in sorted(breakdown.items())}
+
+
+async def measure_e2e(scrape_once, runs=E2E_RUNS, pids=()):
+    """Latenz pro Scrape, Phasenaufteilung und Speicher (Python-Heap + RSS des Prozessbaums)."""
+    await scrape_once()  # Aufwärmen
+    gc.collect()
+    before = _phase_snapshot()
+    tracemalloc.start()
+    times = []
+    with RssSampler(pids) as sampler:
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            await scrape_once()
+            times.append(time.perf_counter() - t0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return summarize(
+        times,
+        peak_python_mb=round(peak / 1024 / 1024, 2),
+        peak_rss_mb=round(sampler.peak_mb, 1) if sampler.peak_mb is not None else None,
+        phases_ms=_phase_breakdown(before, _phase_snapshot(), runs),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Parse-Benchmarks
+# ---------------------------------------------------------------------------
+
+def _legacy_soup(html):
+    # Bisheriger Weg: komplettes outerHTML mit BeautifulSoup/html.parser
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, "html.parser")
+
+
+def parse_benchmarks(min_time=MIN_TIME):
+    from scrapers import extraction
+    from scrapers.network_capture import parse_artist_overview, series_parser, soundcloud_day_label, spotify_day_label
+    from scrapers.tiered_fetch import artist_data_from_state
+
+    results = {}
+    chart_html = load_fixture("soundcloud_chart.html")
+    stats_html = load_fixture("spotify_stats.html")
+    artist_html = load_fixture("spotify_artist.html")
+    chart_url = "http://fixture/?timewindow=DAYS_30&from=0&to=0&resolution=DAY"
+
+    # SoundCloud-Diagramm: get_conversion_factor und der Parse-Teil von extract_streams
+    try:
+        from scrapers.soundcloud_7Dstreams import (
+            extract_bar_height_from_transform,
+            get_chart_bottom,
+            get_conversion_factor,
+        )
+    except ImportError as e:
+        results["parse.get_conversion_factor"] = {"skipped": str(e)}
+        results["parse.extract_streams.bs4_full"] = {"skipped": str(e)}
+    else:
+        soup = _legacy_soup(chart_html)
+        results["parse.get_conversion_factor"] = summarize(measure(lambda: get_conversion_factor(soup), min_time))
+
+        def legacy_extract_streams():
+            soup = _legacy_soup(chart_html)
+            factor, bottom = get_conversion_factor(soup), get_chart_bottom(soup)
+            svg = soup.find("svg", class_=lambda c: c and "mui-1ht4czs" in c)
+            return sum(
+                int(round(extract_bar_height_from_transform(bar, bottom) * factor))
+                for bar in svg.select(extraction.CHART_BAR_SELECTOR)
+            )
+
+        results["parse.extract_streams.bs4_full"] = summarize(
+            measure(legacy_extract_streams, min_time), input_bytes=len(chart_html.encode()),
+        )
+
+    chart_payload = json.dumps(extraction.chart_data_from_html(chart_html))
+    results["parse.extract_streams.offline"] = summarize(
+        measure(lambda: extraction.decode_chart(extraction.chart_data_from_html(chart_html), chart_url), min_time),
+        input_bytes=len(chart_html.encode()),
+    )
+    results["parse.extract_streams.compact"] = summarize(
+        measure(lambda: extraction.decode_chart(json.loads(chart_payload), chart_url), min_time),
+        input_bytes=len(chart_payload.encode()),
+    )
+    series_json = load_fixture("soundcloud_insights.json")
+    parse_series = series_parser(soundcloud_day_label, "soundcloud")
+    results["parse.extract_streams.network"] = summarize(
+        measure(lambda: parse_series(json.loads(series_json)), min_time), input_bytes=len(series_json.encode()),
+    )
+
+    # Spotify for Artists: Statistik-Seite
+    def legacy_stats():
+        soup = _legacy_soup(stats_html)
+        total = soup.select_one(extraction.STATS_TOTAL_SELECTOR)
+        labels = [rect.get("aria-label") for rect in soup.select(extraction.STATS_BAR_SELECTOR)]
+        return extraction.parse_stats_data({"total": total.get_text() if total else None, "labels": labels})
+
+    stats_payload = json.dumps(extraction.stats_data_from_html(stats_html))
+    timeline_json = load_fixture("spotify_stats_timeline.json")
+    parse_timeline = series_parser(spotify_day_label, "spotify_artists")
+    results["parse.stats.bs4_full"] = summarize(measure(legacy_stats, min_time), input_bytes=len(stats_html.encode()))
+    results["parse.stats.offline"] = summarize(
+        measure(lambda: extraction.parse_stats_data(extraction.stats_data_from_html(stats_html)), min_time),
+        input_bytes=len(stats_html.encode()),
+    )
+    results["parse.stats.compact"] = summarize(
+        measure(lambda: extraction.parse_stats_data(json.loads(stats_payload)), min_time),
+        input_bytes=len(stats_payload.encode()),
+    )
+    results["parse.stats.network"] = summarize(
+        measure(lambda: parse_timeline(json.loads(timeline_json)), min_time), input_bytes=len(timeline_json.encode()),
+    )
+
+    # open.spotify.com: Artist-Seite (parse_artist_data gibt pro Aufruf zwei Zeilen aus)
+    def quiet(fn):
+        def run():
+            stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+            try:
+                return fn()
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+        return run
+
+    def legacy_artist():
+        soup = _legacy_soup(artist_html)
+        listeners = soup.select_one(extraction.LISTENERS_SELECTOR)
+        return extraction.parse_artist_data({
+            "listeners": listeners.get_text().strip() if listeners else None,
+            "track_names": [n.get_text().strip() for n in soup.select(extraction.TRACK_NAME_SELECTOR)],
+            "play_counts": [n.get_text().strip() for n in soup.select(extraction.PLAY_COUNT_SELECTOR)],
+        })
+
+    artist_payload = json.dumps(extraction.artist_data_from_html(artist_html))
+    overview_json = load_fixture("spotify_artist_overview.json")
+    results["parse.artist.bs4_full"] = summarize(
+        measure(quiet(legacy_artist), min_time), input_bytes=len(artist_html.encode()),
+    )
+    results["parse.artist.offline"] = summarize(
+        measure(quiet(lambda: extraction.parse_artist_data(extraction.artist_data_from_html(artist_html))), min_time),
+        input_bytes=len(artist_html.encode()),
+    )
+    results["parse.artist.compact"] = summarize(
+        measure(quiet(lambda: extraction.parse_artist_data(json.loads(artist_payload))), min_time),
+        input_bytes=len(artist_payload.encode()),
+    )
+    results["parse.artist.network"] = summarize(
+        measure(lambda: parse_artist_overview(json.loads(overview_json)), min_time),
+        input_bytes=len(overview_json.encode()),
+    )
+    # HTTP-Stufe: eingebetteter Seitenzustand im ausgelieferten HTML
+    results["parse.artist.http_state"] = summarize(
+        measure(lambda: artist_data_from_state(artist_html), min_time), input_bytes=len(artist_html.encode()),
+    )
+    return results
+
+
+# ---------------------------------------------------------------------------
+# End-to-End-Benchmarks
+# ---------------------------------------------------------------------------
+
+async def _quietly(coro):
+    # Die Scraper loggen per print; für die Messung unterdrücken
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        return await coro
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+async def spotify_public_benchmarks(server, runs):
+    from scrapers import scraper_öffentlich_spotify
+    from scrapers.browser_pool import BrowserPool
+
+    scraper_öffentlich_spotify.SPOTIFY_PUBLIC_BASE_URL = server.base_url
+    results = {}
+    pool = BrowserPool()
+    await pool.start()
+    try:
+        for api in (True, False):
+            server.api = api
+            name = f"e2e.scrape_spotify_artist_tracks.{'network' if api else 'dom'}"
+            results[name] = await measure_e2e(
+                lambda: _quietly(scraper_öffentlich_spotify.scrape_spotify_artist_tracks(ARTIST_ID, pool=pool, tiered=False)),
+                runs,
+            )
+    finally:
+        await pool.stop()
+        server.api = True
+    # Ohne Pool: eigener Browserstart pro Request (bisheriges Verhalten)
+    results["e2e.scrape_spotify_artist_tracks.cold"] = await measure_e2e(
+        lambda: _quietly(scraper_öffentlich_spotify.scrape_spotify_artist_tracks(ARTIST_ID, tiered=False)),
+        max(2, runs // 3),
+    )
+    return results
+
+
+async def http_tier_benchmarks(server, runs):
+    # Gestufter Abruf ohne Browser: HTTP-Request mit Keep-Alive und eingebettetem Seitenzustand
+    from scrapers import scraper_öffentlich_spotify
+
+    scraper_öffentlich_spotify.SPOTIFY_PUBLIC_BASE_URL = server.base_url
+    return {
+        "e2e.scrape_spotify_artist_tracks.http": await measure_e2e(
+            lambda: _quietly(scraper_öffentlich_spotify.scrape_spotify_artist_tracks(ARTIST_ID, tiered=True)), runs,
+        ),
+    }
+
+
+async def nodriver_benchmarks(server, runs):
+    from benchmarks.fake_browserless import FakeBrowserless
+
+    results = {}
+    with FakeBrowserless() as browser:
+        os.environ.update(browser.env())
+        from scrapers import soundcloud_7Dstreams, spotify_7Dstreams
+        from scrapers.remote_pool import RemoteSessionPool
+
+        soundcloud_7Dstreams.SOUNDCLOUD_INSIGHTS_BASE_URL = server.base_url
+        spotify_7Dstreams.SPOTIFY_ARTISTS_BASE_URL = server.base_url
+        pool = RemoteSessionPool(max_sessions=1, endpoint=browser.ws_url)
+        driver = await pool.acquire()
+        try:
+            now = int(time.time()) * 1000
+            streams_url = soundcloud_7Dstreams.insights_url("DAYS_30", now - 30 * 86400000, now, "DAY")
+            stats_url = spotify_7Dstreams.build_stats_url(
+                ARTIST_ID, datetime.date(2025, 2, 10), datetime.date(2025, 3, 9),
+            )
+            for api in (True, False):
+                server.api = api
+                suffix = "network" if api else "dom"
+                results[f"e2e.extract_streams.{suffix}"] = await measure_e2e(
+                    lambda: _quietly(soundcloud_7Dstreams.extract_streams(driver, streams_url, new_tab=True)),
+                    runs, pids=[browser.pid],
+                )
+                results[f"e2e.spotify_scrape_data.{suffix}"] = await measure_e2e(
+                    lambda: _quietly(spotify_7Dstreams.scrape_data(driver, stats_url, "28 Tage Streams", new_tab=True)),
+                    runs, pids=[browser.pid],
+                )
+        finally:
+            server.api = True
+            await pool.release(driver)
+            await pool.stop()
+    return results
+
+
+async def e2e_benchmarks(runs=E2E_RUNS):
+    from benchmarks.fixture_server import FixtureServer
+
+    results = {}
+    with FixtureServer() as server:
+        groups = (("http", http_tier_benchmarks), ("playwright", spotify_public_benchmarks), ("nodriver", nodriver_benchmarks))
+        for name, group in groups:
+            try:
+                results.update(await group(server, runs))
+            except Exception as e:
+                results[f"e2e.{name}"] = {"skipped": f"{type(e).__name__}: {e}"}
+        results["e2e.fixture_server"] = {"requests": server.requests, "bytes_sent": server.bytes_sent}
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Kaltstart: Import in einem frischen Interpreter
+# ---------------------------------------------------------------------------
+
+def _cold_import(code, runs):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    times = []
+    for _ in range(runs):
+        # Nur den Import messen, nicht den Interpreter-Start (der misst sich selbst)
+        output = subprocess.check_output(
+            [sys.executable, "-c", f"import time; t = time.perf_counter(); {code}; print(time.perf_counter() - t)"],
+            cwd=root, stderr=subprocess.DEVNULL, text=True,
+        )
+        times.append(float(output.strip().splitlines()[-1]))
+    return summarize(times)
+
+
+def startup_benchmarks(runs=E2E_RUNS):
+    from scrapers import BACKENDS
+
+    results = {}
+    try:
+        results["startup.import_app"] = _cold_import("import app", runs)
+    except subprocess.CalledProcessError as e:
+        results["startup.import_app"] = {"skipped": str(e)}
+    for name in BACKENDS:
+        try:
+            results[f"startup.load_backend.{name}"] = _cold_import(
+                f"import scrapers; scrapers.load_backend({name!r})", runs,
+            )
+        except subprocess.CalledProcessError as e:
+            results[f"startup.load_backend.{name}"] = {"skipped": str(e)}
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Ergebnisse
+# ---------------------------------------------------------------------------
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except Exception:
+        return None
+
+
+def metadata():
+    from scrapers.extraction import HTMLParser, _bs4_parser
+
+    return {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "html_parser": "selectolax" if HTMLParser is not None else f"bs4/{_bs4_parser()}",
+    }
+
+
+def run(only=None, runs=E2E_RUNS, min_time=MIN_TIME, output=None):
+    benchmarks = {}
+    if only in (None, "parse"):
+        benchmarks.update(parse_benchmarks(min_time))
+    if only in (None, "e2e"):
+        benchmarks.update(asyncio.run(e2e_benchmarks(runs)))
+    if only in (None, "startup"):
+        benchmarks.update(startup_benchmarks(runs))
+    report = {"meta": metadata(), "benchmarks": benchmarks}
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    for name, result in benchmarks.items():
+        if "skipped" in result:
+            print(f"{name:<48} übersprungen: {result['skipped']}")
+        elif "mean_ms" in result:
+            print(f"{name:<48} {result['mean_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms")
+    print(f"\n💾 Ergebnisse: {output}")
+    return report
+
+
+def compare(baseline_path, current_path, threshold=0.1):
+    """Vergleicht zwei Ergebnisdateien; liefert die Liste der Regressionen (> threshold schlechter)."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["benchmarks"]
+    with open(current_path, encoding="utf-8") as f:
+        current = json.load(f)["benchmarks"]
+    regressions = []
+    for name in sorted(set(baseline) & set(current)):
+        for key in COMPARED_KEYS:
+            old, new = baseline[name].get(key), current[name].get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            marker = "❌" if change > threshold else ("✅" if change < -threshold else "  ")
+            print(f"{marker} {name:<48} {key:<15} {old:>10.3f} -> {new:>10.3f} ({change:+.1%})")
+            if change > threshold:
+                regressions.append({"benchmark": name, "metric": key, "baseline": old, "current": new, "change": change})
+    for name in sorted(set(baseline) - set(current)):
+        print(f"⚠️ {name} fehlt im aktuellen Lauf")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline-Benchmarks der Scraper")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="Benchmarks ausführen")
+    p_run.add_argument("--only", choices=("parse", "e2e", "startup"))
+    p_run.add_argument("--runs", type=int, default=E2E_RUNS, help="Scrapes pro End-to-End-Benchmark")
+    p_run.add_argument("--min-time", type=float, default=MIN_TIME, help="Sekunden pro Parse-Benchmark")
+    p_run.add_argument("--output")
+    p_compare = sub.add_parser("compare", help="Zwei Ergebnisdateien vergleichen")
+    p_compare.add_argument("baseline")
+    p_compare.add_argument("current")
+    p_compare.add_argument("--threshold", type=float, default=0.1, help="Erlaubte Verschlechterung (0.1 = 10 %%)")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run(args.only, args.runs, args.min_time, args.output)
+    else:
+        regressions = compare(args.baseline, args.current, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} Regression(en) über {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ Keine Regressionen")
+
+
+if __name__ == "__main__":
+    main()
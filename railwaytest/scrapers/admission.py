@@ -0,0 +1,342 @@
+import asyncio
+import os
+import signal
+import time
+from contextlib import asynccontextmanager
+
+from scrapers.metrics import REGISTRY, Counter, Gauge
+
+# Zulassung nach Speicherverbrauch: jeder Browser-Scrape belegt einen Chromium-Kontext mit
+# mehreren hundert MB. Vor dem Start wird der Speicherverbrauch des Containers (cgroup, wie ihn der
+# OOM-Killer sieht) gegen ein Budget geprüft; ist es erschöpft, wartet der Request in einer begrenzten Warteschlange oder bekommt
+# 503 mit Retry-After. Ein Watchdog beendet Browser-Prozesse über BROWSER_MAX_RSS_MB (der Pool startet
+# abgestürzte Browser neu) und bricht Scrapes ab, die länger als SCRAPE_DEADLINE laufen.
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "1") == "1"
+# Budget in MB; ohne Angabe ein Anteil des Container-Limits (cgroup) bzw. des Arbeitsspeichers
+MEMORY_BUDGET_MB = float(os.getenv("MEMORY_BUDGET_MB", "0"))
+MEMORY_BUDGET_FRACTION = float(os.getenv("MEMORY_BUDGET_FRACTION", "0.8"))
+# Geschätzter Zusatzbedarf eines Scrapes, solange sein Kontext noch wächst (noch nicht im Verbrauch sichtbar)
+SCRAPE_MEMORY_ESTIMATE_MB = float(os.getenv("SCRAPE_MEMORY_ESTIMATE_MB", "300"))
+SCRAPE_RAMP_SECONDS = float(os.getenv("SCRAPE_RAMP_SECONDS", "5"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "20"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "15"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "10"))
+BROWSER_MAX_RSS_MB = float(os.getenv("BROWSER_MAX_RSS_MB", "1024"))
+SCRAPE_DEADLINE = float(os.getenv("SCRAPE_DEADLINE", "120"))
+WATCHDOG_INTERVAL = float(os.getenv("WATCHDOG_INTERVAL", "1"))
+
+# Prozesse, die der Watchdog beenden darf (Chromium/Headless-Shell, nicht der Playwright-Treiber)
+BROWSER_PROCESS_MARKERS = ("chrome", "chromium", "headless_shell")
+
+memory_used_bytes = Gauge("streamfloat_memory_used_bytes", "Speicherverbrauch des Containers bzw. PSS des Prozessbaums")
+admission_total = Counter("streamfloat_admission_total", "Zulassungsentscheidungen für Browser-Scrapes", ("outcome",))
+admission_waiting = Gauge("streamfloat_admission_waiting", "Scrapes in der Warteschlange der Zulassung")
+browser_kills = Counter("streamfloat_browser_kills_total", "Vom Watchdog beendete Browser-Prozesse bzw. Scrapes", ("reason",))
+REGISTRY.extend([memory_used_bytes, admission_total, admission_waiting, browser_kills])
+
+
+class AdmissionRejected(Exception):
+    """Speicherbudget erschöpft und Warteschlange voll bzw. Wartezeit abgelaufen (-> HTTP 503)."""
+
+    def __init__(self, reason, retry_after=ADMISSION_RETRY_AFTER):
+        super().__init__(f"Überlastet ({reason}), später erneut versuchen")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ScrapeDeadlineExceeded(asyncio.TimeoutError):
+    """Der Watchdog hat einen Scrape nach SCRAPE_DEADLINE Sekunden abgebrochen."""
+
+
+# ---------------------------------------------------------------------------
+# Speicher des Prozessbaums (Linux /proc, Container-Limit aus der cgroup)
+# ---------------------------------------------------------------------------
+
+def process_tree(root):
+    """PIDs von root und allen Nachfahren (Linux /proc)."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    pids, stack = [], [root]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def pss_mb(pid):
+    """Proportionaler Anteil (geteilte Seiten anteilig); ohne smaps_rollup der RSS."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return rss_mb(pid)
+
+
+def is_browser_process(pid):
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            executable = f.read().split(b"\0", 1)[0].decode(errors="replace").lower()
+    except OSError:
+        return False
+    return any(marker in os.path.basename(executable) for marker in BROWSER_PROCESS_MARKERS)
+
+
+def memory_limit_mb():
+    """Speicherlimit des Containers (cgroup v2/v1), sonst der Arbeitsspeicher; None ohne /proc."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # "max" bzw. ein riesiger Wert bedeutet: kein Limit gesetzt
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value) / (1024 * 1024)
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def cgroup_usage_mb():
+    """Verbrauch der cgroup (v2/v1) ohne inaktiven Page-Cache, wie ihn docker stats zeigt; sonst None."""
+    for usage_path, stat_path, inactive_key in (
+        ("/sys/fs/cgroup/memory.current", "/sys/fs/cgroup/memory.stat", "inactive_file"),
+        ("/sys/fs/cgroup/memory/memory.usage_in_bytes", "/sys/fs/cgroup/memory/memory.stat", "total_inactive_file"),
+    ):
+        try:
+            with open(usage_path) as f:
+                usage = int(f.read().strip())
+        except (OSError, ValueError):
+            continue
+        # Inaktiver Page-Cache wird vor einem OOM freigegeben
+        inactive = 0
+        try:
+            with open(stat_path) as f:
+                for line in f:
+                    key, _, value = line.partition(" ")
+                    if key == inactive_key:
+                        inactive = int(value)
+                        break
+        except (OSError, ValueError):
+            pass
+        return max(0, usage - inactive) / (1024 * 1024)
+    return None
+
+
+def default_budget_mb():
+    if MEMORY_BUDGET_MB > 0:
+        return MEMORY_BUDGET_MB
+    limit = memory_limit_mb()
+    return limit * MEMORY_BUDGET_FRACTION if limit else None
+
+
+def sample_memory(root=None):
+    """(Verbrauch in MB, [(pid, RSS in MB) der Browser-Prozesse]).
+
+    Der Verbrauch kommt aus der cgroup; ohne cgroup die Summe der PSS des Prozessbaums. Die RSS der
+    Chromium-Prozesse aufzusummieren würde geteilte Seiten mehrfach zählen; sie dienen nur der
+    Grenze je Browser-Prozess.
+    """
+    pids = process_tree(root or os.getpid())
+    browsers = [(pid, rss_mb(pid)) for pid in pids if pid != os.getpid() and is_browser_process(pid)]
+    used = cgroup_usage_mb()
+    if used is None:
+        used = sum(pss_mb(pid) for pid in pids)
+    return used, browsers
+
+
+class _Ticket:
+    def __init__(self, task):
+        self.task = task
+        self.started_at = time.monotonic()
+        self.expired = False
+
+
+class AdmissionController:
+    """Lässt Browser-Scrapes nur zu, solange Verbrauch + Reserve für anlaufende Scrapes ins Budget passen."""
+
+    def __init__(self, budget_mb=None, estimate_mb=SCRAPE_MEMORY_ESTIMATE_MB, ramp_seconds=SCRAPE_RAMP_SECONDS,
+                 max_queue=ADMISSION_MAX_QUEUE, queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+                 retry_after=ADMISSION_RETRY_AFTER, browser_max_rss_mb=BROWSER_MAX_RSS_MB,
+                 deadline=SCRAPE_DEADLINE, interval=WATCHDOG_INTERVAL):
+        self.budget_mb = budget_mb if budget_mb is not None else default_budget_mb()
+        self.estimate_mb = estimate_mb
+        self.ramp_seconds = ramp_seconds
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.browser_max_rss_mb = browser_max_rss_mb
+        self.deadline = deadline
+        self.interval = interval
+        self.used_mb = 0.0
+        self.waiting = 0
+        self._active = set()
+        self._changed = asyncio.Condition()
+        self._watchdog = None
+        self._stats = {"admitted": 0, "queued": 0, "rejected": 0, "rss_kills": 0, "deadline_kills": 0}
+
+    @property
+    def in_flight(self):
+        return len(self._active)
+
+    def reserved_mb(self):
+        # Frisch zugelassene Scrapes sind im Verbrauch noch nicht (voll) enthalten
+        now = time.monotonic()
+        return self.estimate_mb * sum(1 for t in self._active if now - t.started_at < self.ramp_seconds)
+
+    def has_capacity(self):
+        if self.budget_mb is None or not self._active:
+            # Ein Scrape darf immer laufen, sonst stünde der Dienst bei hohem Grundverbrauch still
+            return True
+        return self.used_mb + self.reserved_mb() + self.estimate_mb <= self.budget_mb
+
+    def _reject(self, reason):
+        self._stats["rejected"] += 1
+        admission_total.inc(("rejected",))
+        raise AdmissionRejected(reason, self.retry_after)
+
+    async def _admit(self):
+        if self.waiting == 0 and self.has_capacity():
+            return
+        if self.waiting >= self.max_queue:
+            self._reject("Warteschlange voll")
+        self._stats["queued"] += 1
+        admission_total.inc(("queued",))
+        self.waiting += 1
+        admission_waiting.set((), self.waiting)
+        give_up = time.monotonic() + self.queue_timeout
+        try:
+            async with self._changed:
+                while not self.has_capacity():
+                    remaining = give_up - time.monotonic()
+                    if remaining <= 0:
+                        self._reject("Speicherbudget erschöpft")
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self.waiting -= 1
+            admission_waiting.set((), self.waiting)
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Klammert einen Browser-Scrape; wirft AdmissionRejected oder ScrapeDeadlineExceeded."""
+        await self._admit()
+        self._stats["admitted"] += 1
+        admission_total.inc(("admitted",))
+        ticket = _Ticket(asyncio.current_task())
+        self._active.add(ticket)
+        try:
+            yield
+        except asyncio.CancelledError:
+            if not ticket.expired:
+                raise
+            # Abbruch durch den Watchdog, nicht durch den Aufrufer: als Timeout weiterreichen
+            if hasattr(ticket.task, "uncancel"):
+                ticket.task.uncancel()
+            raise ScrapeDeadlineExceeded(f"Scrape nach {self.deadline:.0f}s abgebrochen") from None
+        finally:
+            self._active.discard(ticket)
+            await self._notify()
+
+    # -----------------------------------------------------------------------
+    # Watchdog
+    # -----------------------------------------------------------------------
+
+    async def start(self):
+        if self._watchdog is None:
+            await self.check()
+            self._watchdog = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            await asyncio.gather(self._watchdog, return_exceptions=True)
+            self._watchdog = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"[WARN] Watchdog-Prüfung fehlgeschlagen: {e}")
+
+    async def check(self):
+        """Misst den Speicherverbrauch, beendet zu große Browser-Prozesse und überfällige Scrapes."""
+        if os.path.isdir("/proc"):
+            used, browsers = await asyncio.to_thread(sample_memory)
+            for pid, mb in browsers:
+                if mb > self.browser_max_rss_mb:
+                    # Der freigegebene Speicher zeigt sich in der nächsten Messung
+                    self._kill(pid, mb)
+            self.used_mb = used
+            memory_used_bytes.set((), int(used * 1024 * 1024))
+        now = time.monotonic()
+        for ticket in list(self._active):
+            if not ticket.expired and now - ticket.started_at > self.deadline:
+                print(f"[WARN] Scrape läuft länger als {self.deadline:.0f}s, breche ab")
+                ticket.expired = True
+                ticket.task.cancel()
+                self._stats["deadline_kills"] += 1
+                browser_kills.inc(("deadline",))
+        # Wartende neu prüfen lassen (der Verbrauch kann gesunken sein)
+        await self._notify()
+
+    def _kill(self, pid, mb):
+        print(f"[WARN] Browser-Prozess {pid} belegt {mb:.0f} MB (> {self.browser_max_rss_mb:.0f} MB), beende ihn")
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            return
+        self._stats["rss_kills"] += 1
+        browser_kills.inc(("rss",))
+
+    def stats(self):
+        return {
+            "budget_mb": round(self.budget_mb, 1) if self.budget_mb else None,
+            "used_mb": round(self.used_mb, 1),
+            "reserved_mb": round(self.reserved_mb(), 1),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            **self._stats,
+        }
+
+
+def default_admission():
+    """Zulassung für den Webdienst, wenn ADMISSION_CONTROL=1 (Standard); sonst None."""
+    return AdmissionController() if ADMISSION_CONTROL else None
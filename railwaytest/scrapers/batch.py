@@ -0,0 +1,27 @@
+import asyncio
+import os
+
+# Obergrenze für parallele Scrapes innerhalb eines Batch-Requests
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+
+
+async def iter_batch(artist_ids, fetch, concurrency=BATCH_MAX_CONCURRENCY):
+    """Führt fetch(artist_id) begrenzt parallel aus und liefert Ergebnisse, sobald sie fertig sind."""
+    semaphore = asyncio.Semaphore(max(1, min(concurrency, BATCH_MAX_CONCURRENCY)))
+
+    async def run(artist_id):
+        async with semaphore:
+            try:
+                return {"artist_id": artist_id, "success": True, "data": await fetch(artist_id)}
+            except Exception as e:
+                # Fehler eines Artists landen in seiner Zeile, der Batch läuft weiter
+                return {"artist_id": artist_id, "success": False, "error": str(e)}
+
+    tasks = [asyncio.ensure_future(run(artist_id)) for artist_id in artist_ids]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Bricht der Client den Stream ab, laufende Scrapes nicht weiter abwarten
+        for task in tasks:
+            task.cancel()
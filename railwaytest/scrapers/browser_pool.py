@@ -0,0 +1,128 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager, nullcontext
+
+from scrapers.metrics import browser_contexts_in_use, browsers_open, phase
+
+# Anzahl langlebiger Chromium-Instanzen und maximale Zahl gleichzeitiger Kontexte
+POOL_BROWSERS = int(os.getenv("BROWSER_POOL_BROWSERS", "1"))
+POOL_MAX_CONCURRENCY = int(os.getenv("BROWSER_POOL_MAX_CONCURRENCY", "4"))
+
+
+class BrowserPool:
+    """Hält langlebige Chromium-Browser und vergibt pro Request einen frischen, isolierten Kontext."""
+
+    def __init__(self, browsers=POOL_BROWSERS, max_concurrency=POOL_MAX_CONCURRENCY, launch_options=None, admission=None):
+        self.size = max(1, browsers)
+        self.max_concurrency = max(1, max_concurrency)
+        self.launch_options = launch_options or {"headless": True}
+        # Optional: AdmissionController, prüft vor jedem Kontext das Speicherbudget
+        self.admission = admission
+        self.in_use = 0
+        self._playwright = None
+        self._browsers = []
+        self._counter = 0
+        self._lock = asyncio.Lock()
+        self._start_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    @property
+    def started(self):
+        return self._playwright is not None
+
+    async def start(self):
+        """Startet Playwright und alle Browser des Pools (beim App-Start oder beim ersten Kontext)."""
+        async with self._start_lock:
+            if not self.started:
+                await self._start()
+
+    async def _start(self):
+        # Playwright erst beim Start importieren (nicht schon beim Import von app.py)
+        from playwright.async_api import async_playwright
+
+        print(f"[INFO] Starte Browser-Pool ({self.size} Browser, max. {self.max_concurrency} Kontexte)...")
+        self._playwright = await async_playwright().start()
+        try:
+            for _ in range(self.size):
+                self._browsers.append(await self._launch())
+        except BaseException:
+            # Ohne Browser nicht als gestartet gelten; der nächste Kontext versucht es erneut
+            for browser in self._browsers:
+                await browser.close()
+            self._browsers = []
+            await self._playwright.stop()
+            self._playwright = None
+            raise
+        browsers_open.set(("playwright_pool",), len(self._browsers))
+        await self.warm_up()
+
+    async def _launch(self):
+        return await self._playwright.chromium.launch(**self.launch_options)
+
+    async def warm_up(self):
+        """Öffnet je Browser einmal Kontext und Seite, damit die Renderer-Prozesse bereitstehen."""
+        for browser in self._browsers:
+            try:
+                context = await browser.new_context()
+                page = await context.new_page()
+                await page.goto("about:blank")
+                await context.close()
+            except Exception as e:
+                print(f"[WARN] Warm-up fehlgeschlagen: {e}")
+
+    async def _pick_browser(self):
+        # Round-Robin über die Browser; abgestürzte Browser werden hier ersetzt
+        async with self._lock:
+            index = self._counter % self.size
+            self._counter += 1
+            browser = self._browsers[index]
+            if not browser.is_connected():
+                print("[WARN] Browser nicht mehr verbunden, starte neu...")
+                browser = await self._launch()
+                self._browsers[index] = browser
+            return browser
+
+    @asynccontextmanager
+    async def context(self, **context_options):
+        """Liefert einen frischen Browser-Kontext; wartet, wenn das Limit erreicht ist."""
+        if not self.started:
+            await self.start()
+        admitted = self.admission.slot() if self.admission is not None else nullcontext()
+        # Erst auf einen freien Kontext warten: Laufzeit (SCRAPE_DEADLINE) und Speicherreserve der
+        # Zulassung zählen erst, wenn der Kontext tatsächlich entsteht
+        async with self._semaphore, admitted:
+            with phase("browser"):
+                browser = await self._pick_browser()
+                context = await browser.new_context(**context_options)
+            self.in_use += 1
+            browser_contexts_in_use.set((), self.in_use)
+            try:
+                yield context
+            finally:
+                self.in_use -= 1
+                browser_contexts_in_use.set((), self.in_use)
+                try:
+                    await context.close()
+                except Exception as e:
+                    print(f"[WARN] Kontext konnte nicht geschlossen werden: {e}")
+
+    async def stop(self):
+        """Schließt alle Browser und beendet Playwright (beim App-Shutdown)."""
+        for browser in self._browsers:
+            try:
+                await browser.close()
+            except Exception as e:
+                print(f"[WARN] Fehler beim Schließen des Browsers: {e}")
+        self._browsers = []
+        browsers_open.set(("playwright_pool",), 0)
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+        print("[INFO] Browser-Pool beendet")
+
+    def stats(self):
+        return {
+            "browsers": len(self._browsers),
+            "max_concurrency": self.max_concurrency,
+            "in_use": self.in_use,
+        }
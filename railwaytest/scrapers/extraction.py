@@ -0,0 +1,386 @@
+import json
+import re
+import urllib.parse
+from datetime import datetime, timedelta
+
+# Extraktion direkt in der Seite: statt das komplette outerHTML über CDP zu übertragen und mit
+# BeautifulSoup zu parsen, laufen die Selektoren im Browser und nur kompakte Daten kommen zurück.
+# Für gespeichertes HTML (offline) gibt es dieselben Extraktoren mit einem schnellen Parser.
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# Selektoren open.spotify.com (Artist-Seite)
+LISTENERS_SELECTOR = "span.VmDxGgs77HhmKczsLLBQ"
+TRACK_NAME_SELECTOR = "div.e-91000-text.encore-text-body-medium.encore-internal-color-text-base.eYJgrgW01l7dHKuMJidG.standalone-ellipsis-one-line"
+PLAY_COUNT_SELECTOR = "div.e-91000-text.encore-text-body-small.htbmhRXsxePzCR3HsX0V"
+
+# Selektoren Spotify for Artists (Statistik-Seite)
+STATS_TOTAL_SELECTOR = 'button[data-testid="hero-stats-button-streams"] p[data-encore-id="text"]'
+STATS_BAR_SELECTOR = "rect[aria-label]"
+STATS_LABEL_RE = re.compile(r"([A-Za-z]+ \d{1,2}, \d{4}), ([\d,]+) Streams")
+
+# Selektoren SoundCloud Insights (MUI-Diagramm)
+Y_AXIS_SELECTOR = 'g[class*="MuiChartsAxis-directionY"]'
+X_AXIS_SELECTOR = 'g[class*="MuiChartsAxis-directionX"]'
+TICK_SELECTOR = 'g[class*="MuiChartsAxis-tickContainer"]'
+CHART_SVG_SELECTOR = 'svg[class*="mui-1ht4czs"]'
+CHART_BAR_SELECTOR = "g[clip-path] rect.MuiBarElement-root"
+TICK_LABEL_SELECTOR = 'text[class*="MuiChartsAxis-tickLabel"]'
+# Achsen-Ticks (transform="translate(x, y)", Text "1,000"/"1.5K") und Balkenposition (translate3d)
+NUMBER = r"-?\d*\.?\d+(?:e[-+]?\d+)?"
+TRANSLATE_RE = re.compile(rf"translate\(\s*({NUMBER})[\s,]+({NUMBER})\s*\)")
+TICK_VALUE_RE = re.compile(rf"({NUMBER})\s*([KkMm]?)")
+TICK_SUFFIXES = {"": 1, "K": 1000, "M": 1000000}
+BAR_Y_RE = re.compile(r"translate3d\([^,]+,\s*([0-9.]+)px")
+
+ARTIST_PAGE_JS = f"""(() => {{
+  const texts = sel => Array.from(document.querySelectorAll(sel)).map(e => e.textContent.trim());
+  const listeners = document.querySelector({json.dumps(LISTENERS_SELECTOR)});
+  return JSON.stringify({{
+    listeners: listeners ? listeners.textContent.trim() : null,
+    track_names: texts({json.dumps(TRACK_NAME_SELECTOR)}),
+    play_counts: texts({json.dumps(PLAY_COUNT_SELECTOR)}),
+  }});
+}})()"""
+
+STATS_PAGE_JS = f"""(() => {{
+  const total = document.querySelector({json.dumps(STATS_TOTAL_SELECTOR)});
+  return JSON.stringify({{
+    total: total ? total.textContent : null,
+    labels: Array.from(document.querySelectorAll({json.dumps(STATS_BAR_SELECTOR)})).map(e => e.getAttribute("aria-label")),
+  }});
+}})()"""
+
+CHART_JS = f"""(() => {{
+  const y = document.querySelector({json.dumps(Y_AXIS_SELECTOR)});
+  const x = document.querySelector({json.dumps(X_AXIS_SELECTOR)});
+  const svg = document.querySelector({json.dumps(CHART_SVG_SELECTOR)});
+  const ticks = y ? Array.from(y.querySelectorAll({json.dumps(TICK_SELECTOR)})).map(t => {{
+    const text = t.querySelector("text");
+    return [t.getAttribute("transform"), text ? text.textContent.trim() : null];
+  }}) : [];
+  return JSON.stringify({{
+    ticks: ticks,
+    x_axis_transform: x ? x.getAttribute("transform") : null,
+    bars: svg ? Array.from(svg.querySelectorAll({json.dumps(CHART_BAR_SELECTOR)})).map(b => b.getAttribute("style") || "") : null,
+    labels: Array.from(document.querySelectorAll({json.dumps(TICK_LABEL_SELECTOR)})).map(t => t.textContent.trim()),
+  }});
+}})()"""
+
+# Alle Monatswerte des 12-Monats-Diagramms in einem Durchlauf: aria-label der Balken, sonst der
+# Wert aus den React-Props des Diagramms; Monatsnamen aus der X-Achse.
+TOOLTIP_BULK_JS = rf"""(() => {{
+  const bars = Array.from(document.querySelectorAll({json.dumps(CHART_BAR_SELECTOR)}));
+  const xAxis = document.querySelector({json.dumps(X_AXIS_SELECTOR)});
+  const months = xAxis ? Array.from(xAxis.querySelectorAll("text")).map(t => t.textContent.trim()).filter(Boolean) : [];
+  const fiberValue = el => {{
+    const key = Object.keys(el).find(k => k.startsWith("__reactFiber$"));
+    let fiber = key ? el[key] : null;
+    for (let depth = 0; fiber && depth < 20; depth++, fiber = fiber.return) {{
+      const props = fiber.memoizedProps || {{}};
+      if (typeof props.value === "number") return props.value;
+    }}
+    return null;
+  }};
+  return JSON.stringify(bars.map((bar, i) => {{
+    const match = (bar.getAttribute("aria-label") || "").match(/^(.*?)[,:]\s*([\d.,]+)/);
+    return {{
+      plays: match ? match[2] : fiberValue(bar),
+      month: match ? match[1].trim() : (months.length === bars.length ? months[i] : null),
+    }};
+  }}));
+}})()"""
+
+
+# ---------------------------------------------------------------------------
+# Offline-Parser (selectolax, sonst BeautifulSoup mit lxml bzw. html.parser)
+# ---------------------------------------------------------------------------
+
+class _LexborNode:
+    def __init__(self, node):
+        self.node = node
+
+    def select(self, selector):
+        return [_LexborNode(n) for n in self.node.css(selector)]
+
+    def select_one(self, selector):
+        found = self.node.css_first(selector)
+        return _LexborNode(found) if found is not None else None
+
+    def text(self):
+        return self.node.text(strip=False).strip()
+
+    def attr(self, name):
+        return self.node.attributes.get(name)
+
+
+class _SoupNode:
+    def __init__(self, node):
+        self.node = node
+
+    def select(self, selector):
+        return [_SoupNode(n) for n in self.node.select(selector)]
+
+    def select_one(self, selector):
+        found = self.node.select_one(selector)
+        return _SoupNode(found) if found is not None else None
+
+    def text(self):
+        return self.node.get_text().strip()
+
+    def attr(self, name):
+        return self.node.get(name)
+
+
+def _bs4_parser():
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+def parse_html(html):
+    """Parst HTML mit dem schnellsten verfügbaren Parser."""
+    if HTMLParser is not None:
+        return _LexborNode(HTMLParser(html))
+    from bs4 import BeautifulSoup
+    return _SoupNode(BeautifulSoup(html, _bs4_parser()))
+
+
+def artist_data_from_html(html):
+    root = parse_html(html)
+    listeners = root.select_one(LISTENERS_SELECTOR)
+    return {
+        "listeners": listeners.text() if listeners else None,
+        "track_names": [n.text() for n in root.select(TRACK_NAME_SELECTOR)],
+        "play_counts": [n.text() for n in root.select(PLAY_COUNT_SELECTOR)],
+    }
+
+
+def stats_data_from_html(html):
+    root = parse_html(html)
+    total = root.select_one(STATS_TOTAL_SELECTOR)
+    return {
+        "total": total.text() if total else None,
+        "labels": [n.attr("aria-label") for n in root.select(STATS_BAR_SELECTOR)],
+    }
+
+
+def chart_data_from_html(html):
+    root = parse_html(html)
+    y_axis = root.select_one(Y_AXIS_SELECTOR)
+    x_axis = root.select_one(X_AXIS_SELECTOR)
+    svg = root.select_one(CHART_SVG_SELECTOR)
+    ticks = []
+    if y_axis:
+        for tick in y_axis.select(TICK_SELECTOR):
+            text = tick.select_one("text")
+            ticks.append([tick.attr("transform"), text.text() if text else None])
+    return {
+        "ticks": ticks,
+        "x_axis_transform": x_axis.attr("transform") if x_axis else None,
+        "bars": [b.attr("style") or "" for b in svg.select(CHART_BAR_SELECTOR)] if svg else None,
+        "labels": [t.text() for t in root.select(TICK_LABEL_SELECTOR)],
+    }
+
+
+EXTRACTORS = {
+    "artist": (ARTIST_PAGE_JS, artist_data_from_html),
+    "stats": (STATS_PAGE_JS, stats_data_from_html),
+    "chart": (CHART_JS, chart_data_from_html),
+}
+
+
+async def extract_from_page(page, kind):
+    """Führt den Extraktor in der Seite aus; fällt bei Fehlern auf outerHTML + Offline-Parser zurück."""
+    js, offline = EXTRACTORS[kind]
+    try:
+        raw = await page.evaluate(js)
+        if isinstance(raw, str):
+            return json.loads(raw)
+        print(f"[WARN] In-Page-Extraktion '{kind}' lieferte kein JSON, nutze Offline-Parser")
+    except Exception as e:
+        print(f"[WARN] In-Page-Extraktion '{kind}' fehlgeschlagen ({e}), nutze Offline-Parser")
+    html = await page.evaluate("document.documentElement.outerHTML")
+    return offline(html)
+
+
+# ---------------------------------------------------------------------------
+# Auswertung der kompakten Rohdaten
+# ---------------------------------------------------------------------------
+
+def parse_artist_data(raw):
+    """Monatliche Hörer und Track/Playzahl-Paare aus den Rohdaten der Artist-Seite."""
+    data = {}
+
+    raw_text = raw.get("listeners")
+    if raw_text is not None:
+        match = re.search(r"[\d,.]+", raw_text)
+        if match:
+            data["monthly_listeners"] = int(match.group(0).replace(".", "").replace(",", ""))
+            print(f"[INFO] Monatliche Hörer: {data['monthly_listeners']}")
+        else:
+            data["monthly_listeners"] = None
+            print("[WARN] Monatliche Hörer Zahl nicht erkannt")
+    else:
+        data["monthly_listeners"] = None
+        print("[WARN] Monatliche Hörer Element nicht gefunden")
+
+    track_names = raw.get("track_names", [])
+    play_counts = raw.get("play_counts", [])
+    print(f"[INFO] Gefundene Tracks: {len(track_names)}, Gefundene Playzahlen: {len(play_counts)}")
+
+    tracks = []
+    if len(track_names) == len(play_counts):
+        for track_name, play_text in zip(track_names, play_counts):
+            try:
+                play_count = int(play_text.replace(".", "").replace(",", ""))
+            except ValueError:
+                play_count = None
+            tracks.append({"track_name": track_name, "play_count": play_count})
+    else:
+        print("[WARN] Unterschiedliche Anzahl Track-Namen und Playzahlen!")
+        for track_name in track_names:
+            tracks.append({"track_name": track_name, "play_count": None})
+
+    data["tracks"] = tracks
+    return data
+
+
+def parse_tooltip_bulk(items):
+    """Bulk-Ergebnis im Format von extract_tooltip_data, oder None, wenn ein Balken unvollständig ist."""
+    if not items:
+        return None
+    # Identische Werte für alle Balken deuten auf falsch gelesene Diagrammdaten hin -> Hover-Fallback
+    if len(items) > 1 and len({str(item.get("plays")) for item in items}) == 1:
+        return None
+    tooltip_data = {}
+    for i, item in enumerate(items):
+        plays, month = item.get("plays"), item.get("month")
+        if plays is None or not month:
+            return None
+        if isinstance(plays, (int, float)):
+            plays = f"{int(round(plays)):,}"
+        tooltip_data[f"Bar_{i+1}"] = {"plays": plays, "month": month}
+    return tooltip_data
+
+
+def parse_stats_data(raw):
+    """Gesamtwert und Tageswerte aus den Rohdaten der Spotify-for-Artists-Statistik."""
+    total_value = None
+    if raw.get("total"):
+        try:
+            total_value = int(raw["total"].replace(",", ""))
+        except ValueError:
+            total_value = None
+
+    daily_data = {}
+    for aria_label in raw.get("labels", []):
+        match = STATS_LABEL_RE.match(aria_label or "")
+        if match:
+            daily_data[match.group(1)] = int(match.group(2).replace(",", ""))
+    return total_value, daily_data
+
+
+def _tick_value(text):
+    """'500' / '1,000' / '1.5K' / '2M' -> float"""
+    m = TICK_VALUE_RE.fullmatch((text or "").strip().replace(",", ""))
+    if not m:
+        return None
+    return float(m.group(1)) * TICK_SUFFIXES[m.group(2).upper()]
+
+
+def tick_points(ticks):
+    """(y, Wert) aller auswertbaren Y-Achsen-Ticks [(transform, text), ...]."""
+    points = []
+    for transform, text in ticks:
+        m = TRANSLATE_RE.search(transform or "")
+        value = _tick_value(text)
+        if m and value is not None:
+            points.append((float(m.group(2)), value))
+    return points
+
+
+def axis_fit_from_ticks(ticks):
+    """Lineare Abbildung y -> Wert (slope, intercept) per kleinsten Quadraten über alle Ticks.
+
+    Robuster als nur kleinster und größter Tick: ein einzelner gerundeter oder verschobener Tick
+    verfälscht die Steigung kaum. None bei weniger als zwei verschiedenen Positionen.
+    """
+    points = tick_points(ticks)
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_y = sum(y for y, _ in points) / n
+    mean_value = sum(v for _, v in points) / n
+    variance = sum((y - mean_y) ** 2 for y, _ in points)
+    if variance == 0:
+        return None
+    slope = sum((y - mean_y) * (v - mean_value) for y, v in points) / variance
+    return slope, mean_value - slope * mean_y
+
+
+def conversion_factor_from_ticks(ticks):
+    """Streams pro Pixel aus den Y-Achsen-Ticks [(transform, text), ...]."""
+    fit = axis_fit_from_ticks(ticks)
+    if fit is None or fit[0] == 0:
+        return 0.5
+    return abs(fit[0])
+
+
+def chart_bottom_from_transform(transform_val):
+    if transform_val:
+        m = re.search(r"translate\([^,]+,\s*([^)]+)\)", transform_val)
+        if m:
+            try:
+                return float(m.group(1))
+            except Exception:
+                pass
+    return 290.0
+
+
+def bar_height_from_style(style_str, chart_bottom):
+    m = BAR_Y_RE.search(style_str or "")
+    if m:
+        try:
+            bar_y = float(m.group(1))
+            return chart_bottom - bar_y
+        except Exception:
+            return 0
+    return 0
+
+
+def chart_labels(raw, url, bar_count):
+    """Achsenbeschriftungen, oder aus dem 'from'-Parameter der URL erzeugte Tage."""
+    provided_labels = raw.get("labels", [])
+    if len(provided_labels) == bar_count:
+        return list(provided_labels)
+    qparams = urllib.parse.parse_qs(urllib.parse.urlparse(url).query)
+    try:
+        from_ts = int(qparams.get("from", [0])[0])
+        from_date = datetime.fromtimestamp(from_ts / 1000)
+    except Exception:
+        from_date = datetime.now() - timedelta(days=bar_count - 1)
+    return [(from_date + timedelta(days=i)).strftime("%b %d") for i in range(bar_count)]
+
+
+def bar_heights(styles, chart_bottom):
+    """Balkenhöhen aller Balken in einem Durchlauf (0 für Balken ohne translate3d)."""
+    positions = (BAR_Y_RE.search(style or "") for style in styles)
+    return [chart_bottom - float(m.group(1)) if m else 0 for m in positions]
+
+
+def decode_chart(raw, url):
+    """Tageswerte aus den Balkenhöhen des SoundCloud-Diagramms: (total, daily)."""
+    bars = raw.get("bars")
+    if bars is None:
+        return 0, {}
+    conversion_factor = conversion_factor_from_ticks(raw.get("ticks", []))
+    chart_bottom = chart_bottom_from_transform(raw.get("x_axis_transform"))
+    values = [int(round(height * conversion_factor)) for height in bar_heights(bars, chart_bottom)]
+    daily_data = dict(zip(chart_labels(raw, url, len(bars)), values))
+    return sum(daily_data.values()), daily_data
@@ -0,0 +1,77 @@
+import datetime
+import os
+import urllib.parse
+
+from scrapers.network_capture import spotify_day_label
+from scrapers.timeseries_store import SPOTIFY_WINDOWS
+
+# Inkrementeller Modus: statt 7/28/365 Tage bei jedem Lauf nur den kleinsten Bereich laden,
+# der fehlende Tage und die letzten, sich noch ändernden Tage abdeckt. Die vollen Fenster
+# werden danach aus der gespeicherten Historie berechnet.
+
+SPOTIFY_INCREMENTAL = os.getenv("SPOTIFY_INCREMENTAL", "0") == "1"
+# Die jüngsten Tage werden von Spotify noch nachkorrigiert und daher immer neu geladen
+SETTLE_DAYS = int(os.getenv("INCREMENTAL_SETTLE_DAYS", "3"))
+HISTORY_DAYS = max(SPOTIFY_WINDOWS.values())
+
+
+def plan_range(store, platform, artist, metric, to_date, history_days=HISTORY_DAYS, settle_days=SETTLE_DAYS):
+    """Frühester benötigter Tag (fehlend oder noch nicht abgeschlossen) bis to_date, oder None.
+
+    Tage, die schon einmal ohne Wert abgefragt wurden (siehe mark_checked), zählen als bekannt;
+    sonst würde eine dauerhafte Lücke jeden Lauf wieder auf die volle Historie ausdehnen.
+    """
+    window_start = to_date - datetime.timedelta(days=history_days - 1)
+    known = store.dates(platform, artist, metric, window_start, to_date)
+    known |= store.checked_dates(platform, artist, metric, window_start, to_date)
+    settled_until = to_date - datetime.timedelta(days=settle_days)
+    day = window_start
+    while day <= to_date:
+        if day not in known or day > settled_until:
+            return day
+        day += datetime.timedelta(days=1)
+    return None
+
+
+def plan_spotify_urls(store, artist_id, to_date, build_url):
+    """{timeframe: url} mit höchstens einer Seite für den inkrementellen Lauf."""
+    from_date = plan_range(store, "spotify", artist_id, "streams", to_date)
+    if from_date is None:
+        return {}
+    days = (to_date - from_date).days + 1
+    print(f"🔁 Inkrementell: {days} Tage ({from_date} bis {to_date}) statt {sum(SPOTIFY_WINDOWS.values())}")
+    return {f"Delta {days} Tage": build_url(artist_id, from_date, to_date)}
+
+
+def mark_checked(store, artist_id, urls, results):
+    """Vermerkt die Bereiche der Statistik-URLs, für die Spotify Tageswerte geliefert hat."""
+    for timeframe, url in urls.items():
+        # Ohne Tageswerte (Fehler, Drosselung) bleibt der Bereich offen und wird erneut geladen
+        if not (results.get(timeframe) or {}).get("daily"):
+            continue
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(url).query)
+        try:
+            start = datetime.date.fromisoformat(query["fromDate"][0])
+            end = datetime.date.fromisoformat(query["toDate"][0])
+        except (KeyError, ValueError):
+            continue
+        store.mark_checked("spotify", artist_id, "streams", start, end)
+
+
+def derive_window(store, platform, artist, metric, to_date, days, label=spotify_day_label):
+    """Fenster der letzten days Tage bis to_date aus der Historie: {"total", "daily"}."""
+    from_date = to_date - datetime.timedelta(days=days - 1)
+    daily = {
+        label(datetime.date.fromisoformat(day)): value
+        for day, value in store.query(platform, artist, metric, from_date, to_date)
+    }
+    return {"total": sum(daily.values()), "daily": daily, "complete": len(daily) == days}
+
+
+def derive_spotify_windows(store, artist_id, to_date):
+    """Die bekannten Spotify-Fenster (7 Tage, 28 Tage, 12 Monate) wie bei einem vollen Lauf."""
+    results = {}
+    for timeframe, days in SPOTIFY_WINDOWS.items():
+        window = derive_window(store, "spotify", artist_id, "streams", to_date, days)
+        results[timeframe] = {"timeframe": timeframe, **window}
+    return results
@@ -0,0 +1,215 @@
+import asyncio
+import itertools
+import json
+import os
+import sqlite3
+import time
+import uuid
+from collections import OrderedDict
+
+# Scrape-Jobs: Einreichen liefert sofort eine Job-ID, ein fester Pool von Workern arbeitet die
+# Warteschlange nach Priorität ab. Optional werden Jobs in SQLite gespeichert (überleben Neustarts).
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_DB_PATH = os.getenv("JOB_DB_PATH")
+# Anzahl abgeschlossener Jobs, die im Speicher abrufbar bleiben
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "1000"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Job:
+    def __init__(self, kind, payload, priority=0, dedup_key=None, job_id=None, created_at=None):
+        self.id = job_id or uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.priority = priority
+        self.dedup_key = dedup_key
+        self.status = QUEUED
+        self.created_at = created_at or time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def to_dict(self):
+        queued_until = self.started_at or self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "payload": self.payload,
+            "priority": self.priority,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queued_seconds": round(queued_until - self.created_at, 3),
+            "run_seconds": round(self.finished_at - self.started_at, 3) if self.started_at and self.finished_at else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class SQLiteJobBackend:
+    """Dauerhafte Ablage der Jobs in einer SQLite-Datei."""
+
+    def __init__(self, path=JOB_DB_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                dedup_key TEXT,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                result TEXT,
+                error TEXT
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+        self._conn.commit()
+
+    def save(self, job):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job.id, job.kind, json.dumps(job.payload), job.priority, job.dedup_key, job.status,
+                job.created_at, job.started_at, job.finished_at,
+                json.dumps(job.result) if job.result is not None else None, job.error,
+            ),
+        )
+        self._conn.commit()
+
+    def _from_row(self, row):
+        job = Job(row[1], json.loads(row[2]), row[3], row[4], job_id=row[0], created_at=row[6])
+        job.status, job.started_at, job.finished_at = row[5], row[7], row[8]
+        job.result = json.loads(row[9]) if row[9] is not None else None
+        job.error = row[10]
+        return job
+
+    def get(self, job_id):
+        row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def load_pending(self):
+        """Nicht abgeschlossene Jobs (auch beim Neustart unterbrochene) wieder als 'queued'."""
+        rows = self._conn.execute(
+            "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+        ).fetchall()
+        jobs = []
+        for row in rows:
+            job = self._from_row(row)
+            job.status, job.started_at = QUEUED, None
+            jobs.append(job)
+        return jobs
+
+    def close(self):
+        self._conn.close()
+
+
+class JobQueue:
+    """Warteschlange mit Prioritäten (höherer Wert zuerst) und Deduplizierung über dedup_key."""
+
+    def __init__(self, handlers, workers=JOB_WORKERS, backend=None):
+        self.handlers = handlers  # kind -> async fn(payload)
+        self.workers = max(1, workers)
+        self.backend = backend
+        self._queue = asyncio.PriorityQueue()
+        self._jobs = OrderedDict()
+        self._active_by_key = {}
+        self._seq = itertools.count()
+        self._tasks = []
+
+    async def start(self):
+        if self.backend:
+            restored = [job for job in self.backend.load_pending() if job.id not in self._jobs]
+            for job in restored:
+                self._enqueue(job)
+            if restored:
+                print(f"[INFO] {len(restored)} unterbrochene Jobs wieder eingereiht")
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.backend:
+            self.backend.close()
+
+    def submit(self, kind, payload, priority=0, dedup_key=None):
+        """Reiht einen Job ein; läuft bereits ein Job mit gleichem dedup_key, wird dieser zurückgegeben."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unbekannter Job-Typ: {kind}")
+        if dedup_key is not None:
+            existing = self._jobs.get(self._active_by_key.get(dedup_key))
+            if existing is not None and existing.active:
+                return existing
+        job = Job(kind, payload, priority, dedup_key)
+        self._enqueue(job)
+        return job
+
+    def _enqueue(self, job):
+        self._jobs[job.id] = job
+        if job.dedup_key is not None:
+            self._active_by_key[job.dedup_key] = job.id
+        self._save(job)
+        self._queue.put_nowait((-job.priority, next(self._seq), job.id))
+
+    def get(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None and self.backend:
+            job = self.backend.get(job_id)
+        return job
+
+    def _save(self, job):
+        if self.backend:
+            self.backend.save(job)
+
+    async def _worker(self):
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            try:
+                if job is not None and job.status == QUEUED:
+                    await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job):
+        job.status, job.started_at = RUNNING, time.time()
+        self._save(job)
+        try:
+            job.result = await self.handlers[job.kind](job.payload)
+            job.status = DONE
+        except asyncio.CancelledError:
+            # Shutdown: Job bleibt 'running' und wird beim nächsten Start erneut eingereiht
+            raise
+        except Exception as e:
+            job.status, job.error = FAILED, str(e)
+        job.finished_at = time.time()
+        self._save(job)
+        if self._active_by_key.get(job.dedup_key) == job.id:
+            del self._active_by_key[job.dedup_key]
+        self._trim_history()
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[: max(0, len(finished) - JOB_HISTORY)]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return {"workers": self.workers, "durable": self.backend is not None, **counts}
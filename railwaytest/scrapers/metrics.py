@@ -0,0 +1,207 @@
+import asyncio
+import contextvars
+import json
+import math
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from scrapers.rate_limit import BlockedError
+
+# Zeitmessung pro Phase (Browserstart, goto, Warten, Extraktion, Parsen, Speichern ...) für alle
+# Scraper, ausgegeben im Prometheus-Textformat unter /metrics. Optional eine JSON-Logzeile pro Scrape.
+
+METRICS_JSON_LOGS = os.getenv("METRICS_JSON_LOGS", "0") == "1"
+
+PHASE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SCRAPE_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.values = {}
+
+    def inc(self, labels=(), amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield self.name, _format_labels(self.labels, labels), value
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def set(self, labels=(), value=0):
+        self.values[labels] = value
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=PHASE_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets) + (math.inf,)
+        self.values = {}  # labels -> [counts pro Bucket, sum, count]
+
+    def observe(self, labels, value):
+        entry = self.values.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[0][i] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def samples(self):
+        for labels, (counts, total, count) in sorted(self.values.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket", _format_labels(self.labels, labels, [le]), bucket_count
+            yield f"{self.name}_sum", _format_labels(self.labels, labels), round(total, 6)
+            yield f"{self.name}_count", _format_labels(self.labels, labels), count
+
+
+phase_seconds = Histogram(
+    "streamfloat_phase_seconds", "Dauer einzelner Scrape-Phasen", ("phase", "platform", "outcome"),
+)
+scrape_seconds = Histogram(
+    "streamfloat_scrape_seconds", "Gesamtdauer eines Scrapes", ("platform", "outcome"), SCRAPE_BUCKETS,
+)
+wait_seconds = Histogram(
+    "streamfloat_wait_seconds", "Bedingungsbasierte Wartezeiten (readiness)", ("platform", "outcome"),
+)
+http_request_seconds = Histogram(
+    "streamfloat_http_request_seconds", "Dauer der API-Requests", ("method", "path", "status"),
+)
+scrapes_in_flight = Gauge("streamfloat_scrapes_in_flight", "Laufende Scrapes", ("platform",))
+browsers_open = Gauge("streamfloat_browsers_open", "Offene Browser-Instanzen", ("kind",))
+browser_contexts_in_use = Gauge("streamfloat_browser_contexts_in_use", "Belegte Kontexte im Browser-Pool")
+backend_import_seconds = Gauge("streamfloat_backend_import_seconds", "Dauer des ersten Imports je Scraper-Backend", ("backend",))
+startup_seconds = Gauge("streamfloat_startup_seconds", "Dauer der Startphasen des Dienstes", ("phase",))
+
+REGISTRY = [
+    phase_seconds, scrape_seconds, wait_seconds, http_request_seconds,
+    scrapes_in_flight, browsers_open, browser_contexts_in_use, backend_import_seconds, startup_seconds,
+]
+
+# Aktueller Scrape (Plattform + gesammelte Phasen), wird an Tasks und Tabs vererbt
+_current = contextvars.ContextVar("streamfloat_scrape", default=None)
+
+
+class ScrapeTrace:
+    def __init__(self, platform, fields):
+        self.platform = platform
+        self.fields = fields
+        self.phases = []
+
+
+def outcome_of(exc):
+    if exc is None:
+        return "ok"
+    if isinstance(exc, BlockedError):
+        return "blocked"
+    if isinstance(exc, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(exc, asyncio.CancelledError):
+        return "cancelled"
+    return "error"
+
+
+def current_platform(default="unknown"):
+    trace = _current.get()
+    return trace.platform if trace else default
+
+
+@contextmanager
+def phase(name, platform=None):
+    """Misst einen Abschnitt; funktioniert in sync und async Code (with statt async with)."""
+    platform = platform or current_platform()
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        outcome = outcome_of(error)
+        phase_seconds.observe((name, platform, outcome), seconds)
+        trace = _current.get()
+        if trace is not None:
+            trace.phases.append({"phase": name, "seconds": round(seconds, 3), "outcome": outcome})
+
+
+@asynccontextmanager
+async def scrape(platform, **fields):
+    """Klammert einen Scrape: In-flight-Zähler, Gesamtdauer und optional eine JSON-Logzeile."""
+    trace = ScrapeTrace(platform, fields)
+    token = _current.set(trace)
+    scrapes_in_flight.inc((platform,))
+    start = time.perf_counter()
+    error = None
+    try:
+        yield trace
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        outcome = outcome_of(error)
+        scrapes_in_flight.dec((platform,))
+        scrape_seconds.observe((platform, outcome), seconds)
+        _current.reset(token)
+        if METRICS_JSON_LOGS:
+            print(json.dumps({
+                "event": "scrape",
+                "platform": platform,
+                "outcome": outcome,
+                "seconds": round(seconds, 3),
+                "error": str(error) if error is not None and outcome != "cancelled" else None,
+                "phases": trace.phases,
+                **fields,
+            }, ensure_ascii=False, default=str), flush=True)
+
+
+def observe_wait(seconds, ok):
+    wait_seconds.observe((current_platform(), "met" if ok else "timeout"), seconds)
+
+
+def browser_opened(kind):
+    browsers_open.inc((kind,))
+
+
+def browser_closed(kind):
+    browsers_open.dec((kind,))
+
+
+def render():
+    """Alle Metriken im Prometheus-Textformat (0.0.4)."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{labels} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
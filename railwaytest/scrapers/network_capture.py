@@ -0,0 +1,324 @@
+import asyncio
+import base64
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+from scrapers.resource_blocking import block_resources_nodriver
+
+# Zeichnet die JSON-Antworten (XHR/fetch) auf, die die Seiten beim Laden ohnehin abrufen,
+# und liest daraus exakte Werte. Passt keine Antwort, bleibt der DOM-Weg als Fallback.
+
+NETWORK_CAPTURE = os.getenv("NETWORK_CAPTURE", "1") == "1"
+# Nachlaufzeit, nachdem das Diagramm sichtbar ist, bevor auf den DOM-Weg gewechselt wird
+CAPTURE_GRACE = float(os.getenv("NETWORK_CAPTURE_GRACE", "0.5"))
+
+CAPTURE_PATTERNS = {
+    "spotify_public": [r"api-partner\.spotify\.com/pathfinder/", r"/pathfinder/v\d/query"],
+    "spotify_artists": [r"generic\.wg\.spotify\.com/s4x-insights-api/", r"s4x-insights-api"],
+    "soundcloud": [r"graph\.soundcloud\.com/graphql", r"api-v2\.soundcloud\.com/.*insights", r"insights-api"],
+}
+
+# Bekannte Zeitreihen-Antworten je Plattform: URL-Muster, Pfad zur Liste und Schlüssel je Punkt.
+# Andere Antworten derselben Seite (Top-Tracks, Länder ...) werden dafür nicht ausgewertet.
+SERIES_ENDPOINTS = {
+    "spotify_artists": [
+        {"url": r"s4x-insights-api/.*/(?:streams|timeline)\b", "path": ("timelinePoint",), "date": "date", "value": "num"},
+    ],
+    "soundcloud": [
+        {"url": r"insights-api/.*/timeseries\b", "path": ("data", "timeseries"), "date": "timestamp", "value": "value"},
+    ],
+}
+
+# Nur für die generische Suche (Fallback, wenn keine bekannte Antwort passt)
+DATE_KEYS = ("date", "timestamp", "time", "day", "timeStamp", "startDate", "start", "period", "bucket", "x")
+VALUE_KEYS = ("value", "streams", "plays", "count", "total", "num", "amount", "y")
+
+
+class NetworkCapture:
+    """Sammelt passende JSON-Antworten einer Seite."""
+
+    def __init__(self, platform):
+        self.platform = platform
+        self.patterns = [re.compile(p) for p in CAPTURE_PATTERNS.get(platform, [])]
+        self.responses = []  # (url, json)
+        self._changed = asyncio.Event()
+
+    def matches(self, url):
+        return any(p.search(url) for p in self.patterns)
+
+    def add(self, url, body):
+        try:
+            data = json.loads(body)
+        except (TypeError, ValueError):
+            return
+        self.responses.append((url, data))
+        self._changed.set()
+
+    def find(self, parser):
+        """Erstes Ergebnis von parser(json, url) über alle Antworten (neueste zuerst)."""
+        for url, data in reversed(self.responses):
+            try:
+                result = parser(data, url)
+            except Exception:
+                result = None
+            if result:
+                return result
+        return None
+
+    async def wait_for(self, parser, timeout=10, until=None):
+        """Wartet auf eine Antwort, aus der parser etwas liest.
+
+        Ist until (Task, z. B. 'Diagramm gerendert') fertig, wird nur noch CAPTURE_GRACE gewartet.
+        Hat parser eine strengere Variante (parser.specific), zählen bis dahin nur bekannte Antworten;
+        parser selbst (mit generischer Suche) erst, wenn die Wartezeit abgelaufen ist.
+        """
+        specific = getattr(parser, "specific", parser)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            result = self.find(specific)
+            if result:
+                return result
+            if until is not None and until.done():
+                deadline = min(deadline, loop.time() + CAPTURE_GRACE)
+                until = None
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return self.find(parser) if specific is not parser else None
+            self._changed.clear()
+            waiters = [asyncio.ensure_future(self._changed.wait())]
+            if until is not None:
+                waiters.append(until)
+            await asyncio.wait(waiters, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            waiters[0].cancel()
+
+
+async def capture_or_wait(capture, parser, ready, timeout=10):
+    """Wartet parallel auf eine passende Antwort und auf ready (DOM-Weg).
+
+    Liefert das Ergebnis aus der Antwort oder None; bei None ist ready abgeschlossen.
+    """
+    ready_task = asyncio.ensure_future(ready)
+    result = await capture.wait_for(parser, timeout, until=ready_task) if capture is not None else None
+    if result:
+        ready_task.cancel()
+        return result
+    await ready_task
+    return None
+
+
+def attach_playwright(page, capture):
+    """Registriert die Aufzeichnung auf einer Playwright-Page (vor page.goto aufrufen)."""
+
+    async def on_response(response):
+        if not capture.matches(response.url):
+            return
+        if "json" not in response.headers.get("content-type", ""):
+            return
+        try:
+            capture.add(response.url, await response.text())
+        except Exception:
+            pass
+
+    page.on("response", on_response)
+    return capture
+
+
+async def attach_nodriver(tab, capture):
+    """Registriert die Aufzeichnung per CDP Network-Domain auf einem nodriver-Tab.
+
+    Die Handler werden pro Tab nur einmal angemeldet und schreiben in die jeweils aktuelle Capture.
+    """
+    from nodriver import cdp
+
+    already_attached = getattr(tab, "_network_capture", None) is not None
+    tab._network_capture = capture
+    if already_attached:
+        return capture
+
+    pending = {}  # request_id -> url
+
+    def on_response_received(event):
+        response = event.response
+        if tab._network_capture.matches(response.url) and "json" in (response.mime_type or ""):
+            pending[event.request_id] = response.url
+
+    async def on_loading_finished(event):
+        url = pending.pop(event.request_id, None)
+        if url is None:
+            return
+        try:
+            body, is_base64 = await tab.send(cdp.network.get_response_body(event.request_id))
+            tab._network_capture.add(url, base64.b64decode(body).decode("utf-8") if is_base64 else body)
+        except Exception as e:
+            print(f"[WARN] Antwort von {url} konnte nicht gelesen werden: {e}")
+
+    tab.add_handler(cdp.network.ResponseReceived, on_response_received)
+    tab.add_handler(cdp.network.LoadingFinished, on_loading_finished)
+    await tab.send(cdp.network.enable())
+    return capture
+
+
+async def open_capturing(driver, url, platform, new_tab=False):
+    """Wie open_blocked, zusätzlich mit Aufzeichnung der JSON-Antworten.
+
+    Liefert (tab, capture); capture ist None, wenn NETWORK_CAPTURE deaktiviert ist.
+    """
+    tab = await driver.get("about:blank", new_tab=new_tab)
+    await block_resources_nodriver(tab, platform)
+    capture = None
+    if NETWORK_CAPTURE:
+        capture = await attach_nodriver(tab, NetworkCapture(platform))
+    await tab.get(url)
+    return tab, capture
+
+
+# ---------------------------------------------------------------------------
+# Parser für die aufgezeichneten Antworten
+# ---------------------------------------------------------------------------
+
+def _to_int(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(round(value))
+    if isinstance(value, str) and re.fullmatch(r"\d+(\.\d+)?", value.strip()):
+        return int(round(float(value)))
+    return None
+
+
+def _to_datetime(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if isinstance(value, (int, float)):
+        if value > 1e11:
+            value = value / 1000
+        if value > 1e8:
+            return datetime.fromtimestamp(value, tz=timezone.utc).replace(tzinfo=None)
+        return None
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            return parsed.replace(tzinfo=None)
+        except ValueError:
+            return None
+    return None
+
+
+def _series_from_list(items, date_keys=DATE_KEYS, value_keys=VALUE_KEYS):
+    if not items or not all(isinstance(item, dict) for item in items):
+        return None
+    points = []
+    for item in items:
+        date_value = next((item[k] for k in date_keys if k in item), None)
+        number = next((_to_int(item[k]) for k in value_keys if k in item and _to_int(item[k]) is not None), None)
+        day = _to_datetime(date_value)
+        if day is None or number is None:
+            return None
+        points.append((day, number))
+    return points
+
+
+def known_series(platform, data, url=None):
+    """Zeitreihe aus einer bekannten Antwort der Plattform: [(datetime, int), ...].
+
+    [] für eine bekannte Antwort ohne Punkte, None, wenn keine bekannte Antwort passt. Ohne url
+    entscheiden nur Pfad und Schlüssel.
+    """
+    for endpoint in SERIES_ENDPOINTS.get(platform, []):
+        if url is not None and not re.search(endpoint["url"], url):
+            continue
+        node = data
+        for key in endpoint["path"]:
+            node = node.get(key) if isinstance(node, dict) else None
+        if not isinstance(node, list):
+            continue
+        if not node:
+            return []
+        points = _series_from_list(node, (endpoint["date"],), (endpoint["value"],))
+        if points:
+            return points
+    return None
+
+
+def find_time_series(data):
+    """Generische Suche: längste Liste von {datum, wert}-Objekten irgendwo im JSON: [(datetime, int), ...].
+
+    Die Schlüssel sind sehr allgemein und passen auch auf andere Listen; nur als Fallback zu known_series.
+    """
+    best = None
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            points = _series_from_list(node)
+            if points and (best is None or len(points) > len(best)):
+                best = points
+            stack.extend(node)
+        elif isinstance(node, dict):
+            stack.extend(node.values())
+    return best
+
+
+def spotify_day_label(day):
+    # Gleiches Format wie die aria-labels im DOM: "Mar 5, 2025"
+    return f"{day:%b} {day.day}, {day.year}"
+
+
+def soundcloud_day_label(day):
+    # Gleiches Format wie die Achsenbeschriftungen im DOM: "Mar 05"
+    return day.strftime("%b %d")
+
+
+def soundcloud_month_label(day):
+    return day.strftime("%B %Y")
+
+
+def series_parser(label, platform=None):
+    """Parser für Zeitreihen-Antworten: parse(json, url=None, generic=True) liefert (total, daily) oder None.
+
+    Zuerst die bekannten Antworten der Plattform; die generische Suche nur mit generic=True und
+    mit Log-Meldung. parse.specific ist die Variante ohne generische Suche.
+    """
+
+    def parse(data, url=None, generic=True):
+        points = known_series(platform, data, url)
+        if points is None and generic:
+            points = find_time_series(data)
+            if points:
+                print(f"[WARN] Zeitreihe nur per generischer Suche gefunden ({platform or '-'}, {url or 'ohne URL'})")
+        if not points:
+            return None
+        # Gröbere Labels (Monat) fassen mehrere Tage zusammen: summieren statt überschreiben
+        daily = {}
+        for day, value in sorted(dict(points).items()):
+            key = label(day)
+            daily[key] = daily.get(key, 0) + value
+        return sum(daily.values()), daily
+
+    parse.specific = lambda data, url=None: parse(data, url, generic=False)
+    return parse
+
+
+def parse_artist_overview(data, url=None):
+    """monthly_listeners und Top-Tracks aus der Pathfinder-Antwort (queryArtistOverview).
+
+    url wird nicht gebraucht (Signatur wie series_parser), die Antwort ist am Pfad eindeutig erkennbar.
+    """
+    artist = (data.get("data") or {}).get("artistUnion") if isinstance(data, dict) else None
+    if not artist:
+        return None
+    listeners = _to_int((artist.get("stats") or {}).get("monthlyListeners"))
+    items = ((artist.get("discography") or {}).get("topTracks") or {}).get("items") or []
+    tracks = []
+    for item in items:
+        track = item.get("track") or {}
+        if track.get("name"):
+            tracks.append({"track_name": track["name"], "play_count": _to_int(track.get("playcount"))})
+    if listeners is None and not tracks:
+        return None
+    return {"monthly_listeners": listeners, "tracks": tracks}
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import random
+import time
+import urllib.parse
+
+# Token-Bucket pro Host mit adaptivem Backoff: erkennt der Scraper eine Drosselung (HTTP 429,
+# Captcha, "unusual traffic"), halbiert sich die Rate und der Host pausiert exponentiell länger;
+# nach Erfolgen steigt die Rate schrittweise wieder bis zum konfigurierten Wert.
+
+# Anfragen pro Sekunde und Host, Burst = wie viele Anfragen ohne Wartezeit direkt hintereinander gehen
+CRAWL_HOST_RATE = float(os.getenv("CRAWL_HOST_RATE", "0.5"))
+CRAWL_HOST_BURST = int(os.getenv("CRAWL_HOST_BURST", "2"))
+# Abweichende Raten pro Host, z. B. "artists.spotify.com=0.2,open.spotify.com=1"
+CRAWL_HOST_RATES = os.getenv("CRAWL_HOST_RATES", "")
+CRAWL_BACKOFF_BASE = float(os.getenv("CRAWL_BACKOFF_BASE", "30"))
+CRAWL_BACKOFF_MAX = float(os.getenv("CRAWL_BACKOFF_MAX", "900"))
+# Anteil der Maximalrate, um den die Rate nach jedem Erfolg wieder steigt
+RECOVERY_STEP = 0.1
+
+# Erkennt Drossel- und Captcha-Seiten; liefert den Grund oder null
+BLOCK_CHECK_JS = """
+(() => {
+  if (/(^|\\.)challenge\\.spotify\\.com$/.test(location.hostname)) return 'challenge';
+  if (document.querySelector('iframe[src*="recaptcha"], iframe[src*="hcaptcha"], iframe[src*="captcha"], #captcha, .g-recaptcha')) return 'captcha';
+  const text = ((document.title || '') + ' ' + (document.body ? document.body.innerText.slice(0, 2000) : '')).toLowerCase();
+  if (text.includes('too many requests') || /\\b429\\b/.test(document.title || '')) return 'too many requests';
+  if (text.includes('unusual traffic') || text.includes('verify you are human')) return 'captcha';
+  return null;
+})()
+"""
+
+
+class BlockedError(Exception):
+    """Die Plattform drosselt oder zeigt ein Captcha statt der Daten."""
+
+    def __init__(self, reason, url=None, retry_after=None):
+        super().__init__(f"Blockiert ({reason}): {url}" if url else f"Blockiert ({reason})")
+        self.reason = reason
+        self.url = url
+        self.retry_after = retry_after
+
+
+async def raise_if_blocked(page, url=None):
+    """Wirft BlockedError, wenn die geladene Seite eine Drossel- oder Captcha-Seite ist."""
+    try:
+        reason = await page.evaluate(BLOCK_CHECK_JS)
+    except Exception:
+        return
+    if reason:
+        raise BlockedError(reason, url)
+
+
+def retry_after_seconds(value):
+    """Retry-After-Header (Sekunden) -> float oder None."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, rate=CRAWL_HOST_RATE, burst=CRAWL_HOST_BURST, min_rate=None):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate or rate / 16
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.strikes = 0
+        self.throttle_events = 0
+        self.waited = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wartet auf ein Token; Wartende kommen der Reihe nach dran."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                else:
+                    self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    delay = (1 - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+
+    def throttled(self, retry_after=None):
+        """Drosselung erkannt: Rate halbieren und den Host pausieren. Liefert die Pause in Sekunden."""
+        self.strikes += 1
+        self.throttle_events += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        if retry_after is None:
+            pause = min(CRAWL_BACKOFF_MAX, CRAWL_BACKOFF_BASE * 2 ** (self.strikes - 1))
+            pause *= random.uniform(1.0, 1.25)  # Jitter, damit Worker nicht gleichzeitig wieder anfragen
+        else:
+            pause = retry_after
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + pause)
+        self.tokens = 0.0
+        self.updated = now
+        return pause
+
+    def succeeded(self):
+        self.strikes = 0
+        self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+    def stats(self):
+        return {
+            "rate": round(self.rate, 4),
+            "max_rate": self.max_rate,
+            "strikes": self.strikes,
+            "throttle_events": self.throttle_events,
+            "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 1),
+            "waited_seconds": round(self.waited, 1),
+        }
+
+
+def parse_host_rates(spec):
+    """'host=rate,host=rate' -> {host: rate}"""
+    rates = {}
+    for part in spec.split(","):
+        host, _, rate = part.partition("=")
+        if host.strip() and rate.strip():
+            rates[host.strip()] = float(rate)
+    return rates
+
+
+class HostLimiter:
+    """Ein TokenBucket pro Host (aus der URL)."""
+
+    def __init__(self, rate=CRAWL_HOST_RATE, burst=CRAWL_HOST_BURST, host_rates=None):
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = parse_host_rates(CRAWL_HOST_RATES) if host_rates is None else host_rates
+        self.buckets = {}
+
+    def bucket(self, url):
+        host = urllib.parse.urlparse(url).hostname or url
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.host_rates.get(host, self.rate), self.burst)
+        return self.buckets[host]
+
+    def stats(self):
+        return {host: bucket.stats() for host, bucket in self.buckets.items()}
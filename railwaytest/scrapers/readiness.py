@@ -0,0 +1,103 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+
+from scrapers.metrics import observe_wait
+
+# Bedingungsbasiertes Warten für Playwright-Pages und nodriver-Tabs.
+# Beide bieten page.evaluate(ausdruck), daher wird jede Bedingung als JS-Ausdruck gepollt.
+
+WAIT_POLL_INTERVAL = float(os.getenv("WAIT_POLL_INTERVAL", "0.2"))
+
+# Letzte gemessene Wartezeiten: {"name", "seconds", "ok"}
+wait_timings = deque(maxlen=500)
+
+
+def _record(name, start, ok):
+    seconds = time.monotonic() - start
+    wait_timings.append({"name": name, "seconds": round(seconds, 3), "ok": ok})
+    observe_wait(seconds, ok)
+    status = "erfüllt" if ok else "Timeout"
+    print(f"[INFO] Warten auf {name}: {seconds:.2f}s ({status})")
+    return ok
+
+
+async def _evaluate(page, expression):
+    try:
+        return await page.evaluate(expression)
+    except Exception:
+        return None
+
+
+async def wait_until(page, expression, name, timeout=10, interval=WAIT_POLL_INTERVAL):
+    """Wartet, bis der JS-Ausdruck truthy ist. Gibt False bei Timeout zurück."""
+    start = time.monotonic()
+    while True:
+        if await _evaluate(page, expression):
+            return _record(name, start, True)
+        if time.monotonic() - start >= timeout:
+            return _record(name, start, False)
+        await asyncio.sleep(interval)
+
+
+async def wait_for_stable(page, expression, name, timeout=10, stable_for=1.0,
+                          accept=bool, interval=WAIT_POLL_INTERVAL):
+    """Wartet, bis der Wert des JS-Ausdrucks akzeptiert ist und sich stable_for Sekunden nicht ändert."""
+    start = time.monotonic()
+    last_value, last_change = None, start
+    while True:
+        value = await _evaluate(page, expression)
+        now = time.monotonic()
+        if value != last_value:
+            last_value, last_change = value, now
+        elif accept(value) and now - last_change >= stable_for:
+            return _record(name, start, True)
+        if now - start >= timeout:
+            return _record(name, start, False)
+        await asyncio.sleep(interval)
+
+
+async def wait_for_selector(page, selector, timeout=10, min_count=1):
+    """Wartet, bis mindestens min_count Elemente zum Selektor existieren."""
+    expression = f"document.querySelectorAll({json.dumps(selector)}).length >= {int(min_count)}"
+    return await wait_until(page, expression, f"Selektor {selector}", timeout)
+
+
+async def wait_for_selector_gone(page, selector, timeout=2):
+    expression = f"document.querySelector({json.dumps(selector)}) === null"
+    return await wait_until(page, expression, f"Verschwinden von {selector}", timeout)
+
+
+async def wait_for_stable_count(page, selector, timeout=10, stable_for=1.0, min_count=1):
+    """Wartet, bis sich die Anzahl der Elemente (z. B. Track-Zeilen) nicht mehr ändert."""
+    expression = f"document.querySelectorAll({json.dumps(selector)}).length"
+    return await wait_for_stable(
+        page, expression, f"stabile Anzahl {selector}", timeout, stable_for,
+        accept=lambda count: (count or 0) >= min_count,
+    )
+
+
+async def wait_for_network_idle(page, timeout=10, idle_for=0.5):
+    """Wartet, bis für idle_for Sekunden keine neuen Ressourcen mehr geladen wurden."""
+    # Als String: nodriver liefert für falsy Ergebnisse (auch 0) None, das wäre von "nicht auswertbar"
+    # nicht zu unterscheiden
+    expression = "String(performance.getEntriesByType('resource').length)"
+    return await wait_for_stable(
+        page, expression, "Netzwerk-Leerlauf", timeout, idle_for, accept=lambda count: count is not None,
+    )
+
+
+async def wait_for_chart_bars(page, selector, timeout=10, stable_for=0.5):
+    """Wartet, bis Balken vorhanden sind und ihre Animation (style/height/aria-label) beendet ist."""
+    expression = (
+        f"Array.from(document.querySelectorAll({json.dumps(selector)}))"
+        ".map(e => (e.getAttribute('style') || '') + (e.getAttribute('height') || '')"
+        " + (e.getAttribute('aria-label') || '')).join('|')"
+    )
+    return await wait_for_stable(page, expression, f"Diagramm-Balken {selector}", timeout, stable_for)
+
+
+def reset_timings():
+    wait_timings.clear()
@@ -0,0 +1,215 @@
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import re
+import time
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from scrapers.extraction import (
+    artist_data_from_html,
+    chart_data_from_html,
+    decode_chart,
+    parse_artist_data,
+    parse_stats_data,
+    stats_data_from_html,
+)
+from scrapers.network_capture import (
+    parse_artist_overview,
+    series_parser,
+    soundcloud_day_label,
+    soundcloud_month_label,
+    spotify_day_label,
+)
+from scrapers.snapshot_archive import JSON, SNAPSHOT_DIR, SnapshotArchive, read_object
+from scrapers.tiered_fetch import parse_artist_http
+from scrapers.timeseries_store import (
+    SOUNDCLOUD_ARTIST,
+    TIMESERIES_DB_PATH,
+    TimeSeriesStore,
+    soundcloud_monthly_rows,
+    soundcloud_streams_rows,
+    spotify_public_rows,
+    spotify_run_rows,
+)
+
+# Neu-Extraktion aus dem Snapshot-Archiv: die aktuellen Extraktoren laufen über die archivierten
+# Rohdaten, verteilt auf einen Prozess-Pool (Parsen ist CPU-gebunden, der GIL würde Threads bremsen).
+# Die Worker lesen nur die Objekt-Dateien; geschrieben wird im Hauptprozess, in Aufnahme-Reihenfolge,
+# damit spätere Snapshots frühere Werte überschreiben.
+#
+#   python -m scrapers.reextract [--platform soundcloud] [--since 2025-01-01] [--workers 8] [--dry-run]
+
+REEXTRACT_WORKERS = int(os.getenv("REEXTRACT_WORKERS", str(os.cpu_count() or 1)))
+# Snapshots pro Auftrag an einen Worker (weniger Pickle-Overhead als einzeln)
+REEXTRACT_CHUNK_SIZE = int(os.getenv("REEXTRACT_CHUNK_SIZE", "32"))
+
+ARTIST_ID_RE = re.compile(r"/artist/([A-Za-z0-9]+)")
+WINDOW_DAYS = {"DAYS_7": 7, "DAYS_30": 30}
+
+parse_spotify_series = series_parser(spotify_day_label, "spotify_artists")
+parse_soundcloud_days = series_parser(soundcloud_day_label, "soundcloud")
+parse_soundcloud_months = series_parser(soundcloud_month_label, "soundcloud")
+
+
+def _artist(entry, default=None):
+    if entry["artist"]:
+        return entry["artist"]
+    m = ARTIST_ID_RE.search(entry["url"] or "")
+    return m.group(1) if m else default
+
+
+def _parse_response(parser, entry, content):
+    # Jede archivierte Antwort ist ein eigener Snapshot: mit bekannter URL keine generische Suche,
+    # sonst würde z. B. eine Länder- oder Top-Track-Antwort als Tageswerte gelesen
+    url = entry["context"].get("response_url")
+    return parser(json.loads(content), url, generic=url is None)
+
+
+def spotify_public_snapshot(entry, content):
+    if entry["kind"] == JSON:
+        data = parse_artist_overview(json.loads(content))
+    else:
+        data = parse_artist_http(content) or parse_artist_data(artist_data_from_html(content))
+    if not data:
+        return []
+    return spotify_public_rows(_artist(entry), {"scrape_time": entry["captured_at"], "data": data})
+
+
+def spotify_stats_snapshot(entry, content):
+    if entry["kind"] == JSON:
+        parsed = _parse_response(parse_spotify_series, entry, content)
+    else:
+        parsed = parse_stats_data(stats_data_from_html(content))
+    if not parsed or not parsed[1]:
+        return []
+    total, daily = parsed
+    timeframe = entry["context"].get("timeframe", "stats")
+    return spotify_run_rows(_artist(entry), {timeframe: {"total": total, "daily": daily}})
+
+
+def soundcloud_streams_snapshot(entry, content):
+    if entry["kind"] == JSON:
+        parsed = _parse_response(parse_soundcloud_days, entry, content)
+    else:
+        parsed = decode_chart(chart_data_from_html(content), entry["url"] or "")
+    if not parsed or not parsed[1]:
+        return []
+    total, daily = parsed
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(entry["url"] or "").query)
+    window = WINDOW_DAYS.get(query.get("timewindow", [""])[0], len(daily))
+    result = {"timestamp": entry["captured_at"], "total": total, "daily": daily}
+    return soundcloud_streams_rows(result, window, _artist(entry, SOUNDCLOUD_ARTIST))
+
+
+def soundcloud_tooltips_snapshot(entry, content):
+    # Nur abgefangene Insights-Antworten: die Tooltip-Werte stehen nicht im HTML
+    if entry["kind"] != JSON:
+        return []
+    parsed = _parse_response(parse_soundcloud_months, entry, content)
+    if not parsed:
+        return []
+    tooltips = {
+        f"Bar_{i+1}": {"plays": f"{plays:,}", "month": month}
+        for i, (month, plays) in enumerate(parsed[1].items())
+    }
+    reference = datetime.datetime.fromisoformat(entry["captured_at"])
+    return soundcloud_monthly_rows(tooltips, _artist(entry, SOUNDCLOUD_ARTIST), reference)
+
+
+SNAPSHOT_EXTRACTORS = {
+    ("spotify_public", "artist"): spotify_public_snapshot,
+    ("spotify_artists", "stats"): spotify_stats_snapshot,
+    ("soundcloud", "streams"): soundcloud_streams_snapshot,
+    ("soundcloud", "tooltips"): soundcloud_tooltips_snapshot,
+}
+
+
+def extract_snapshots(directory, entries):
+    """Worker: [(id, rows, fehler), ...] für einen Block von Index-Einträgen."""
+    results = []
+    # Die Parser loggen per print; in den Workern unterdrücken
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for entry in entries:
+            extractor = SNAPSHOT_EXTRACTORS.get((entry["platform"], entry["view"]))
+            if extractor is None:
+                results.append((entry["id"], [], "kein Extraktor"))
+                continue
+            try:
+                results.append((entry["id"], extractor(entry, read_object(directory, entry["digest"])), None))
+            except Exception as e:
+                results.append((entry["id"], [], f"{type(e).__name__}: {e}"))
+    return results
+
+
+def reextract(archive, store=None, workers=REEXTRACT_WORKERS, chunk_size=REEXTRACT_CHUNK_SIZE, **filters):
+    """Extrahiert alle (gefilterten) Snapshots neu; schreibt in store, falls angegeben."""
+    started = time.perf_counter()
+    entries = archive.entries(**filters)
+    by_id = {entry["id"]: entry for entry in entries}
+    chunk_size = max(1, chunk_size)
+    chunks = [entries[i:i + chunk_size] for i in range(0, len(entries), chunk_size)]
+    extract = partial(extract_snapshots, archive.directory)
+    summary = {"snapshots": len(entries), "extracted": 0, "empty": 0, "errors": 0, "rows": 0, "changed": 0}
+
+    def handle(results):
+        for entry_id, rows, error in results:
+            if error:
+                summary["errors"] += 1
+                print(f"[WARN] Snapshot {entry_id} ({by_id[entry_id]['platform']}/{by_id[entry_id]['view']}): {error}")
+            elif not rows:
+                summary["empty"] += 1
+            else:
+                summary["extracted"] += 1
+                summary["rows"] += len(rows)
+                if store is not None:
+                    summary["changed"] += store.write_rows(rows, collected_at=by_id[entry_id]["captured_at"])
+
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            handle(extract(chunk))
+    else:
+        # map() liefert in Eingabe-Reihenfolge: spätere Snapshots werden zuletzt geschrieben
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for results in pool.map(extract, chunks):
+                handle(results)
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Neu-Extraktion aus dem Snapshot-Archiv")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="Verzeichnis des Snapshot-Archivs")
+    parser.add_argument("--db", default=TIMESERIES_DB_PATH)
+    parser.add_argument("--platform")
+    parser.add_argument("--view")
+    parser.add_argument("--since", help="Aufnahmezeit ab (ISO)")
+    parser.add_argument("--until", help="Aufnahmezeit bis (ISO)")
+    parser.add_argument("--workers", type=int, default=REEXTRACT_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=REEXTRACT_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Nur extrahieren, nichts speichern")
+    args = parser.parse_args()
+
+    archive = SnapshotArchive(args.dir)
+    store = None if args.dry_run else TimeSeriesStore(args.db)
+    try:
+        summary = reextract(
+            archive, store, args.workers, args.chunk_size,
+            platform=args.platform, view=args.view, since=args.since, until=args.until,
+        )
+    finally:
+        archive.close()
+        if store is not None:
+            store.close()
+    print(
+        f"✅ {summary['snapshots']} Snapshots in {summary['seconds']}s: {summary['extracted']} ausgewertet, "
+        f"{summary['empty']} ohne Daten, {summary['errors']} Fehler; {summary['rows']} Werte, "
+        f"{summary['changed']} neu oder geändert"
+    )
+
+
+if __name__ == "__main__":
+    main()
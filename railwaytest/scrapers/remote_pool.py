@@ -0,0 +1,255 @@
+import asyncio
+import os
+import random
+import tempfile
+import time
+import urllib.parse
+from contextlib import asynccontextmanager
+
+import nodriver as uc
+from nodriver import cdp
+
+from scrapers.metrics import browser_closed, browser_opened
+from scrapers.resource_blocking import browserless_ws_url
+
+# Gemeinsamer Pool entfernter Browserless-Sessions für alle nodriver-Scraper. Höchstens so viele
+# Sessions wie der Browserless-Tarif gleichzeitig erlaubt; weitere Läufe warten auf eine freie Session,
+# statt an der Concurrency-Grenze zu scheitern. Vor der Vergabe wird jede Session geprüft (WebSocket
+# offen, CDP antwortet), Verbindungsfehler werden mit Backoff wiederholt und Sessions nach
+# REMOTE_SESSION_MAX_PAGES Seiten bzw. REMOTE_SESSION_MAX_AGE Sekunden ersetzt.
+
+BROWSERLESS_MAX_SESSIONS = int(os.getenv("BROWSERLESS_MAX_SESSIONS", "2"))
+REMOTE_SESSION_MAX_PAGES = int(os.getenv("REMOTE_SESSION_MAX_PAGES", "50"))
+# Browserless beendet Sessions nach seinem Timeout; vorher ersetzen
+REMOTE_SESSION_MAX_AGE = float(os.getenv("REMOTE_SESSION_MAX_AGE", "600"))
+REMOTE_CONNECT_RETRIES = int(os.getenv("REMOTE_CONNECT_RETRIES", "5"))
+REMOTE_BACKOFF_BASE = float(os.getenv("REMOTE_BACKOFF_BASE", "1"))
+REMOTE_BACKOFF_MAX = float(os.getenv("REMOTE_BACKOFF_MAX", "30"))
+HEALTH_CHECK_TIMEOUT = 5.0
+
+
+def browserless_endpoint():
+    ws_endpoint = os.getenv("BROWSERLESS_WS_URL")
+    if not ws_endpoint:
+        raise RuntimeError("BROWSERLESS_WS_URL environment variable is not set!")
+    return browserless_ws_url(ws_endpoint)
+
+
+async def connect(ws_endpoint):
+    """Verbindet nodriver direkt mit dem WebSocket-Endpunkt.
+
+    uc.start() ignoriert ws_endpoint und sucht unter http://host:port/json/version nach einem
+    lokalen Browser; Browserless (wss, Token in der URL) ist so nicht erreichbar. Es wird kein
+    lokales Chrome gestartet oder gesucht, daher Platzhalter für Programm und Profil.
+    """
+    parsed = urllib.parse.urlparse(ws_endpoint)
+    port = parsed.port or (443 if parsed.scheme == "wss" else 80)
+    config = uc.Config(
+        host=parsed.hostname, port=port, headless=True, sandbox=False,
+        browser_executable_path="browserless", user_data_dir=tempfile.gettempdir(),
+    )
+    driver = uc.Browser(config)
+    driver.websocket_url = ws_endpoint
+    try:
+        await driver.attach()
+        await driver.update_targets()
+    except BaseException:
+        await disconnect(driver)
+        raise
+    return driver
+
+
+async def disconnect(driver):
+    """Schließt alle WebSockets der Session (Browser.stop() ist synchron und plant das nur ein)."""
+    for target in list(driver.targets):
+        try:
+            await target.aclose()
+        except Exception:
+            pass
+    try:
+        await driver.aclose()
+    except Exception as e:
+        print(f"[WARN] Browserless-Session nicht sauber geschlossen: {e}")
+
+
+class RemoteSession:
+    """Verliehene Session; verhält sich wie der nodriver-Browser und zählt geöffnete Seiten."""
+
+    def __init__(self, pool, driver):
+        self.pool = pool
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.pages = 0
+        self.on_reconnect = None
+        self._lock = asyncio.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+    @property
+    def connected(self):
+        socket = self.driver.socket
+        return socket is not None and socket.close_code is None
+
+    @property
+    def expired(self):
+        return (
+            self.pages >= self.pool.max_pages
+            or time.monotonic() - self.created_at >= self.pool.max_age
+        )
+
+    async def healthy(self):
+        if not self.connected:
+            return False
+        try:
+            await asyncio.wait_for(self.driver.send(cdp.browser.get_version()), HEALTH_CHECK_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    async def get(self, url="about:blank", new_tab=False, new_window=False):
+        # Abgerissene Verbindung: vor der nächsten Seite neu verbinden (nicht mitten in einer Seite)
+        async with self._lock:
+            if not self.connected:
+                await self.pool._reconnect(self)
+        self.pages += 1
+        return await self.driver.get(url, new_tab=new_tab, new_window=new_window)
+
+
+class RemoteSessionPool:
+    def __init__(self, max_sessions=BROWSERLESS_MAX_SESSIONS, max_pages=REMOTE_SESSION_MAX_PAGES,
+                 max_age=REMOTE_SESSION_MAX_AGE, connect_retries=REMOTE_CONNECT_RETRIES,
+                 backoff_base=REMOTE_BACKOFF_BASE, endpoint=None):
+        self.max_sessions = max(1, max_sessions)
+        self.max_pages = max(1, max_pages)
+        self.max_age = max_age
+        self.connect_retries = max(1, connect_retries)
+        self.backoff_base = backoff_base
+        self.endpoint = endpoint
+        self.in_use = 0
+        self._idle = []
+        self._semaphore = asyncio.Semaphore(self.max_sessions)
+        self._stats = {"connects": 0, "connect_failures": 0, "reconnects": 0, "recycled": 0, "unhealthy": 0, "waits": 0}
+
+    @property
+    def open_sessions(self):
+        return self.in_use + len(self._idle)
+
+    async def _connect(self):
+        endpoint = self.endpoint or browserless_endpoint()
+        for attempt in range(1, self.connect_retries + 1):
+            try:
+                driver = await connect(endpoint)
+            except Exception as e:
+                self._stats["connect_failures"] += 1
+                if attempt == self.connect_retries:
+                    raise
+                delay = min(self.backoff_base * 2 ** (attempt - 1), REMOTE_BACKOFF_MAX) * random.uniform(0.5, 1.0)
+                print(f"[WARN] Browserless-Verbindung fehlgeschlagen ({e}), neuer Versuch in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            self._stats["connects"] += 1
+            browser_opened("browserless")
+            return driver
+
+    async def _close(self, session):
+        await disconnect(session.driver)
+        browser_closed("browserless")
+
+    async def _reconnect(self, session):
+        print("[WARN] Browserless-Session getrennt, verbinde neu...")
+        self._stats["reconnects"] += 1
+        await self._close(session)
+        session.driver = await self._connect()
+        session.created_at, session.pages = time.monotonic(), 0
+        if session.on_reconnect:
+            await session.on_reconnect(session.driver)
+
+    async def acquire(self, on_reconnect=None):
+        """Liefert eine geprüfte Session; wartet, solange alle Sessions des Tarifs belegt sind."""
+        if self._semaphore.locked():
+            self._stats["waits"] += 1
+        await self._semaphore.acquire()
+        try:
+            session = None
+            while self._idle:
+                candidate = self._idle.pop()
+                if candidate.expired:
+                    self._stats["recycled"] += 1
+                elif await candidate.healthy():
+                    session = candidate
+                    break
+                else:
+                    self._stats["unhealthy"] += 1
+                await self._close(candidate)
+            if session is None:
+                session = RemoteSession(self, await self._connect())
+        except BaseException:
+            self._semaphore.release()
+            raise
+        session.on_reconnect = on_reconnect
+        self.in_use += 1
+        return session
+
+    async def release(self, session, broken=False):
+        """Gibt die Session zurück; defekte oder verbrauchte Sessions werden geschlossen."""
+        self.in_use -= 1
+        try:
+            if broken or session.expired or not session.connected:
+                if session.expired:
+                    self._stats["recycled"] += 1
+                await self._close(session)
+            else:
+                session.on_reconnect = None
+                self._idle.append(session)
+        finally:
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def session(self, on_reconnect=None):
+        session = await self.acquire(on_reconnect)
+        try:
+            yield session
+        finally:
+            await self.release(session)
+
+    async def stop(self):
+        """Schließt alle freien Sessions (verliehene werden bei release geschlossen)."""
+        idle, self._idle = self._idle, []
+        for session in idle:
+            await self._close(session)
+
+    def stats(self):
+        return {
+            "max_sessions": self.max_sessions,
+            "open": self.open_sessions,
+            "in_use": self.in_use,
+            "idle": len(self._idle),
+            **self._stats,
+        }
+
+
+_shared_pool = None
+
+
+def shared_pool():
+    """Prozessweiter Pool, den alle nodriver-Scraper teilen."""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = RemoteSessionPool()
+    return _shared_pool
+
+
+async def close_shared_pool():
+    global _shared_pool
+    if _shared_pool is not None:
+        await _shared_pool.stop()
+        _shared_pool = None
+
+
+async def run_with_pool(coro):
+    """Für Skript-Aufrufe: nach dem Lauf die freien Sessions des gemeinsamen Pools schließen."""
+    try:
+        return await coro
+    finally:
+        await close_shared_pool()
@@ -0,0 +1,180 @@
+import os
+import re
+import urllib.parse
+
+# Blockiert Bilder, Fonts, Medien und Tracker, die keiner der Extraktoren liest.
+# Playwright: Routing auf Page/Kontext. nodriver/Browserless: CDP Fetch-Interception pro Tab.
+
+RESOURCE_BLOCKING = os.getenv("RESOURCE_BLOCKING", "1") == "1"
+# Optional: globale Liste blockierter Ressourcentypen, z. B. "image,font,media"
+BLOCK_RESOURCE_TYPES = os.getenv("BLOCK_RESOURCE_TYPES")
+
+TRACKER_PATTERNS = [
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"doubleclick\.net",
+    r"connect\.facebook\.net",
+    r"hotjar\.com",
+    r"sentry\.io",
+    r"sentry-cdn\.com",
+    r"segment\.(io|com)",
+    r"cookielaw\.org/.*\.(png|svg)",
+]
+
+MEDIA_TYPES = {"image", "font", "media"}
+
+# Voreinstellungen pro Plattform: Typen + URL-Muster blockieren, allow-Muster haben Vorrang
+PLATFORM_DEFAULTS = {
+    "spotify_public": {
+        "block_types": MEDIA_TYPES,
+        "block_patterns": TRACKER_PATTERNS + [r"/gabo-receiver-service/", r"i\.scdn\.co/", r"\.mp4(\?|$)"],
+        "allow_patterns": [],
+    },
+    "spotify_artists": {
+        "block_types": MEDIA_TYPES,
+        "block_patterns": TRACKER_PATTERNS + [r"/gabo-receiver-service/", r"i\.scdn\.co/"],
+        # Login-Seite und Captcha brauchen ihre Ressourcen
+        "allow_patterns": [r"accounts\.spotify\.com", r"recaptcha", r"challenge\.spotify\.com"],
+    },
+    "soundcloud": {
+        "block_types": MEDIA_TYPES,
+        "block_patterns": TRACKER_PATTERNS + [r"i1\.sndcdn\.com/", r"/promoted/", r"quantserve\.com"],
+        "allow_patterns": [r"secure\.soundcloud\.com", r"captcha"],
+    },
+}
+
+
+class BlockPolicy:
+    """Entscheidet pro Request (Ressourcentyp + URL), ob er blockiert wird, und zählt mit."""
+
+    def __init__(self, block_types=(), block_patterns=(), allow_patterns=(), enabled=RESOURCE_BLOCKING):
+        self.block_types = {t.lower() for t in block_types}
+        self.block_patterns = [re.compile(p) for p in block_patterns]
+        self.allow_patterns = [re.compile(p) for p in allow_patterns]
+        self.enabled = enabled
+        self.blocked_requests = 0
+        self.blocked_by_type = {}
+        self.allowed_requests = 0
+        self.loaded_bytes = 0
+
+    @classmethod
+    def for_platform(cls, platform):
+        defaults = PLATFORM_DEFAULTS.get(platform, {"block_types": MEDIA_TYPES})
+        block_types = defaults.get("block_types", ())
+        if BLOCK_RESOURCE_TYPES is not None:
+            block_types = [t.strip() for t in BLOCK_RESOURCE_TYPES.split(",") if t.strip()]
+        return cls(block_types, defaults.get("block_patterns", ()), defaults.get("allow_patterns", ()))
+
+    def should_block(self, resource_type, url):
+        if not self.enabled:
+            return False
+        if any(p.search(url) for p in self.allow_patterns):
+            return False
+        if resource_type.lower() in self.block_types:
+            return True
+        return any(p.search(url) for p in self.block_patterns)
+
+    def record(self, blocked, resource_type):
+        if blocked:
+            self.blocked_requests += 1
+            key = resource_type.lower()
+            self.blocked_by_type[key] = self.blocked_by_type.get(key, 0) + 1
+        else:
+            self.allowed_requests += 1
+
+    def record_loaded(self, size):
+        if size:
+            self.loaded_bytes += int(size)
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "blocked_requests": self.blocked_requests,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "allowed_requests": self.allowed_requests,
+            "loaded_bytes": self.loaded_bytes,
+        }
+
+
+# Eine Policy pro Plattform, damit die Zähler über alle Scrapes summiert werden
+_policies = {}
+
+
+def get_policy(platform):
+    if platform not in _policies:
+        _policies[platform] = BlockPolicy.for_platform(platform)
+    return _policies[platform]
+
+
+def blocking_stats():
+    return {platform: policy.stats() for platform, policy in _policies.items()}
+
+
+async def block_resources_playwright(target, platform):
+    """Installiert das Routing auf einer Playwright-Page oder einem Kontext."""
+    policy = get_policy(platform)
+    if not policy.enabled:
+        return policy
+
+    async def handle_route(route):
+        request = route.request
+        blocked = policy.should_block(request.resource_type, request.url)
+        policy.record(blocked, request.resource_type)
+        if blocked:
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def handle_response(response):
+        policy.record_loaded(response.headers.get("content-length"))
+
+    await target.route("**/*", handle_route)
+    target.on("response", handle_response)
+    return policy
+
+
+async def block_resources_nodriver(tab, platform):
+    """Aktiviert CDP Fetch-Interception auf einem nodriver-Tab (lokal oder Browserless)."""
+    from nodriver import cdp
+
+    policy = get_policy(platform)
+    if not policy.enabled or getattr(tab, "_block_policy", None) is policy:
+        return policy
+
+    async def on_request_paused(event):
+        resource_type = event.resource_type.value if event.resource_type else "other"
+        blocked = policy.should_block(resource_type, event.request.url)
+        policy.record(blocked, resource_type)
+        try:
+            if blocked:
+                await tab.send(cdp.fetch.fail_request(event.request_id, cdp.network.ErrorReason.BLOCKED_BY_CLIENT))
+            else:
+                await tab.send(cdp.fetch.continue_request(event.request_id))
+        except Exception as e:
+            print(f"[WARN] Fetch-Interception Fehler: {e}")
+
+    def on_loading_finished(event):
+        policy.record_loaded(event.encoded_data_length)
+
+    tab.add_handler(cdp.fetch.RequestPaused, on_request_paused)
+    tab.add_handler(cdp.network.LoadingFinished, on_loading_finished)
+    await tab.send(cdp.network.enable())
+    await tab.send(cdp.fetch.enable())
+    tab._block_policy = policy
+    return policy
+
+
+async def open_blocked(driver, url, platform, new_tab=False):
+    """Öffnet url in einem nodriver-Tab, nachdem dort die Blockier-Policy aktiv ist."""
+    tab = await driver.get("about:blank", new_tab=new_tab)
+    await block_resources_nodriver(tab, platform)
+    await tab.get(url)
+    return tab
+
+
+def browserless_ws_url(ws_endpoint):
+    """Hängt blockAds=true an die Browserless-URL an (serverseitiger Ad-/Tracker-Filter)."""
+    if not RESOURCE_BLOCKING or "blockAds" in ws_endpoint:
+        return ws_endpoint
+    separator = "&" if urllib.parse.urlparse(ws_endpoint).query else "?"
+    return f"{ws_endpoint}{separator}blockAds=true"
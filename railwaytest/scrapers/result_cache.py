@@ -0,0 +1,108 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+# Gültigkeit der Ergebnisse (Sekunden), Anzahl Einträge und Stale-While-Revalidate-Modus
+CACHE_TTL = float(os.getenv("SCRAPE_CACHE_TTL", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", "256"))
+CACHE_STALE_WHILE_REVALIDATE = os.getenv("SCRAPE_CACHE_STALE_WHILE_REVALIDATE", "0") == "1"
+
+
+class ResultCache:
+    """TTL-Cache mit LRU-Verdrängung; parallele Anfragen für denselben Key teilen sich einen Scrape."""
+
+    def __init__(self, loader, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES,
+                 stale_while_revalidate=CACHE_STALE_WHILE_REVALIDATE):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.stale_while_revalidate = stale_while_revalidate
+        self._entries = OrderedDict()  # key -> (gespeichert_um, wert)
+        self._inflight = {}            # key -> laufender Scrape (Task)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.loads = 0
+        self.errors = 0
+        self.evictions = 0
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            if time.monotonic() - stored_at < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            if self.stale_while_revalidate:
+                # Veralteten Wert sofort ausliefern, im Hintergrund neu laden
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    self._start_load(key)
+                return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self._start_load(key)
+        # shield: bricht ein Client ab, läuft der gemeinsame Scrape trotzdem weiter
+        return await asyncio.shield(task)
+
+    def _start_load(self, key):
+        self.loads += 1
+        task = asyncio.ensure_future(self._run_loader(key))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish_load(key, t))
+        return task
+
+    def _finish_load(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Fehler von Hintergrund-Refreshes abholen, damit asyncio nicht warnt
+        if not task.cancelled():
+            task.exception()
+
+    async def _run_loader(self, key):
+        try:
+            value = await self.loader(key)
+        except Exception:
+            self.errors += 1
+            raise
+        self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "loads": self.loads,
+            "errors": self.errors,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            # Anfragen, die ohne eigenen Browser-Scrape beantwortet wurden
+            "scrapes_saved": self.hits + self.stale_hits + self.coalesced,
+            "ttl": self.ttl,
+            "max_entries": self.max_entries,
+            "stale_while_revalidate": self.stale_while_revalidate,
+        }
@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import sqlite3
+
+from scrapers import spotify_7Dstreams
+from scrapers.browser_pool import BrowserPool
+from scrapers.incremental import SPOTIFY_INCREMENTAL, mark_checked, plan_spotify_urls
+from scrapers.metrics import phase
+from scrapers.rate_limit import BlockedError, HostLimiter, raise_if_blocked
+from scrapers.remote_pool import run_with_pool, shared_pool
+from scrapers.scraper_öffentlich_spotify import SPOTIFY_PUBLIC_BASE_URL, scrape_spotify_artist_tracks
+from scrapers.session_store import default_store, ensure_session
+from scrapers.supabase_writer import default_writer
+from scrapers.timeseries_store import TIMESERIES_DB_PATH, TimeSeriesStore
+
+# Nächtlicher Lauf über eine Liste von Artists (Roster) statt einer fest eingetragenen artist_id.
+# Jede Seite holt sich vorher ein Token vom Rate-Limiter ihres Hosts; Drosselungen und Captchas
+# pausieren den Host. Erfolgreiche (Artist, Plattform)-Paare werden pro Lauf-Datum vermerkt,
+# ein abgebrochener Lauf macht beim nächsten Start dort weiter.
+
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "4"))
+CRAWL_MAX_RETRIES = int(os.getenv("CRAWL_MAX_RETRIES", "3"))
+CRAWL_STATE_PATH = os.getenv("CRAWL_STATE_PATH", TIMESERIES_DB_PATH)
+
+ROSTER_PLATFORMS = ("spotify_artists", "spotify_public")
+SPOTIFY_PUBLIC_URL = SPOTIFY_PUBLIC_BASE_URL + "/artist/{artist_id}"
+
+
+def load_roster(path, default_platforms=ROSTER_PLATFORMS):
+    """Roster-Datei (JSON) -> [(artist_id, [plattformen]), ...].
+
+    Format: Liste aus IDs oder {"artist_id": ..., "platforms": [...]}; auch {"artists": [...]}.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("artists", [])
+    roster = []
+    for entry in data:
+        if isinstance(entry, str):
+            entry = {"artist_id": entry}
+        platforms = entry.get("platforms") or list(default_platforms)
+        unknown = set(platforms) - set(ROSTER_PLATFORMS)
+        if unknown:
+            raise ValueError(f"Unbekannte Plattform(en) für {entry['artist_id']}: {', '.join(sorted(unknown))}")
+        roster.append((entry["artist_id"], platforms))
+    return roster
+
+
+class CrawlCheckpoint:
+    """Letzte erfolgreiche Erfassung pro (Artist, Plattform) und Status im aktuellen Lauf."""
+
+    def __init__(self, path=CRAWL_STATE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS crawl_state (
+                artist TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                run_date TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_success TEXT,
+                error TEXT,
+                PRIMARY KEY (artist, platform)
+            ) WITHOUT ROWID"""
+        )
+        self._conn.commit()
+
+    def is_done(self, artist, platform, run_date):
+        row = self._conn.execute(
+            "SELECT run_date, status FROM crawl_state WHERE artist = ? AND platform = ?", (artist, platform)
+        ).fetchone()
+        return row is not None and row[0] == run_date and row[1] == "done"
+
+    def mark_done(self, artist, platform, run_date):
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        self._conn.execute(
+            """INSERT INTO crawl_state (artist, platform, run_date, status, attempts, last_success, error)
+               VALUES (?, ?, ?, 'done', 1, ?, NULL)
+               ON CONFLICT (artist, platform) DO UPDATE SET
+                   attempts = CASE WHEN crawl_state.run_date = excluded.run_date THEN crawl_state.attempts + 1 ELSE 1 END,
+                   run_date = excluded.run_date, status = 'done', last_success = excluded.last_success, error = NULL""",
+            (artist, platform, run_date, now),
+        )
+        self._conn.commit()
+
+    def mark_failed(self, artist, platform, run_date, error):
+        self._conn.execute(
+            """INSERT INTO crawl_state (artist, platform, run_date, status, attempts, error)
+               VALUES (?, ?, ?, 'failed', 1, ?)
+               ON CONFLICT (artist, platform) DO UPDATE SET
+                   attempts = CASE WHEN crawl_state.run_date = excluded.run_date THEN crawl_state.attempts + 1 ELSE 1 END,
+                   run_date = excluded.run_date, status = 'failed', error = excluded.error""",
+            (artist, platform, run_date, str(error)),
+        )
+        self._conn.commit()
+
+    def summary(self, run_date):
+        rows = self._conn.execute(
+            "SELECT status, COUNT(*) FROM crawl_state WHERE run_date = ? GROUP BY status", (run_date,)
+        ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        self._conn.close()
+
+
+class RosterCrawler:
+    def __init__(self, roster, store=None, checkpoint=None, limiter=None, concurrency=CRAWL_CONCURRENCY,
+                 max_retries=CRAWL_MAX_RETRIES, incremental=SPOTIFY_INCREMENTAL, pool=None, writer=None,
+                 remote_pool=None):
+        self.roster = roster
+        self.store = store or TimeSeriesStore()
+        self.checkpoint = checkpoint or CrawlCheckpoint()
+        self.limiter = limiter or HostLimiter()
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(1, max_retries)
+        self.incremental = incremental
+        self.pool = pool
+        # Browserless-Sessions kommen aus dem gemeinsamen Pool der nodriver-Scraper
+        self.remote_pool = remote_pool or shared_pool()
+        # Optional zusätzlich nach Supabase (gepuffert, gebündelte Upserts)
+        self.writer = writer or default_writer()
+        self._own_pool = False
+        self._driver = None
+        self._driver_lock = asyncio.Lock()
+
+    async def run(self, run_date=None, to_date=None):
+        """Crawlt alle noch offenen (Artist, Plattform)-Paare des Lauf-Datums."""
+        run_date = run_date or datetime.date.today().isoformat()
+        to_date = to_date or spotify_7Dstreams.yesterday
+        pending = [
+            (artist, platform)
+            for artist, platforms in self.roster
+            for platform in platforms
+            if not self.checkpoint.is_done(artist, platform, run_date)
+        ]
+        skipped = sum(len(platforms) for _, platforms in self.roster) - len(pending)
+        print(f"🚀 Roster-Lauf {run_date}: {len(pending)} offen, {skipped} bereits erledigt")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        if self.writer:
+            await self.writer.start()
+
+        async def crawl(artist, platform):
+            async with semaphore:
+                try:
+                    if platform == "spotify_artists":
+                        changed = await self._crawl_spotify_artists(artist, to_date)
+                    else:
+                        changed = await self._crawl_spotify_public(artist)
+                except Exception as e:
+                    self.checkpoint.mark_failed(artist, platform, run_date, e)
+                    print(f"❌ {artist} ({platform}): {e}")
+                    return
+                self.checkpoint.mark_done(artist, platform, run_date)
+                print(f"✅ {artist} ({platform}): {changed} neue/geänderte Werte")
+
+        try:
+            await asyncio.gather(*(crawl(artist, platform) for artist, platform in pending))
+        finally:
+            await self.close()
+        summary = self.checkpoint.summary(run_date)
+        print(f"\n🏁 Roster-Lauf {run_date}: {summary}")
+        return summary
+
+    async def fetch(self, url, fetch):
+        """Führt fetch() mit Token des Hosts aus; bei Drosselung Backoff und erneuter Versuch."""
+        bucket = self.limiter.bucket(url)
+        for attempt in range(1, self.max_retries + 1):
+            await bucket.acquire()
+            try:
+                result = await fetch()
+            except BlockedError as e:
+                pause = bucket.throttled(e.retry_after)
+                print(f"[WARN] Gedrosselt ({e.reason}), Host pausiert {pause:.0f}s, Versuch {attempt}/{self.max_retries}: {url}")
+                if attempt == self.max_retries:
+                    raise
+                continue
+            bucket.succeeded()
+            return result
+
+    async def _spotify_driver(self, first_url):
+        """Eine eingeloggte Browserless-Session für alle Spotify-for-Artists-Seiten des Laufs."""
+        async with self._driver_lock:
+            if self._driver is None:
+                bucket = self.limiter.bucket(first_url)
+                await bucket.acquire()
+
+                def login(driver):
+                    return ensure_session(
+                        driver, spotify_7Dstreams.SPOTIFY_ACCOUNT, first_url, "spotify_artists",
+                        spotify_7Dstreams.STATS_BUTTON_SELECTOR, spotify_7Dstreams.LOGIN_TIMEOUT,
+                        store=default_store(),
+                    )
+
+                with phase("browser", "spotify_artists"):
+                    driver = await self.remote_pool.acquire(on_reconnect=login)
+                try:
+                    with phase("login", "spotify_artists"):
+                        tab = await login(driver)
+                    await raise_if_blocked(tab, first_url)
+                except BlockedError as e:
+                    bucket.throttled(e.retry_after)
+                    await self.remote_pool.release(driver, broken=True)
+                    raise
+                except Exception:
+                    await self.remote_pool.release(driver, broken=True)
+                    raise
+                self._driver = driver
+            return self._driver
+
+    async def _crawl_spotify_artists(self, artist, to_date):
+        if self.incremental:
+            urls = plan_spotify_urls(self.store, artist, to_date, spotify_7Dstreams.build_stats_url)
+        else:
+            urls = spotify_7Dstreams.stats_urls(artist, to_date)
+        if not urls:
+            return 0
+        driver = await self._spotify_driver(next(iter(urls.values())))
+        results = {}
+        for timeframe, url in urls.items():
+            results[timeframe] = await self.fetch(
+                url, lambda url=url, timeframe=timeframe: spotify_7Dstreams.scrape_data(driver, url, timeframe, new_tab=True),
+            )
+        if self.writer:
+            await self.writer.write_spotify_stats(artist, results)
+        changed = self.store.record_spotify_run(artist, results)
+        mark_checked(self.store, artist, urls, results)
+        return changed
+
+    async def _crawl_spotify_public(self, artist):
+        if self.pool is None:
+            # Startet erst beim ersten Browser-Kontext (viele Artists beantwortet schon die HTTP-Stufe)
+            self.pool, self._own_pool = BrowserPool(), True
+        url = SPOTIFY_PUBLIC_URL.format(artist_id=artist)
+        result = await self.fetch(url, lambda: scrape_spotify_artist_tracks(artist, pool=self.pool))
+        if self.writer:
+            await self.writer.write_spotify_public(artist, result)
+        return self.store.record_spotify_public_run(artist, result)
+
+    def stats(self):
+        stats = {"hosts": self.limiter.stats(), "browserless": self.remote_pool.stats()}
+        if self.writer:
+            stats["supabase"] = self.writer.stats()
+        return stats
+
+    async def close(self):
+        if self._driver is not None:
+            await self.remote_pool.release(self._driver)
+            self._driver = None
+        if self._own_pool:
+            await self.pool.stop()
+            self.pool, self._own_pool = None, False
+        if self.writer:
+            await self.writer.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roster-Crawler: mehrere Artists pro Lauf")
+    parser.add_argument("roster", help="JSON-Datei mit Artists und Plattformen")
+    parser.add_argument("--platforms", help=f"Standard-Plattformen, kommagetrennt ({','.join(ROSTER_PLATFORMS)})")
+    parser.add_argument("--run-date", help="Lauf-Datum für die Checkpoints (Standard: heute)")
+    parser.add_argument("--concurrency", type=int, default=CRAWL_CONCURRENCY)
+    parser.add_argument("--incremental", action="store_true", default=SPOTIFY_INCREMENTAL)
+    args = parser.parse_args()
+
+    platforms = args.platforms.split(",") if args.platforms else ROSTER_PLATFORMS
+    crawler = RosterCrawler(
+        load_roster(args.roster, platforms), concurrency=args.concurrency, incremental=args.incremental,
+    )
+    try:
+        asyncio.run(run_with_pool(crawler.run(args.run_date)))
+    finally:
+        crawler.store.close()
+        crawler.checkpoint.close()
+    print(json.dumps(crawler.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,24 @@
 import asyncio
+import os
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
-import re
 import json
 import datetime
+from scrapers.extraction import extract_from_page, parse_artist_data
+from scrapers.network_capture import NETWORK_CAPTURE, NetworkCapture, attach_playwright, capture_or_wait, parse_artist_overview
+from scrapers.metrics import browser_closed, browser_opened, phase, scrape
+from scrapers.rate_limit import BlockedError, raise_if_blocked, retry_after_seconds
+from scrapers.resource_blocking import block_resources_playwright
+from scrapers.snapshot_archive import archive_page
+from scrapers.tiered_fetch import BROWSER, HTTP, TIERED_FETCH, fetch_artist_http, fetch_tier
+from scrapers.readiness import wait_for_selector, wait_for_selector_gone, wait_for_stable_count, wait_until
+
+# Selektoren der Artist-Seite
+LISTENERS_SELECTOR = "span.VmDxGgs77HhmKczsLLBQ"
+TRACK_NAME_SELECTOR = "div.encore-text-body-medium.eYJgrgW01l7dHKuMJidG"
+SHOW_MORE_SELECTOR = 'div.e-91000-text.encore-text-body-small-bold[data-encore-id="text"]'
+
+# Basis-URL (für Benchmarks auf einen lokalen Fixture-Server umstellbar)
+SPOTIFY_PUBLIC_BASE_URL = os.getenv("SPOTIFY_PUBLIC_BASE_URL", "https://open.spotify.com")
 
 # Entferne globale artist_id-Variable
 # artist_id = "3OOeP2opYuTEm0QIU4gQ6M"
@@ -15,7 +30,7 @@ async def close_popups(page):
         if consent_button:
             print("[INFO] Cookie-Banner gefunden, akzeptiere...")
             await consent_button.click()
-            await asyncio.sleep(1)
+            await wait_for_selector_gone(page, 'button[data-testid="cookie-policy-accept"]', timeout=1)
     except Exception as e:
         print(f"[WARN] Cookie Consent Fehler: {e}")
 
@@ -24,88 +39,107 @@ async def close_popups(page):
         if app_popup_close_button:
             print("[INFO] App-Popup gefunden, schließe es...")
             await app_popup_close_button.click()
-            await asyncio.sleep(1)
+            await wait_for_selector_gone(page, 'button[aria-label="Close"]', timeout=1)
     except Exception as e:
         print(f"[WARN] App-Popup Fehler: {e}")
 
 async def click_show_more(page):
     print("[INFO] Prüfe auf 'Mehr anzeigen' Button und klicke ihn, falls vorhanden...")
     try:
-        await page.wait_for_selector('div.e-91000-text.encore-text-body-small-bold[data-encore-id="text"]', timeout=5000)
-        await page.click('div.e-91000-text.encore-text-body-small-bold[data-encore-id="text"]')
+        await page.wait_for_selector(SHOW_MORE_SELECTOR, timeout=5000)
+        rows_before = await page.evaluate(f"document.querySelectorAll('{TRACK_NAME_SELECTOR}').length")
+        await page.click(SHOW_MORE_SELECTOR)
         print("[INFO] 'Mehr anzeigen' Button wurde geklickt")
-        await page.wait_for_timeout(3000)
+        # Statt fester 3 s: warten, bis zusätzliche Tracks erscheinen und die Liste stabil ist
+        await wait_until(
+            page, f"document.querySelectorAll('{TRACK_NAME_SELECTOR}').length > {rows_before}",
+            "zusätzliche Tracks", timeout=3,
+        )
+        await wait_for_stable_count(page, TRACK_NAME_SELECTOR, timeout=2, stable_for=0.4)
     except Exception:
         print("[INFO] Kein 'Mehr anzeigen' Button gefunden oder Fehler beim Klicken")
 
-async def scrape_spotify_artist_tracks(artist_id: str):
-    URL = f"https://open.spotify.com/artist/{artist_id}"
-    print(f"[INFO] Starte Scraping für Spotify Artist: {artist_id}")
+def artist_url(artist_id: str):
+    return f"{SPOTIFY_PUBLIC_BASE_URL}/artist/{artist_id}"
+
+def artist_result(artist_id: str, data, tier):
+    timestamp = datetime.datetime.now().isoformat()
+    print(f"[INFO] Scraping abgeschlossen ({tier}): {timestamp}")
+    fetch_tier.inc(("spotify_public", tier))
+    return {"artist_id": artist_id, "scrape_time": timestamp, "tier": tier, "data": data}
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        await page.goto(URL)
-
-        await close_popups(page)
-
-        print("[INFO] Warte auf komplettes Laden der Seite...")
-        await page.wait_for_timeout(7000)
-
-        await click_show_more(page)
-
-        await close_popups(page)
-
-        content = await page.content()
-        soup = BeautifulSoup(content, "html.parser")
-
-        data = {}
-
-        # Monatliche Hörer auslesen
-        monthly_listeners_span = soup.find("span", class_="VmDxGgs77HhmKczsLLBQ")
-        if monthly_listeners_span:
-            raw_text = monthly_listeners_span.text.strip()
-            match = re.search(r"[\d,.]+", raw_text)
-            if match:
-                monthly_listeners = match.group(0).replace(".", "").replace(",", "")
-                data["monthly_listeners"] = int(monthly_listeners)
-                print(f"[INFO] Monatliche Hörer: {data['monthly_listeners']}")
-            else:
-                data["monthly_listeners"] = None
-                print("[WARN] Monatliche Hörer Zahl nicht erkannt")
-        else:
-            data["monthly_listeners"] = None
-            print("[WARN] Monatliche Hörer Element nicht gefunden")
-
-        # Tracks und Plays auslesen
-        track_names = soup.find_all("div", class_="e-91000-text encore-text-body-medium encore-internal-color-text-base eYJgrgW01l7dHKuMJidG standalone-ellipsis-one-line")
-        play_counts = soup.find_all("div", class_="e-91000-text encore-text-body-small htbmhRXsxePzCR3HsX0V")
-
-        print(f"[INFO] Gefundene Tracks: {len(track_names)}, Gefundene Playzahlen: {len(play_counts)}")
-
-        tracks = []
-        if len(track_names) == len(play_counts):
-            for name_el, play_el in zip(track_names, play_counts):
-                track_name = name_el.text.strip()
-                play_count_raw = play_el.text.strip().replace(".", "").replace(",", "")
-                try:
-                    play_count = int(play_count_raw)
-                except:
-                    play_count = None
-                tracks.append({"track_name": track_name, "play_count": play_count})
-        else:
-            print("[WARN] Unterschiedliche Anzahl Track-Namen und Playzahlen!")
-            for name_el in track_names:
-                tracks.append({"track_name": name_el.text.strip(), "play_count": None})
-
-        data["tracks"] = tracks
-
-        await browser.close()
-
-        timestamp = datetime.datetime.now().isoformat()
-        print(f"[INFO] Scraping abgeschlossen: {timestamp}")
-
-        return {"artist_id": artist_id, "scrape_time": timestamp, "data": data}
+async def scrape_spotify_artist_tracks(artist_id: str, pool=None, tiered=TIERED_FETCH):
+    print(f"[INFO] Starte Scraping für Spotify Artist: {artist_id}")
+    async with scrape("spotify_public", artist_id=artist_id, pooled=pool is not None) as trace:
+        # Stufe 1: einfacher HTTP-Abruf; der Browser startet nur, wenn die Daten unvollständig sind
+        if tiered:
+            data = await fetch_artist_http(artist_url(artist_id), artist_id)
+            if data is not None:
+                trace.fields["tier"] = HTTP
+                return artist_result(artist_id, data, HTTP)
+        trace.fields["tier"] = BROWSER
+
+        # Mit Pool: frischer Kontext in einem bereits laufenden Browser
+        if pool is not None:
+            async with pool.context() as context:
+                await block_resources_playwright(context, "spotify_public")
+                page = await context.new_page()
+                return await scrape_artist_page(page, artist_id)
+
+        async with async_playwright() as p:
+            with phase("browser"):
+                browser = await p.chromium.launch(headless=True)
+            browser_opened("playwright")
+            try:
+                page = await browser.new_page()
+                await block_resources_playwright(page, "spotify_public")
+                return await scrape_artist_page(page, artist_id)
+            finally:
+                await browser.close()
+                browser_closed("playwright")
+
+async def scrape_artist_page(page, artist_id: str):
+    URL = artist_url(artist_id)
+    capture = attach_playwright(page, NetworkCapture("spotify_public")) if NETWORK_CAPTURE else None
+    with phase("goto"):
+        response = await page.goto(URL)
+    if response is not None and response.status == 429:
+        raise BlockedError("HTTP 429", URL, retry_after_seconds(response.headers.get("retry-after")))
+
+    print("[INFO] Warte auf komplettes Laden der Seite...")
+    # Die Seite lädt Hörer und Top-Tracks per Pathfinder-API; kommt die Antwort, ist der DOM-Weg unnötig
+    with phase("wait"):
+        data = await capture_or_wait(
+            capture, parse_artist_overview, wait_for_selector(page, TRACK_NAME_SELECTOR, timeout=7), timeout=7,
+        )
+    if data and data["monthly_listeners"] is not None and data["tracks"]:
+        print(f"[INFO] Daten aus API-Antwort: {data['monthly_listeners']} Hörer, {len(data['tracks'])} Tracks")
+        await archive_page(page, "spotify_public", "artist", capture.responses, artist=artist_id, url=URL)
+    else:
+        await raise_if_blocked(page, URL)
+        with phase("wait"):
+            await wait_for_selector(page, LISTENERS_SELECTOR, timeout=2)
+
+        with phase("popups"):
+            await close_popups(page)
+
+        with phase("wait"):
+            await wait_for_stable_count(page, TRACK_NAME_SELECTOR, timeout=3, stable_for=0.5)
+
+        with phase("show_more"):
+            await click_show_more(page)
+
+        with phase("popups"):
+            await close_popups(page)
+
+        # Nur die benötigten Texte aus der Seite holen statt des kompletten HTML
+        with phase("extract"):
+            raw = await extract_from_page(page, "artist")
+        with phase("parse"):
+            data = parse_artist_data(raw)
+        await archive_page(page, "spotify_public", "artist", artist=artist_id, url=URL)
+
+    return artist_result(artist_id, data, BROWSER)
 
 # Wenn du möchtest, kannst du den Scraper lokal testen mit:
 # if __name__ == "__main__":
@@ -0,0 +1,172 @@
+import json
+import os
+import re
+import tempfile
+import datetime
+from contextlib import contextmanager
+
+from scrapers.readiness import wait_until
+from scrapers.resource_blocking import open_blocked
+
+try:
+    import fcntl
+except ImportError:  # Windows: kein flock, Zugriff dann ohne Dateisperre
+    fcntl = None
+
+# Verschlüsselte Session-Daten (Cookies + localStorage) pro Account, damit nicht jeder Lauf
+# auf ein manuelles Login warten muss. Schlüssel: Fernet-Key aus SESSION_STORE_KEY.
+SESSION_STORE_DIR = os.getenv("SESSION_STORE_DIR", os.path.expanduser("~/.streamfloat/sessions"))
+SESSION_STORE_KEY = os.getenv("SESSION_STORE_KEY")
+# Wie lange beim Prüfen einer gespeicherten Session auf die eingeloggte Seite gewartet wird
+SESSION_CHECK_TIMEOUT = float(os.getenv("SESSION_CHECK_TIMEOUT", "10"))
+
+
+class SessionStore:
+    """Speichert Session-Zustände verschlüsselt; Dateisperren erlauben parallele Worker."""
+
+    def __init__(self, directory=SESSION_STORE_DIR, key=SESSION_STORE_KEY):
+        if not key:
+            raise RuntimeError("SESSION_STORE_KEY environment variable is not set!")
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError as e:
+            raise RuntimeError("Für den Session-Store wird das Paket 'cryptography' benötigt") from e
+        self.directory = directory
+        self._fernet = Fernet(key.encode() if isinstance(key, str) else key)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def _path(self, account):
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_.-]", "_", account) + ".session")
+
+    @contextmanager
+    def _lock(self, account, exclusive):
+        with open(self._path(account) + ".lock", "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self, account):
+        path = self._path(account)
+        with self._lock(account, exclusive=False):
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                token = f.read()
+        try:
+            return json.loads(self._fernet.decrypt(token))
+        except Exception as e:
+            print(f"[WARN] Session für {account} nicht lesbar: {e}")
+            return None
+
+    def save(self, account, state):
+        token = self._fernet.encrypt(json.dumps(state).encode("utf-8"))
+        with self._lock(account, exclusive=True):
+            # Atomar schreiben: erst Temp-Datei, dann umbenennen
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(token)
+                os.chmod(tmp_path, 0o600)
+                os.replace(tmp_path, self._path(account))
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+
+    def delete(self, account):
+        with self._lock(account, exclusive=True):
+            try:
+                os.remove(self._path(account))
+            except FileNotFoundError:
+                pass
+
+
+def default_store():
+    """Session-Store aus der Umgebung, oder None (dann wie bisher manuelles Login pro Lauf)."""
+    if not SESSION_STORE_KEY:
+        print("[WARN] SESSION_STORE_KEY nicht gesetzt, Sessions werden nicht gespeichert")
+        return None
+    return SessionStore()
+
+
+def _cookie_json(data):
+    """Cookie-JSON für CookieParam: Session-Cookies (expires -1) ohne Ablaufzeit, sonst verwirft Chrome sie."""
+    data = dict(data)
+    if (data.get("expires") or 0) < 0:
+        del data["expires"]
+    return data
+
+
+async def export_state(driver, tab):
+    """Cookies des Browsers und localStorage der aktuellen Seite."""
+    cookies = await driver.cookies.get_all()
+    local_storage = {}
+    try:
+        origin = await tab.evaluate("location.origin")
+        local_storage[origin] = json.loads(await tab.evaluate("JSON.stringify(Object.assign({}, localStorage))"))
+    except Exception as e:
+        print(f"[WARN] localStorage konnte nicht gelesen werden: {e}")
+    return {
+        "cookies": [_cookie_json(cookie.to_json()) for cookie in cookies],
+        "local_storage": local_storage,
+        "saved_at": datetime.datetime.now().isoformat(),
+    }
+
+
+async def import_state(driver, tab, state):
+    """Setzt gespeicherte Cookies und localStorage, bevor die erste Seite geladen wird."""
+    from nodriver import cdp
+
+    # Auch ältere Sessions, die noch mit expires -1 gespeichert wurden
+    cookies = [cdp.network.CookieParam.from_json(_cookie_json(c)) for c in state.get("cookies", [])]
+    if cookies:
+        await driver.cookies.set_all(cookies)
+    for origin, items in state.get("local_storage", {}).items():
+        if not items:
+            continue
+        try:
+            # localStorage gehört zum Origin des Dokuments: erst eine kleine Seite des Origins laden
+            # (robots.txt statt der App), auf about:blank greift set_dom_storage_item nicht
+            await tab.get(f"{origin}/robots.txt")
+            await tab.send(cdp.dom_storage.enable())
+            storage_id = cdp.dom_storage.StorageId(is_local_storage=True, security_origin=origin)
+            for key, value in items.items():
+                await tab.send(cdp.dom_storage.set_dom_storage_item(storage_id, key, value))
+        except Exception as e:
+            print(f"[WARN] localStorage für {origin} konnte nicht wiederhergestellt werden: {e}")
+
+
+async def ensure_session(driver, account, url, platform, logged_in_selector, login_timeout, store=None):
+    """Lädt die gespeicherte Session, prüft sie und fordert nur bei Ablauf ein manuelles Login an.
+
+    Liefert den Tab mit der geladenen Seite.
+    """
+    state = store.load(account) if store else None
+    tab = await driver.get("about:blank")
+    if state:
+        await import_state(driver, tab, state)
+    tab = await open_blocked(driver, url, platform)
+
+    # Eingeloggt (Selektor da) oder auf die Login-Seite umgeleitet -> sofort entscheiden
+    logged_in_expression = f"document.querySelector({json.dumps(logged_in_selector)}) !== null"
+    if state:
+        await wait_until(
+            tab, f"{logged_in_expression} || location.hostname.startsWith('accounts.')",
+            "Session-Prüfung", timeout=SESSION_CHECK_TIMEOUT,
+        )
+        if await tab.evaluate(logged_in_expression):
+            print(f"✅ Gespeicherte Session für {account} ist gültig")
+            return tab
+        print(f"⚠️ Session für {account} ist abgelaufen")
+
+    print("\n🛑 Bitte logge dich manuell ein. Weiter geht es automatisch nach dem Login.")
+    if await wait_until(tab, logged_in_expression, "manuelles Login", timeout=login_timeout):
+        if store:
+            store.save(account, await export_state(driver, tab))
+            print(f"💾 Session für {account} gespeichert")
+    else:
+        print("⚠️ Kein Login erkannt, fahre trotzdem fort")
+    return tab
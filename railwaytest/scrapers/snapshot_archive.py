@@ -0,0 +1,172 @@
+import asyncio
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+from scrapers.metrics import REGISTRY, Counter
+
+# Archiv der Rohdaten: das HTML bzw. die abgefangenen JSON-Antworten jedes Scrapes werden komprimiert
+# und inhaltsadressiert (SHA-256) abgelegt, gleiche Inhalte nur einmal. Ein Index (SQLite) hält fest,
+# wann welche Seite mit welchem Kontext (Zeitfenster, URL) aufgenommen wurde. Ändern sich Selektoren
+# oder die Diagramm-Dekodierung, rechnet scrapers.reextract die Historie offline neu, ohne Seitenabruf.
+
+SNAPSHOT_ARCHIVE = os.getenv("SNAPSHOT_ARCHIVE", "0") == "1"
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.expanduser("~/.streamfloat/snapshots"))
+SNAPSHOT_COMPRESSION_LEVEL = int(os.getenv("SNAPSHOT_COMPRESSION_LEVEL", "6"))
+
+HTML, JSON = "html", "json"
+
+snapshots_stored = Counter(
+    "streamfloat_snapshots_total", "Archivierte Rohdaten (neu oder bereits vorhandener Inhalt)", ("platform", "outcome"),
+)
+REGISTRY.append(snapshots_stored)
+
+
+class SnapshotArchive:
+    def __init__(self, directory=SNAPSHOT_DIR, compression_level=SNAPSHOT_COMPRESSION_LEVEL):
+        self.directory = directory
+        self.compression_level = compression_level
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        # put() läuft per asyncio.to_thread aus mehreren Tabs gleichzeitig
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY,
+                digest TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                view TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                artist TEXT,
+                url TEXT,
+                context TEXT,
+                captured_at TEXT NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS snapshots_by_view ON snapshots (platform, view, captured_at)"
+        )
+        self._conn.commit()
+
+    def object_path(self, digest):
+        return object_path(self.directory, digest)
+
+    def put(self, platform, view, content, kind=HTML, artist=None, url=None, context=None, captured_at=None):
+        """Legt content (str, bytes oder JSON-Objekt) ab; liefert den SHA-256 des Inhalts."""
+        if isinstance(content, str):
+            data = content.encode("utf-8")
+        elif isinstance(content, bytes):
+            data = content
+        else:
+            data = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            snapshots_stored.inc((platform, "duplicate"))
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Erst vollständig schreiben, dann umbenennen: kein halbes Objekt nach einem Abbruch
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(data, self.compression_level))
+            os.replace(tmp_path, path)
+            snapshots_stored.inc((platform, "new"))
+        captured_at = captured_at or datetime.datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO snapshots (digest, platform, view, kind, artist, url, context, captured_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (digest, platform, view, kind, artist, url, json.dumps(context or {}), captured_at),
+            )
+            self._conn.commit()
+        return digest
+
+    def read(self, digest):
+        return read_object(self.directory, digest)
+
+    def entries(self, platform=None, view=None, since=None, until=None):
+        """Index-Einträge (älteste zuerst), optional nach Plattform, Ansicht und Zeitraum gefiltert."""
+        sql = "SELECT id, digest, platform, view, kind, artist, url, context, captured_at FROM snapshots WHERE 1=1"
+        params = []
+        for clause, value in (
+            (" AND platform = ?", platform), (" AND view = ?", view),
+            (" AND captured_at >= ?", since), (" AND captured_at <= ?", until),
+        ):
+            if value is not None:
+                sql += clause
+                params.append(value)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY captured_at, id", params).fetchall()
+        keys = ("id", "digest", "platform", "view", "kind", "artist", "url", "context", "captured_at")
+        entries = [dict(zip(keys, row)) for row in rows]
+        for entry in entries:
+            entry["context"] = json.loads(entry["context"] or "{}")
+        return entries
+
+    def stats(self):
+        with self._lock:
+            snapshots, objects = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT digest) FROM snapshots"
+            ).fetchone()
+        return {"directory": self.directory, "snapshots": snapshots, "objects": objects}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def object_path(directory, digest):
+    return os.path.join(directory, "objects", digest[:2], f"{digest}.gz")
+
+
+def read_object(directory, digest):
+    """Inhalt eines Objekts als Text (ohne Index, z. B. in Worker-Prozessen)."""
+    with open(object_path(directory, digest), "rb") as f:
+        return gzip.decompress(f.read()).decode("utf-8")
+
+
+_default_archive = None
+
+
+def default_archive():
+    """Prozessweites Archiv, wenn SNAPSHOT_ARCHIVE=1 gesetzt ist; sonst None."""
+    global _default_archive
+    if SNAPSHOT_ARCHIVE and _default_archive is None:
+        _default_archive = SnapshotArchive()
+    return _default_archive
+
+
+async def archive_snapshot(platform, view, content, kind=HTML, **fields):
+    """Archiviert content im Hintergrund-Thread; Fehler beim Archivieren brechen keinen Scrape ab."""
+    archive = default_archive()
+    if archive is None or content is None:
+        return None
+    try:
+        return await asyncio.to_thread(archive.put, platform, view, content, kind, **fields)
+    except Exception as e:
+        print(f"[WARN] Snapshot konnte nicht archiviert werden: {e}")
+        return None
+
+
+async def archive_page(page, platform, view, responses=None, context=None, **fields):
+    """Archiviert die ausgewerteten JSON-Antworten [(url, json), ...]; ohne Antworten das outerHTML."""
+    if default_archive() is None:
+        return
+    if responses:
+        for response_url, data in responses:
+            await archive_snapshot(
+                platform, view, data, JSON, context={**(context or {}), "response_url": response_url}, **fields,
+            )
+        return
+    try:
+        html = await page.evaluate("document.documentElement.outerHTML")
+    except Exception as e:
+        print(f"[WARN] outerHTML für Snapshot nicht lesbar: {e}")
+        return
+    await archive_snapshot(platform, view, html, HTML, context=context, **fields)
@@ -1,134 +1,99 @@
 import asyncio
 import os
-import re
 import json
-import urllib.parse
 from datetime import datetime, timedelta
-from bs4 import BeautifulSoup
-import nodriver as uc
+from scrapers.extraction import (
+    bar_height_from_style,
+    chart_bottom_from_transform,
+    conversion_factor_from_ticks,
+    TOOLTIP_BULK_JS,
+    decode_chart,
+    extract_from_page,
+    parse_tooltip_bulk,
+)
+from scrapers.metrics import phase, scrape
+from scrapers.network_capture import (
+    capture_or_wait,
+    open_capturing,
+    series_parser,
+    soundcloud_day_label,
+    soundcloud_month_label,
+)
+from scrapers.remote_pool import run_with_pool, shared_pool
+from scrapers.snapshot_archive import archive_page
+from scrapers.supabase_writer import default_writer
+from scrapers.tabs import TAB_CONCURRENCY, close_tab, run_in_tabs
+from scrapers.timeseries_store import TimeSeriesStore
+from scrapers.readiness import wait_for_chart_bars, wait_for_network_idle, wait_until
+
+# Selektoren des Insights-Diagramms
+BAR_SELECTOR = "g[clip-path] rect.MuiBarElement-root"
+TOOLTIP_PLAYS_SELECTOR = 'div[role="tooltip"] span.mui-141fd84'
+TOOLTIP_MONTH_SELECTOR = 'div[role="tooltip"] div.mui-8euwhr > div:first-child'
+# Basis-URL (für Benchmarks auf einen lokalen Fixture-Server umstellbar)
+SOUNDCLOUD_INSIGHTS_BASE_URL = os.getenv("SOUNDCLOUD_INSIGHTS_BASE_URL", "https://insights-ui.soundcloud.com")
 
 def get_conversion_factor(soup):
     y_axis = soup.find("g", class_=lambda c: c and "MuiChartsAxis-directionY" in c)
     if not y_axis:
         return 0.5
-    ticks = y_axis.find_all("g", class_=lambda c: c and "MuiChartsAxis-tickContainer" in c)
-    if len(ticks) < 2:
-        return 0.5
-    positions, values = [], []
-    for tick in ticks:
-        transform = tick.get("transform")
-        if not transform:
-            continue
-        try:
-            content = transform.replace("translate(", "").replace(")", "")
-            parts = content.split(",") if "," in content else content.split()
-            if len(parts) < 2:
-                continue
-            y_coord = float(parts[1].strip())
-        except Exception:
-            continue
+    ticks = []
+    for tick in y_axis.find_all("g", class_=lambda c: c and "MuiChartsAxis-tickContainer" in c):
         tick_text = tick.find("text")
-        if tick_text:
-            try:
-                value = float(tick_text.get_text(strip=True))
-                positions.append(y_coord)
-                values.append(value)
-            except Exception:
-                continue
-    if len(positions) < 2:
-        return 0.5
-    min_value = min(values)
-    max_value = max(values)
-    min_index = values.index(min_value)
-    max_index = values.index(max_value)
-    pixel_diff = abs(positions[min_index] - positions[max_index])
-    value_diff = abs(max_value - min_value)
-    if pixel_diff == 0:
-        return 0.5
-    return value_diff / pixel_diff
+        ticks.append((tick.get("transform"), tick_text.get_text(strip=True) if tick_text else None))
+    return conversion_factor_from_ticks(ticks)
 
 def get_chart_bottom(soup):
     x_axis = soup.find("g", class_=lambda c: c and "MuiChartsAxis-directionX" in c)
     if x_axis and x_axis.has_attr("transform"):
-        transform_val = x_axis["transform"]
-        m = re.search(r"translate\([^,]+,\s*([^)]+)\)", transform_val)
-        if m:
-            try:
-                return float(m.group(1))
-            except Exception:
-                pass
+        return chart_bottom_from_transform(x_axis["transform"])
     return 290.0
 
 def extract_bar_height_from_transform(bar, chart_bottom):
-    style_str = bar.get("style", "")
-    m = re.search(r"translate3d\([^,]+,\s*([0-9.]+)px", style_str)
-    if m:
-        try:
-            bar_y = float(m.group(1))
-            return chart_bottom - bar_y
-        except Exception:
-            return 0
-    return 0
+    return bar_height_from_style(bar.get("style", ""), chart_bottom)
 
-async def scroll_page(page):
+async def scroll_page(page, step_timeout=1.0):
     previous_height = await page.evaluate("document.body.scrollHeight")
     while True:
         await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        await asyncio.sleep(1)
-        new_height = await page.evaluate("document.body.scrollHeight")
-        if new_height == previous_height:
+        # Weiter, sobald die Seite gewachsen ist; wächst sie innerhalb step_timeout nicht, ist das Ende erreicht
+        grown = await wait_until(
+            page, f"document.body.scrollHeight !== {previous_height}", "Nachladen beim Scrollen", timeout=step_timeout,
+        )
+        if not grown:
             break
-        previous_height = new_height
-
-async def get_driver():
-    ws_endpoint = os.getenv("BROWSERLESS_WS_URL")
-    if not ws_endpoint:
-        raise RuntimeError("BROWSERLESS_WS_URL environment variable is not set!")
-    driver = await uc.start(
-        remote=True,
-        ws_endpoint=ws_endpoint,
-        headless=True,
-        no_sandbox=True
-    )
-    return driver
-
-async def extract_streams(driver, url):
-    page = await driver.get(url)
-    await asyncio.sleep(10)
-    await scroll_page(page)
-    html_content = await page.evaluate("document.documentElement.outerHTML")
-    soup = BeautifulSoup(html_content, "html.parser")
-    conversion_factor = get_conversion_factor(soup)
-    chart_bottom = get_chart_bottom(soup)
-    total_streams = 0
-    daily_data = {}
-    stats_svg = soup.find("svg", class_=lambda c: c and "mui-1ht4czs" in c)
-    if stats_svg:
+        previous_height = await page.evaluate("document.body.scrollHeight")
+    await wait_for_network_idle(page, timeout=2, idle_for=0.3)
+
+async def extract_streams(driver, url, new_tab=False):
+    async with scrape("soundcloud", view="streams", url=url):
+        with phase("goto"):
+            page, capture = await open_capturing(driver, url, "soundcloud", new_tab=new_tab)
         try:
-            bars = stats_svg.select('g[clip-path] rect.MuiBarElement-root')
-            provided_labels = soup.find_all("text", class_=lambda c: c and "MuiChartsAxis-tickLabel" in c)
-            if len(provided_labels) != len(bars):
-                parsed = urllib.parse.urlparse(url)
-                qparams = urllib.parse.parse_qs(parsed.query)
-                try:
-                    from_ts = int(qparams.get('from', [0])[0])
-                    from_date = datetime.fromtimestamp(from_ts / 1000)
-                except Exception:
-                    from_date = datetime.now() - timedelta(days=len(bars) - 1)
-                generated_labels = [(from_date + timedelta(days=i)).strftime("%b %d") for i in range(len(bars))]
-            else:
-                generated_labels = [label.get_text(strip=True) for label in provided_labels]
-            for bar, label in zip(bars, generated_labels):
-                try:
-                    day = label
-                    bar_height = extract_bar_height_from_transform(bar, chart_bottom)
-                    daily_streams = int(round(bar_height * conversion_factor))
-                    total_streams += daily_streams
-                    daily_data[day] = daily_streams
-                except Exception:
-                    pass
-        except Exception:
-            pass
+            return await _read_streams(page, capture, url)
+        finally:
+            if new_tab:
+                await close_tab(page)
+
+async def _read_streams(page, capture, url):
+    # Exakte Tageswerte aus der Insights-Antwort; Scrollen und Balkenhöhen nur als Fallback
+    with phase("wait"):
+        captured = await capture_or_wait(
+            capture, series_parser(soundcloud_day_label, "soundcloud"),
+            wait_for_chart_bars(page, BAR_SELECTOR, timeout=10), timeout=10,
+        )
+    if captured:
+        total_streams, daily_data = captured
+    else:
+        with phase("scroll"):
+            await scroll_page(page)
+        # Ticks, Balken-Styles und Beschriftungen kompakt aus der Seite holen statt des kompletten HTML
+        with phase("extract"):
+            raw = await extract_from_page(page, "chart")
+        with phase("parse"):
+            total_streams, daily_data = decode_chart(raw, url)
+    # Optional: Rohdaten für die spätere Neu-Extraktion archivieren (SNAPSHOT_ARCHIVE=1)
+    await archive_page(page, "soundcloud", "streams", capture.responses if captured else None, url=url)
     output_data = {
         "timestamp": datetime.now().isoformat(),
         "total": total_streams,
@@ -137,18 +102,68 @@ async def extract_streams(driver, url):
     }
     return output_data
 
-async def extract_tooltip_data(driver, url):
-    page = await driver.get(url)
-    await asyncio.sleep(10)
-    bars = await page.query_selector_all("g[clip-path] rect.MuiBarElement-root")
+async def extract_tooltip_bulk(page, capture):
+    """Liest alle Monatswerte in einem Durchlauf: Insights-Antwort, sonst aria-labels/Diagrammdaten."""
+    with phase("wait"):
+        captured = await capture_or_wait(
+            capture, series_parser(soundcloud_month_label, "soundcloud"),
+            wait_for_chart_bars(page, BAR_SELECTOR, timeout=10), timeout=10,
+        )
+    if captured:
+        _, monthly = captured
+        await archive_page(page, "soundcloud", "tooltips", capture.responses)
+        return {
+            f"Bar_{i+1}": {"plays": f"{plays:,}", "month": month}
+            for i, (month, plays) in enumerate(monthly.items())
+        }
+    try:
+        with phase("extract"):
+            raw = await page.evaluate(TOOLTIP_BULK_JS)
+        with phase("parse"):
+            return parse_tooltip_bulk(json.loads(raw))
+    except Exception as e:
+        print(f"[WARN] Bulk-Extraktion der Tooltips fehlgeschlagen: {e}")
+        return None
+
+async def extract_tooltip_data(driver, url, new_tab=False):
+    async with scrape("soundcloud", view="tooltips", url=url):
+        with phase("goto"):
+            page, capture = await open_capturing(driver, url, "soundcloud", new_tab=new_tab)
+        try:
+            return await _read_tooltips(page, capture)
+        finally:
+            if new_tab:
+                await close_tab(page)
+
+async def _read_tooltips(page, capture):
+    tooltip_data = await extract_tooltip_bulk(page, capture)
+    if tooltip_data:
+        print(f"[INFO] Tooltip-Daten per Bulk-Extraktion gelesen ({len(tooltip_data)} Balken)")
+        return tooltip_data
+    # Fallback: jeden Balken einzeln hovern (Diagramm ist hier bereits gerendert)
+    print("[WARN] Bulk-Extraktion unvollständig, lese Tooltips per Hover")
+    with phase("hover"):
+        return await _hover_tooltips(page)
+
+async def _hover_tooltips(page):
+    bars = await page.query_selector_all(BAR_SELECTOR)
     tooltip_data = {}
+    month_expression = (
+        f"(() => {{ const el = document.querySelector({json.dumps(TOOLTIP_MONTH_SELECTOR)});"
+        " return el ? el.textContent : null; })()"
+    )
     for i, bar in enumerate(bars):
+        previous_month = await page.evaluate(month_expression)
         await bar.mouse_move()
-        await asyncio.sleep(2)
+        # Warten, bis der Tooltip den Monat des neuen Balkens zeigt (statt fester 2 s)
+        await wait_until(
+            page, f"(() => {{ const m = {month_expression}; return m !== null && m !== {json.dumps(previous_month)}; }})()",
+            f"Tooltip Balken {i+1}", timeout=2,
+        )
         try:
-            tooltip_span = await page.query_selector('div[role="tooltip"] span.mui-141fd84')
+            tooltip_span = await page.query_selector(TOOLTIP_PLAYS_SELECTOR)
             plays_text = tooltip_span.text if tooltip_span else None
-            month_div = await page.query_selector('div[role="tooltip"] div.mui-8euwhr > div:first-child')
+            month_div = await page.query_selector(TOOLTIP_MONTH_SELECTOR)
             month_text = month_div.text if month_div else None
             tooltip_data[f"Bar_{i+1}"] = {
                 "plays": plays_text,
@@ -161,27 +176,55 @@ async def extract_tooltip_data(driver, url):
             }
     return tooltip_data
 
-async def main():
+def insights_url(timewindow, from_ts, to_ts, resolution):
+    return f"{SOUNDCLOUD_INSIGHTS_BASE_URL}/?timewindow={timewindow}&from={from_ts}&to={to_ts}&resolution={resolution}"
+
+async def main(tab_limit=TAB_CONCURRENCY):
     now = datetime.now()
     streams7_to = int(now.timestamp()) * 1000
     streams7_from = int((now - timedelta(days=7)).timestamp()) * 1000
-    streams7_url = f"https://insights-ui.soundcloud.com/?timewindow=DAYS_7&from={streams7_from}&to={streams7_to}&resolution=DAY"
+    streams7_url = insights_url("DAYS_7", streams7_from, streams7_to, "DAY")
     streams30_to = int(now.timestamp()) * 1000
     streams30_from = int((now - timedelta(days=30)).timestamp()) * 1000
-    streams30_url = f"https://insights-ui.soundcloud.com/?timewindow=DAYS_30&from={streams30_from}&to={streams30_to}&resolution=DAY"
+    streams30_url = insights_url("DAYS_30", streams30_from, streams30_to, "DAY")
     tooltip_to = int(now.timestamp()) * 1000
     tooltip_from = int((now - timedelta(days=365)).timestamp()) * 1000
-    tooltip_url = f"https://insights-ui.soundcloud.com/?timewindow=MONTHS_12&from={tooltip_from}&to={tooltip_to}&resolution=MONTH"
+    tooltip_url = insights_url("MONTHS_12", tooltip_from, tooltip_to, "MONTH")
 
-    driver_streams7, driver_streams30, driver_tooltip = await asyncio.gather(get_driver(), get_driver(), get_driver())
+    # Optional Supabase: jede Ansicht wird gepuffert, sobald ihr Tab fertig ist (write-behind)
+    writer = default_writer()
 
-    streams7_task = asyncio.create_task(extract_streams(driver_streams7, streams7_url))
-    streams30_task = asyncio.create_task(extract_streams(driver_streams30, streams30_url))
-    tooltip_task = asyncio.create_task(extract_tooltip_data(driver_tooltip, tooltip_url))
+    async def streams(url, window):
+        result = await extract_streams(driver, url, new_tab=True)
+        if writer:
+            await writer.write_soundcloud_streams(result, window)
+        return result
 
-    streams7_result, streams30_result, tooltip_result = await asyncio.gather(
-        streams7_task, streams30_task, tooltip_task
-    )
+    async def tooltips():
+        result = await extract_tooltip_data(driver, tooltip_url, new_tab=True)
+        if writer:
+            await writer.write_soundcloud_tooltips(result)
+        return result
+
+    # Eine Session aus dem gemeinsamen Browserless-Pool, die drei Ansichten laufen parallel in eigenen Tabs
+    with phase("browser", "soundcloud"):
+        driver = await shared_pool().acquire()
+    try:
+        if writer:
+            await writer.start()
+        results = await run_in_tabs(
+            {
+                "streams7": lambda: streams(streams7_url, 7),
+                "streams30": lambda: streams(streams30_url, 30),
+                "tooltip": tooltips,
+            },
+            limit=tab_limit,
+        )
+    finally:
+        await shared_pool().release(driver)
+        if writer:
+            await writer.stop()
+    streams7_result, streams30_result, tooltip_result = results["streams7"], results["streams30"], results["tooltip"]
 
     combined_results = {
         "timestamp": datetime.now().isoformat(),
@@ -192,23 +235,13 @@ async def main():
             "source": tooltip_url
         }
     }
-    json_dir = "/Users/schnibba/spotify-dashboard/json_files/soundcloud/Gesamtstreams"
-    os.makedirs(json_dir, exist_ok=True)
-    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-    combined_json_path = os.path.join(json_dir, f"SoundcloudStreams_{timestamp_str}.json")
-
-    with open(combined_json_path, "w") as f:
-        json.dump(combined_results, f, indent=2)
-    print(f"Ergebnisse wurden in {combined_json_path} gespeichert.")
-
+    store = TimeSeriesStore()
     try:
-        await asyncio.gather(
-            driver_streams7.close(),
-            driver_streams30.close(),
-            driver_tooltip.close()
-        )
-    except Exception:
-        pass
+        with phase("store", "soundcloud"):
+            changed = store.record_soundcloud_run(combined_results)
+    finally:
+        store.close()
+    print(f"Ergebnisse wurden gespeichert: {changed} neue/geänderte Werte in {store.path}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run_with_pool(main()))
@@ -1,13 +1,28 @@
-import nodriver as uc
 import asyncio
 import os
-import json
-import re
 import datetime
-from bs4 import BeautifulSoup
+from scrapers.incremental import SPOTIFY_INCREMENTAL, derive_spotify_windows, mark_checked, plan_spotify_urls
+from scrapers.extraction import extract_from_page, parse_stats_data
+from scrapers.network_capture import capture_or_wait, open_capturing, series_parser, spotify_day_label
+from scrapers.session_store import default_store, ensure_session
+from scrapers.snapshot_archive import archive_page
+from scrapers.supabase_writer import default_writer
+from scrapers.tabs import TAB_CONCURRENCY, close_tab, run_in_tabs
+from scrapers.timeseries_store import SPOTIFY_WINDOWS, TimeSeriesStore
+from scrapers.metrics import phase, scrape
+from scrapers.rate_limit import raise_if_blocked
+from scrapers.readiness import wait_for_chart_bars, wait_for_selector
+from scrapers.remote_pool import run_with_pool, shared_pool
 
-# Speicherort für JSON
-OUTPUT_DIR = "/Users/schnibba/spotify-dashboard/json_files/spotify/Gesamtstreams"
+# Selektoren der Statistik-Seite
+STATS_BUTTON_SELECTOR = 'button[data-testid="hero-stats-button-streams"]'
+DAILY_BAR_SELECTOR = "rect[aria-label]"
+# Maximale Wartezeit auf den manuellen Login (Sekunden)
+LOGIN_TIMEOUT = int(os.getenv("SPOTIFY_LOGIN_TIMEOUT", "30"))
+# Account, unter dem die Session im Session-Store abgelegt wird
+SPOTIFY_ACCOUNT = os.getenv("SPOTIFY_ACCOUNT", "default")
+# Basis-URL (für Benchmarks auf einen lokalen Fixture-Server umstellbar)
+SPOTIFY_ARTISTS_BASE_URL = os.getenv("SPOTIFY_ARTISTS_BASE_URL", "https://artists.spotify.com")
 
 # Künstler-ID
 artist_id = "3OOeP2opYuTEm0QIU4gQ6M"
@@ -24,87 +39,129 @@ to_date_28 = yesterday.strftime(date_format)
 from_date_12 = (yesterday - datetime.timedelta(days=364)).strftime(date_format)
 to_date_12 = yesterday.strftime(date_format)
 
+def build_stats_url(artist_id, from_date, to_date):
+    """Statistik-Seite für Streams eines Artists im Bereich from_date..to_date."""
+    if isinstance(from_date, datetime.date):
+        from_date = from_date.strftime(date_format)
+    if isinstance(to_date, datetime.date):
+        to_date = to_date.strftime(date_format)
+    return f"{SPOTIFY_ARTISTS_BASE_URL}/c/artist/{artist_id}/audience/stats?fromDate={from_date}&toDate={to_date}&metric=streams&country=&comparisonId="
+
 # Spotify Statistik-URLs
 URLS = {
-    "7 Tage Streams": f"https://artists.spotify.com/c/artist/{artist_id}/audience/stats?fromDate={from_date_7}&toDate={to_date_7}&metric=streams&country=&comparisonId=",
-    "28 Tage Streams": f"https://artists.spotify.com/c/artist/{artist_id}/audience/stats?fromDate={from_date_28}&toDate={to_date_28}&metric=streams&country=&comparisonId=",
-    "12 Monate Streams": f"https://artists.spotify.com/c/artist/{artist_id}/audience/stats?fromDate={from_date_12}&toDate={to_date_12}&metric=streams&country=&comparisonId="
+    "7 Tage Streams": build_stats_url(artist_id, from_date_7, to_date_7),
+    "28 Tage Streams": build_stats_url(artist_id, from_date_28, to_date_28),
+    "12 Monate Streams": build_stats_url(artist_id, from_date_12, to_date_12)
 }
 
-# DRIVER: Initialisiere eine Nodriver-Session über Browserless
-async def get_driver():
-    ws_endpoint = os.getenv("BROWSERLESS_WS_URL")
-    if not ws_endpoint:
-        raise RuntimeError("BROWSERLESS_WS_URL environment variable is not set!")
-    driver = await uc.start(
-        remote=True,
-        ws_endpoint=ws_endpoint,
-        headless=True,
-        no_sandbox=True
-    )
-    return driver
+def stats_urls(artist_id, to_date=yesterday):
+    """Statistik-URLs der festen Zeitfenster (7 Tage, 28 Tage, 12 Monate) bis to_date."""
+    return {
+        timeframe: build_stats_url(artist_id, to_date - datetime.timedelta(days=days - 1), to_date)
+        for timeframe, days in SPOTIFY_WINDOWS.items()
+    }
 
 # Stats-Scraping einer einzelnen Zeitspanne
-async def scrape_data(driver, url, timeframe):
+async def scrape_data(driver, url, timeframe, new_tab=False):
     print(f"\n📊 Scrape {timeframe}: {url}")
-    page = await driver.get(url)
-    await asyncio.sleep(5)
-    html_content = await page.evaluate("document.documentElement.outerHTML")
-    soup = BeautifulSoup(html_content, "html.parser")
-    total_value, daily_data = None, {}
-    stats_button = soup.find("button", {"data-testid": "hero-stats-button-streams"})
-    if stats_button:
-        stats_text = stats_button.find("p", {"data-encore-id": "text"})
-        if stats_text:
-            try:
-                total_value = int(stats_text.text.replace(",", ""))
-            except Exception:
-                total_value = None
-    rect_elements = soup.find_all("rect", {"aria-label": True})
-    for rect in rect_elements:
-        aria_label = rect["aria-label"]
-        match = re.match(r"([A-Za-z]+ \d{1,2}, \d{4}), ([\d,]+) Streams", aria_label)
-        if match:
-            date = match.group(1)
-            count = int(match.group(2).replace(",", ""))
-            daily_data[date] = count
+    async with scrape("spotify_artists", timeframe=timeframe, url=url):
+        with phase("goto"):
+            page, capture = await open_capturing(driver, url, "spotify_artists", new_tab=new_tab)
+        try:
+            return await _read_stats(page, capture, timeframe, url)
+        finally:
+            if new_tab:
+                await close_tab(page)
+
+async def _read_stats(page, capture, timeframe, url=None):
+    # Tageswerte aus der Insights-API-Antwort; sonst warten, bis die Tagesbalken gerendert sind
+    with phase("wait"):
+        captured = await capture_or_wait(
+            capture, series_parser(spotify_day_label, "spotify_artists"),
+            wait_for_chart_bars(page, DAILY_BAR_SELECTOR, timeout=5), timeout=5,
+        )
+    if captured:
+        total_value, daily_data = captured
+    else:
+        # Drossel- oder Captcha-Seite statt Diagramm -> BlockedError (Roster-Crawler pausiert den Host)
+        await raise_if_blocked(page)
+        with phase("wait"):
+            await wait_for_selector(page, STATS_BUTTON_SELECTOR, timeout=5)
+        # Nur Gesamtwert und aria-labels der Balken aus der Seite holen statt des kompletten HTML
+        with phase("extract"):
+            raw = await extract_from_page(page, "stats")
+        with phase("parse"):
+            total_value, daily_data = parse_stats_data(raw)
+    # Optional: Rohdaten für die spätere Neu-Extraktion archivieren (SNAPSHOT_ARCHIVE=1)
+    await archive_page(
+        page, "spotify_artists", "stats", capture.responses if captured else None,
+        url=url, context={"timeframe": timeframe},
+    )
     print(f"  → Gesamt: {total_value}, Tage: {len(daily_data)}")
     return {"timeframe": timeframe, "total": total_value, "daily": daily_data}
 
 # Komplettvorgang für alle Zeiträume
-async def scrape_spotify_data():
+async def scrape_spotify_data(incremental=SPOTIFY_INCREMENTAL, tab_limit=TAB_CONCURRENCY):
     print("🚀 Starte nodriver für Spotify Scraping (Browserless-Modus)...")
     driver = None
+    store = TimeSeriesStore()
+    writer = default_writer()  # optional: Supabase (write-behind)
+    scraped_results = {}
     try:
-        driver = await get_driver()
-        # Login-Phase
-        first_url = next(iter(URLS.values()))
-        print("\n🛑 Manuelles Login im Browserless-Browser nötig! Nach Login ggf. mit Enter im Terminal bestätigen…")
-        await driver.get(first_url)
-        await asyncio.sleep(30)
-        scraped_results = {}
-        for timeframe, url in URLS.items():
-            result = await scrape_data(driver, url, timeframe)
-            scraped_results[timeframe] = result
-        # Daten speichern
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        output_file = os.path.join(OUTPUT_DIR, f"spotify_streams_{timestamp}.json")
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(scraped_results, f, ensure_ascii=False, indent=4)
-        print(f"\n✅ Daten wurden gespeichert: {output_file}")
+        if writer:
+            await writer.start()
+        # Inkrementell: nur fehlende bzw. noch veränderliche Tage laden
+        urls = plan_spotify_urls(store, artist_id, yesterday, build_stats_url) if incremental else URLS
+        if urls:
+            # Login-Phase: gespeicherte Session laden, nur bei Ablauf manuell einloggen
+            first_url = next(iter(urls.values()))
+            def login(driver):
+                return ensure_session(
+                    driver, SPOTIFY_ACCOUNT, first_url, "spotify_artists", STATS_BUTTON_SELECTOR, LOGIN_TIMEOUT,
+                    store=default_store(),
+                )
+            # Session aus dem gemeinsamen Browserless-Pool (wartet, wenn alle belegt sind)
+            with phase("browser", "spotify_artists"):
+                driver = await shared_pool().acquire(on_reconnect=login)
+            with phase("login", "spotify_artists"):
+                await login(driver)
+            async def scrape_timeframe(url, timeframe):
+                result = await scrape_data(driver, url, timeframe, new_tab=True)
+                # Supabase-Upsert läuft im Hintergrund, während die übrigen Tabs noch laden
+                if writer:
+                    await writer.write_spotify_stats(artist_id, {timeframe: result})
+                return result
+            # Zeiträume parallel in eigenen Tabs derselben (eingeloggten) Session
+            scraped_results = await run_in_tabs(
+                {
+                    timeframe: (lambda url=url, timeframe=timeframe: scrape_timeframe(url, timeframe))
+                    for timeframe, url in urls.items()
+                },
+                limit=tab_limit,
+            )
+            # Daten speichern
+            with phase("store", "spotify_artists"):
+                changed = store.record_spotify_run(artist_id, scraped_results)
+                mark_checked(store, artist_id, urls, scraped_results)
+            print(f"\n✅ Daten wurden gespeichert: {changed} neue/geänderte Tageswerte in {store.path}")
+        else:
+            print("\n✅ Historie ist aktuell, kein Seitenabruf nötig")
+        # Volle Fenster aus der gespeicherten Historie ableiten
+        if incremental:
+            scraped_results = derive_spotify_windows(store, artist_id, yesterday)
     except Exception as e:
         print(f"\n❌ Fehler während des Scraping-Prozesses: {e}")
     finally:
+        store.close()
+        if writer:
+            await writer.stop()
         if driver:
-            try:
-                await driver.stop()
-            except Exception as e:
-                print(f"\n⚠️ Fehler beim Schließen des Browsers: {e}")
+            await shared_pool().release(driver)
+    return scraped_results
 
 # API-kompatibler Entry-Point für FastAPI: async main()
 async def main():
     await scrape_spotify_data()
 
 if __name__ == "__main__":
-    asyncio.run(scrape_spotify_data())
+    asyncio.run(run_with_pool(scrape_spotify_data()))
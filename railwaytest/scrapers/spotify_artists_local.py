@@ -0,0 +1,184 @@
+import nodriver as uc
+import asyncio
+import os
+import datetime
+from scrapers.incremental import SPOTIFY_INCREMENTAL, derive_spotify_windows, mark_checked, plan_spotify_urls
+from scrapers.extraction import extract_from_page, parse_stats_data
+from scrapers.network_capture import capture_or_wait, open_capturing, series_parser, spotify_day_label
+from scrapers.session_store import default_store, ensure_session
+from scrapers.snapshot_archive import archive_page
+from scrapers.supabase_writer import default_writer
+from scrapers.tabs import TAB_CONCURRENCY, close_tab, run_in_tabs
+from scrapers.timeseries_store import TimeSeriesStore
+from scrapers.metrics import browser_closed, browser_opened, phase, scrape
+from scrapers.rate_limit import raise_if_blocked
+from scrapers.readiness import wait_for_chart_bars, wait_for_selector
+
+# Spotify for Artists mit lokalem Chrome (manuelles Login im sichtbaren Browser); früher der Inhalt
+# von scrapers/__init__.py, die Attribute sind dort weiterhin erreichbar (lazy).
+
+# Selektoren der Statistik-Seite
+STATS_BUTTON_SELECTOR = 'button[data-testid="hero-stats-button-streams"]'
+DAILY_BAR_SELECTOR = "rect[aria-label]"
+# Maximale Wartezeit auf den manuellen Login (Sekunden)
+LOGIN_TIMEOUT = int(os.getenv("SPOTIFY_LOGIN_TIMEOUT", "30"))
+# Account, unter dem die Session im Session-Store abgelegt wird
+SPOTIFY_ACCOUNT = os.getenv("SPOTIFY_ACCOUNT", "default")
+# Basis-URL (für Benchmarks auf einen lokalen Fixture-Server umstellbar)
+SPOTIFY_ARTISTS_BASE_URL = os.getenv("SPOTIFY_ARTISTS_BASE_URL", "https://artists.spotify.com")
+
+# Künstler-ID
+artist_id = "3OOeP2opYuTEm0QIU4gQ6M"
+
+# Dynamische Berechnung der Datumswerte:
+# Wir setzen das "toDate" auf gestern (einen Tag vor dem Start)
+today = datetime.date.today()
+yesterday = today - datetime.timedelta(days=1)
+date_format = "%Y-%m-%d"
+
+# Für 7 Tage (inklusive gestern = 7 Tage): 6 Tage zurück
+from_date_7 = (yesterday - datetime.timedelta(days=6)).strftime(date_format)
+to_date_7   = yesterday.strftime(date_format)
+
+# Für 28 Tage: 27 Tage zurück
+from_date_28 = (yesterday - datetime.timedelta(days=27)).strftime(date_format)
+to_date_28   = yesterday.strftime(date_format)
+
+# Für 12 Monate (angenommen 365 Tage, inkl. gestern): 364 Tage zurück
+from_date_12 = (yesterday - datetime.timedelta(days=364)).strftime(date_format)
+to_date_12   = yesterday.strftime(date_format)
+
+def build_stats_url(artist_id, from_date, to_date):
+    """Statistik-Seite für Streams eines Artists im Bereich from_date..to_date."""
+    if isinstance(from_date, datetime.date):
+        from_date = from_date.strftime(date_format)
+    if isinstance(to_date, datetime.date):
+        to_date = to_date.strftime(date_format)
+    return f"{SPOTIFY_ARTISTS_BASE_URL}/c/artist/{artist_id}/audience/stats?fromDate={from_date}&toDate={to_date}&metric=streams&country=&comparisonId="
+
+# 🎯 Spotify Statistik-Seiten für Streams (direkte Links) mit dynamischen Daten
+URLS = {
+    "7 Tage Streams": build_stats_url(artist_id, from_date_7, to_date_7),
+    "28 Tage Streams": build_stats_url(artist_id, from_date_28, to_date_28),
+    "12 Monate Streams": build_stats_url(artist_id, from_date_12, to_date_12)
+}
+
+async def scrape_data(driver, url, timeframe, new_tab=False):
+    """Scrape tägliche Daten aus Spotify for Artists."""
+    print(f"\n📊 Scrape {timeframe}: {url}")
+    async with scrape("spotify_artists", timeframe=timeframe, url=url):
+        with phase("goto"):
+            page, capture = await open_capturing(driver, url, "spotify_artists", new_tab=new_tab)
+        try:
+            return await _read_stats(page, capture, timeframe, url)
+        finally:
+            if new_tab:
+                await close_tab(page)
+
+async def _read_stats(page, capture, timeframe, url=None):
+    # Tageswerte aus der Insights-API-Antwort; sonst warten, bis die Tagesbalken gerendert sind
+    with phase("wait"):
+        captured = await capture_or_wait(
+            capture, series_parser(spotify_day_label, "spotify_artists"),
+            wait_for_chart_bars(page, DAILY_BAR_SELECTOR, timeout=5), timeout=5,
+        )
+    if captured:
+        total_value, daily_data = captured
+    else:
+        # Drossel- oder Captcha-Seite statt Diagramm -> BlockedError (Roster-Crawler pausiert den Host)
+        await raise_if_blocked(page)
+        with phase("wait"):
+            await wait_for_selector(page, STATS_BUTTON_SELECTOR, timeout=5)
+        # Nur Gesamtwert und aria-labels der Balken aus der Seite holen statt des kompletten HTML
+        with phase("extract"):
+            raw = await extract_from_page(page, "stats")
+        with phase("parse"):
+            total_value, daily_data = parse_stats_data(raw)
+    # Optional: Rohdaten für die spätere Neu-Extraktion archivieren (SNAPSHOT_ARCHIVE=1)
+    await archive_page(
+        page, "spotify_artists", "stats", capture.responses if captured else None,
+        url=url, context={"timeframe": timeframe},
+    )
+
+    print(f"🎧 Gesamtzahl für {timeframe}: {total_value}")
+
+    print(f"📅 Tägliche Daten ({timeframe}): {daily_data}")
+    return {"timeframe": timeframe, "total": total_value, "daily": daily_data}
+
+async def scrape_spotify_data(incremental=SPOTIFY_INCREMENTAL, tab_limit=TAB_CONCURRENCY):
+    """Startet den Scraping-Prozess (gespeicherte Session oder manuelles Login)."""
+    print("🚀 Starte nodriver für Spotify Scraping...")
+
+    driver = None  # Initialisieren
+    store = TimeSeriesStore()
+    writer = default_writer()  # optional: Supabase (write-behind)
+    scraped_results = {}
+
+    try:
+        if writer:
+            await writer.start()
+        # **Inkrementell: nur fehlende bzw. noch veränderliche Tage laden**
+        urls = plan_spotify_urls(store, artist_id, yesterday, build_stats_url) if incremental else URLS
+
+        if urls:
+            with phase("browser", "spotify_artists"):
+                driver = await uc.start(no_sandbox=True)  # Browser starten
+            browser_opened("nodriver")
+
+            # **Session laden, manuelles Login nur wenn abgelaufen**
+            first_url = next(iter(urls.values()))
+            with phase("login", "spotify_artists"):
+                await ensure_session(
+                    driver, SPOTIFY_ACCOUNT, first_url, "spotify_artists", STATS_BUTTON_SELECTOR, LOGIN_TIMEOUT,
+                    store=default_store(),
+                )
+
+            async def scrape_timeframe(url, timeframe):
+                result = await scrape_data(driver, url, timeframe, new_tab=True)
+                # **Supabase-Upsert läuft im Hintergrund, während die übrigen Tabs noch laden**
+                if writer:
+                    await writer.write_spotify_stats(artist_id, {timeframe: result})
+                return result
+
+            # **Zeiträume parallel in eigenen Tabs derselben Session scrapen**
+            scraped_results = await run_in_tabs(
+                {
+                    timeframe: (lambda url=url, timeframe=timeframe: scrape_timeframe(url, timeframe))
+                    for timeframe, url in urls.items()
+                },
+                limit=tab_limit,
+            )
+
+            # **Daten speichern**
+            with phase("store", "spotify_artists"):
+                changed = store.record_spotify_run(artist_id, scraped_results)
+                mark_checked(store, artist_id, urls, scraped_results)
+            print(f"\n✅ Daten wurden gespeichert: {changed} neue/geänderte Tageswerte in {store.path}")
+        else:
+            print("\n✅ Historie ist aktuell, kein Seitenabruf nötig")
+
+        # **Volle Fenster aus der gespeicherten Historie ableiten**
+        if incremental:
+            scraped_results = derive_spotify_windows(store, artist_id, yesterday)
+
+    except Exception as e:
+        print(f"\n❌ Fehler während des Scraping-Prozesses: {e}")
+
+    finally:
+        store.close()
+        if writer:
+            await writer.stop()
+
+        # **Browser sauber beenden**
+        if driver:
+            try:
+                await driver.stop()
+            except Exception as e:
+                print(f"\n⚠️ Fehler beim Schließen des Browsers: {e}")
+            browser_closed("nodriver")
+
+    return scraped_results
+
+# **Skript ausführen**
+if __name__ == "__main__":
+    asyncio.run(scrape_spotify_data())
@@ -0,0 +1,227 @@
+import asyncio
+import datetime
+import os
+import random
+import time
+from collections import OrderedDict
+
+from scrapers.metrics import REGISTRY, Counter, Gauge
+from scrapers.timeseries_store import (
+    SOUNDCLOUD_ARTIST,
+    _iso,
+    soundcloud_monthly_rows,
+    soundcloud_run_rows,
+    soundcloud_streams_rows,
+    spotify_public_rows,
+    spotify_run_rows,
+)
+
+# Write-behind-Puffer für Supabase: Scraper legen ihre Werte nur im Speicher ab, ein Hintergrund-Task
+# schreibt sie gebündelt (Größe oder Zeitintervall) per Upsert über einen wiederverwendeten Client.
+# Schlüssel wie in der Zeitreihen-Ablage (platform, artist, metric, date): Wiederholungen nach Fehlern
+# sind idempotent, mehrfach gepufferte Werte desselben Tages werden zusammengefasst. Ist die Datenbank
+# langsam oder weg, füllt sich der Puffer bis SUPABASE_MAX_BUFFER, danach warten die Scraper (Backpressure).
+#
+# Tabelle in Supabase:
+#   create table stream_points (
+#       platform text not null, artist text not null, metric text not null, date date not null,
+#       value bigint not null, collected_at timestamptz not null,
+#       primary key (platform, artist, metric, date)
+#   );
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+SUPABASE_TABLE = os.getenv("SUPABASE_TABLE", "stream_points")
+SUPABASE_BATCH_SIZE = int(os.getenv("SUPABASE_BATCH_SIZE", "500"))
+# Spätestens nach so vielen Sekunden wird auch ein kleiner Puffer geschrieben
+SUPABASE_FLUSH_INTERVAL = float(os.getenv("SUPABASE_FLUSH_INTERVAL", "2"))
+SUPABASE_MAX_BUFFER = int(os.getenv("SUPABASE_MAX_BUFFER", "5000"))
+SUPABASE_MAX_RETRIES = int(os.getenv("SUPABASE_MAX_RETRIES", "4"))
+SUPABASE_RETRY_BASE = float(os.getenv("SUPABASE_RETRY_BASE", "0.5"))
+SUPABASE_RETRY_MAX = 30.0
+
+ON_CONFLICT = "platform,artist,metric,date"
+
+supabase_rows = Counter(
+    "streamfloat_supabase_rows_total", "Nach Supabase geschriebene bzw. fehlgeschlagene Zeilen", ("outcome",),
+)
+supabase_buffered = Gauge("streamfloat_supabase_buffered_rows", "Zeilen im Supabase-Puffer (inkl. laufender Batches)")
+REGISTRY.extend([supabase_rows, supabase_buffered])
+
+
+class SupabaseWriter:
+    def __init__(self, url=SUPABASE_URL, key=SUPABASE_KEY, table=SUPABASE_TABLE, batch_size=SUPABASE_BATCH_SIZE,
+                 flush_interval=SUPABASE_FLUSH_INTERVAL, max_buffer=SUPABASE_MAX_BUFFER,
+                 max_retries=SUPABASE_MAX_RETRIES, retry_base=SUPABASE_RETRY_BASE, client=None):
+        self.url, self.key, self.table = url, key, table
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_buffer = max(self.batch_size, max_buffer)
+        self.max_retries = max(0, max_retries)
+        self.retry_base = retry_base
+        self._client = client
+        self._pending = OrderedDict()  # (platform, artist, metric, date) -> Zeile
+        self._in_flight = 0
+        self._space = None
+        self._wakeup = None
+        self._flush_lock = None
+        self._task = None
+        self._closing = False
+        self._stats = {
+            "rows_written": 0, "batches": 0, "retries": 0, "failed_batches": 0,
+            "backpressure_waits": 0, "backpressure_seconds": 0.0, "last_error": None,
+        }
+
+    @property
+    def buffered(self):
+        return len(self._pending) + self._in_flight
+
+    async def start(self):
+        if self._task is not None:
+            return
+        if self._client is None:
+            from supabase import create_client
+
+            self._client = create_client(self.url, self.key)
+        self._space = asyncio.Condition()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._closing = False
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Schreibt den restlichen Puffer und beendet den Hintergrund-Task."""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._pending:
+            print(f"[WARN] {len(self._pending)} Zeilen konnten nicht nach Supabase geschrieben werden")
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def put(self, rows, collected_at=None):
+        """Puffert [(platform, artist, metric, date, value), ...]; wartet, solange der Puffer voll ist."""
+        if self._task is None:
+            raise RuntimeError("SupabaseWriter nicht gestartet")
+        collected_at = collected_at or datetime.datetime.now().isoformat(timespec="seconds")
+        for platform, artist, metric, day, value in rows:
+            key = (platform, artist, metric, _iso(day))
+            if key not in self._pending and self.buffered >= self.max_buffer:
+                await self._wait_for_space()
+            self._pending[key] = {
+                "platform": platform, "artist": artist, "metric": metric, "date": key[3],
+                "value": int(value), "collected_at": collected_at,
+            }
+        supabase_buffered.set((), self.buffered)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _wait_for_space(self):
+        start = time.monotonic()
+        self._stats["backpressure_waits"] += 1
+        self._wakeup.set()
+        async with self._space:
+            await self._space.wait_for(lambda: self.buffered < self.max_buffer)
+        self._stats["backpressure_seconds"] += time.monotonic() - start
+
+    async def write_spotify_stats(self, artist, results, collected_at=None):
+        """Ergebnisse von scrape_data / scrape_spotify_data: {timeframe: {"total", "daily"}}."""
+        await self.put(spotify_run_rows(artist, results), collected_at)
+
+    async def write_spotify_public(self, artist, result, collected_at=None):
+        """Ergebnis von scrape_spotify_artist_tracks."""
+        await self.put(spotify_public_rows(artist, result), collected_at)
+
+    async def write_soundcloud_streams(self, result, window, artist=SOUNDCLOUD_ARTIST, collected_at=None):
+        """Ergebnis von extract_streams (window = 7 oder 30 Tage)."""
+        await self.put(soundcloud_streams_rows(result, window, artist), collected_at)
+
+    async def write_soundcloud_tooltips(self, tooltips, artist=SOUNDCLOUD_ARTIST, collected_at=None):
+        """Ergebnis von extract_tooltip_data (Monatswerte)."""
+        await self.put(soundcloud_monthly_rows(tooltips, artist), collected_at)
+
+    async def write_soundcloud_run(self, combined, artist=SOUNDCLOUD_ARTIST, collected_at=None):
+        await self.put(soundcloud_run_rows(combined, artist), collected_at)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            closing = self._closing
+            await self.flush()
+            if closing:
+                return
+
+    async def flush(self):
+        """Schreibt den Puffer in Batches; bei endgültigem Fehler bleiben die Zeilen für den nächsten Lauf."""
+        async with self._flush_lock:
+            while self._pending:
+                batch = []
+                while self._pending and len(batch) < self.batch_size:
+                    batch.append(self._pending.popitem(last=False))
+                self._in_flight += len(batch)
+                try:
+                    await self._upsert([row for _, row in batch])
+                except Exception as e:
+                    self._stats["failed_batches"] += 1
+                    self._stats["last_error"] = str(e)
+                    supabase_rows.inc(("failed",), len(batch))
+                    print(f"[WARN] Supabase-Batch mit {len(batch)} Zeilen fehlgeschlagen: {e}")
+                    # Neuere Werte derselben Schlüssel haben Vorrang
+                    for key, row in batch:
+                        self._pending.setdefault(key, row)
+                    return False
+                finally:
+                    self._in_flight -= len(batch)
+                    supabase_buffered.set((), self.buffered)
+                    async with self._space:
+                        self._space.notify_all()
+                self._stats["rows_written"] += len(batch)
+                self._stats["batches"] += 1
+                supabase_rows.inc(("ok",), len(batch))
+            return True
+
+    async def _upsert(self, rows):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await asyncio.to_thread(self._execute, rows)
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                self._stats["retries"] += 1
+                delay = min(self.retry_base * 2 ** attempt, SUPABASE_RETRY_MAX)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    def _execute(self, rows):
+        from postgrest.types import ReturnMethod
+
+        self._client.table(self.table).upsert(
+            rows, on_conflict=ON_CONFLICT, returning=ReturnMethod.minimal,
+        ).execute()
+
+    def stats(self):
+        return {
+            "table": self.table,
+            "buffered": self.buffered,
+            "in_flight": self._in_flight,
+            **self._stats,
+            "backpressure_seconds": round(self._stats["backpressure_seconds"], 3),
+        }
+
+
+def default_writer():
+    """Supabase-Writer aus der Umgebung, oder None (dann nur lokale Zeitreihen-Ablage)."""
+    if not (SUPABASE_URL and SUPABASE_KEY):
+        return None
+    return SupabaseWriter()
@@ -0,0 +1,30 @@
+import asyncio
+import os
+
+# Mehrere Tabs in einer (eingeloggten) nodriver-Session parallel statt mehrerer Browser-Sessions.
+# Tabs teilen Cookies und Session; TAB_CONCURRENCY begrenzt die gleichzeitig offenen Tabs.
+
+TAB_CONCURRENCY = int(os.getenv("TAB_CONCURRENCY", "3"))
+
+
+async def run_in_tabs(tasks, limit=TAB_CONCURRENCY):
+    """Führt {name: async fn()} parallel aus, höchstens limit gleichzeitig.
+
+    Liefert {name: ergebnis} in der Reihenfolge von tasks; bei limit=1 läuft alles nacheinander.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(fn):
+        async with semaphore:
+            return await fn()
+
+    names = list(tasks)
+    results = await asyncio.gather(*(run(tasks[name]) for name in names))
+    return dict(zip(names, results))
+
+
+async def close_tab(tab):
+    try:
+        await tab.close()
+    except Exception as e:
+        print(f"[WARN] Tab konnte nicht geschlossen werden: {e}")
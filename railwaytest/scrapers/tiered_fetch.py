@@ -0,0 +1,154 @@
+import asyncio
+import base64
+import binascii
+import json
+import os
+import re
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scrapers.extraction import artist_data_from_html, parse_artist_data
+from scrapers.metrics import REGISTRY, Counter, phase
+from scrapers.network_capture import parse_artist_overview
+from scrapers.rate_limit import BlockedError, retry_after_seconds
+from scrapers.snapshot_archive import HTML, archive_snapshot
+
+# Gestufter Abruf: zuerst ein einfacher HTTP-Request (Keep-Alive-Verbindungen aus einem Pool) und
+# Auswertung der eingebetteten bzw. serverseitig gerenderten Daten. Erst wenn das Ergebnis
+# unvollständig ist, übernimmt der Browser. Jede Antwort nennt die Stufe ("tier"), die sie geliefert hat.
+
+TIERED_FETCH = os.getenv("TIERED_FETCH", "1") == "1"
+HTTP_FETCH_TIMEOUT = float(os.getenv("HTTP_FETCH_TIMEOUT", "5"))
+# Gleichzeitige Keep-Alive-Verbindungen pro Host
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_USER_AGENT = os.getenv(
+    "HTTP_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+)
+
+HTTP, BROWSER = "http", "browser"
+
+# Skripte mit eingebettetem Seitenzustand (JSON oder Base64-kodiertes JSON)
+EMBEDDED_STATE_RE = re.compile(
+    r'<script[^>]*\bid="(?:initialState|__NEXT_DATA__|resource)"[^>]*>(.*?)</script>', re.S,
+)
+# Markierung der serverseitig gerenderten Hörerzahl (Klasse aus LISTENERS_SELECTOR)
+LISTENERS_MARKER = "VmDxGgs77HhmKczsLLBQ"
+
+fetch_tier = Counter("streamfloat_fetch_tier_total", "Beantwortete Abrufe je Stufe", ("platform", "tier"))
+REGISTRY.append(fetch_tier)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def http_session():
+    """Gemeinsame requests-Session; hält die Verbindungen zwischen Abrufen offen."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "User-Agent": HTTP_USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": "en-US,en;q=0.9",
+            })
+            _session = session
+        return _session
+
+
+def fetch_html(url):
+    response = http_session().get(url, timeout=HTTP_FETCH_TIMEOUT)
+    if response.status_code == 429:
+        raise BlockedError("HTTP 429", url, retry_after_seconds(response.headers.get("retry-after")))
+    response.raise_for_status()
+    return response.text
+
+
+def _decode_state(text):
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return json.loads(base64.b64decode(text, validate=True))
+    except (ValueError, binascii.Error):
+        return None
+
+
+def _find_artist(value, depth=0):
+    """Sucht im Seitenzustand das Artist-Objekt (wie artistUnion der Pathfinder-Antwort)."""
+    if depth > 12:
+        return None
+    if isinstance(value, dict):
+        stats = value.get("stats")
+        if isinstance(stats, dict) and "monthlyListeners" in stats:
+            return value
+        children = value.values()
+    elif isinstance(value, list):
+        children = value
+    else:
+        return None
+    for child in children:
+        found = _find_artist(child, depth + 1)
+        if found is not None:
+            return found
+    return None
+
+
+def artist_data_from_state(html):
+    for match in EMBEDDED_STATE_RE.finditer(html):
+        artist = _find_artist(_decode_state(match.group(1)))
+        if artist is not None:
+            return parse_artist_overview({"data": {"artistUnion": artist}})
+    return None
+
+
+def artist_data_from_markup(html):
+    if LISTENERS_MARKER not in html:
+        return None
+    return parse_artist_data(artist_data_from_html(html))
+
+
+def is_complete(data):
+    """Hörerzahl und mindestens ein Track, jeder mit Playzahl; sonst muss der Browser ran."""
+    if not data or data.get("monthly_listeners") is None or not data.get("tracks"):
+        return False
+    return all(track.get("play_count") is not None for track in data["tracks"])
+
+
+def parse_artist_http(html):
+    for parse in (artist_data_from_state, artist_data_from_markup):
+        data = parse(html)
+        if is_complete(data):
+            return data
+    return None
+
+
+async def fetch_artist_http(url, artist=None):
+    """HTTP-Stufe für die Artist-Seite: vollständige Daten oder None (dann Browser)."""
+    try:
+        with phase("http"):
+            html = await asyncio.to_thread(fetch_html, url)
+    except BlockedError as e:
+        # Der Browser kommt oft trotzdem durch und prüft selbst auf 429 bzw. Captcha
+        print(f"[INFO] HTTP-Abruf gedrosselt ({e.reason}), nutze Browser")
+        return None
+    except Exception as e:
+        print(f"[INFO] HTTP-Abruf fehlgeschlagen ({e}), nutze Browser")
+        return None
+    with phase("parse"):
+        data = parse_artist_http(html)
+    if data is None:
+        print("[INFO] HTTP-Antwort unvollständig, nutze Browser")
+    else:
+        await archive_snapshot("spotify_public", "artist", html, HTML, artist=artist, url=url, context={"tier": HTTP})
+    return data
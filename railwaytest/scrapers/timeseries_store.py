@@ -0,0 +1,310 @@
+import argparse
+import datetime
+import glob
+import json
+import os
+import re
+import sqlite3
+
+# Zeitreihen-Ablage statt einer JSON-Datei pro Lauf: ein Wert pro (Plattform, Artist, Metrik, Datum).
+# Überlappende Fenster (7/28/365 Tage) schreiben dieselben Tage nur einmal; geänderte Werte werden
+# aktualisiert. Bereichsabfragen laufen über den Primärschlüssel.
+
+TIMESERIES_DB_PATH = os.getenv("TIMESERIES_DB_PATH", os.path.expanduser("~/.streamfloat/timeseries.sqlite3"))
+SOUNDCLOUD_ARTIST = os.getenv("SOUNDCLOUD_ARTIST", "default")
+
+# Zeitfenster der Spotify-for-Artists-Läufe -> Anzahl Tage
+SPOTIFY_WINDOWS = {"7 Tage Streams": 7, "28 Tage Streams": 28, "12 Monate Streams": 365}
+
+
+class TimeSeriesStore:
+    def __init__(self, path=TIMESERIES_DB_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS points (
+                platform TEXT NOT NULL,
+                artist TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                date TEXT NOT NULL,
+                value INTEGER NOT NULL,
+                collected_at TEXT NOT NULL,
+                PRIMARY KEY (platform, artist, metric, date)
+            ) WITHOUT ROWID"""
+        )
+        # Abgefragte Tage, auch ohne Wert (Artist noch nicht aktiv, Lücke im Diagramm): gelten als bekannt
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS checked (
+                platform TEXT NOT NULL,
+                artist TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                date TEXT NOT NULL,
+                PRIMARY KEY (platform, artist, metric, date)
+            ) WITHOUT ROWID"""
+        )
+        self._conn.commit()
+
+    def write_points(self, platform, artist, metric, points, collected_at=None):
+        """Schreibt {date: value}; bereits gespeicherte, unveränderte Tage werden übersprungen.
+
+        Liefert die Anzahl neuer oder geänderter Werte.
+        """
+        collected_at = collected_at or datetime.datetime.now().isoformat(timespec="seconds")
+        rows = [
+            (platform, artist, metric, _iso(day), int(value), collected_at)
+            for day, value in points.items() if value is not None
+        ]
+        before = self._conn.total_changes
+        self._conn.executemany(
+            """INSERT INTO points (platform, artist, metric, date, value, collected_at)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT (platform, artist, metric, date)
+               DO UPDATE SET value = excluded.value, collected_at = excluded.collected_at
+               WHERE points.value != excluded.value""",
+            rows,
+        )
+        self._conn.commit()
+        return self._conn.total_changes - before
+
+    def query(self, platform, artist, metric, start=None, end=None):
+        """[(date, value), ...] im Bereich start..end (inklusive, ISO-Datum oder date)."""
+        sql = "SELECT date, value FROM points WHERE platform = ? AND artist = ? AND metric = ?"
+        params = [platform, artist, metric]
+        if start is not None:
+            sql += " AND date >= ?"
+            params.append(_iso(start))
+        if end is not None:
+            sql += " AND date <= ?"
+            params.append(_iso(end))
+        return self._conn.execute(sql + " ORDER BY date", params).fetchall()
+
+    def dates(self, platform, artist, metric, start=None, end=None):
+        return {datetime.date.fromisoformat(day) for day, _ in self.query(platform, artist, metric, start, end)}
+
+    def mark_checked(self, platform, artist, metric, start, end):
+        """Vermerkt start..end als abgefragt; fehlende Tage darin werden nicht erneut geladen."""
+        days = [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO checked (platform, artist, metric, date) VALUES (?, ?, ?, ?)",
+            [(platform, artist, metric, _iso(day)) for day in days],
+        )
+        self._conn.commit()
+
+    def checked_dates(self, platform, artist, metric, start=None, end=None):
+        sql = "SELECT date FROM checked WHERE platform = ? AND artist = ? AND metric = ?"
+        params = [platform, artist, metric]
+        if start is not None:
+            sql += " AND date >= ?"
+            params.append(_iso(start))
+        if end is not None:
+            sql += " AND date <= ?"
+            params.append(_iso(end))
+        return {datetime.date.fromisoformat(day) for (day,) in self._conn.execute(sql, params)}
+
+    def close(self):
+        self._conn.close()
+
+    # -----------------------------------------------------------------------
+    # Schreiben der Scraper-Ergebnisse (auch für den Import alter JSON-Dateien)
+    # -----------------------------------------------------------------------
+
+    def write_rows(self, rows, collected_at=None):
+        """Schreibt [(platform, artist, metric, date, value), ...]; liefert neue/geänderte Werte."""
+        grouped = {}
+        for platform, artist, metric, day, value in rows:
+            grouped.setdefault((platform, artist, metric), {})[day] = value
+        return sum(
+            self.write_points(platform, artist, metric, points, collected_at)
+            for (platform, artist, metric), points in grouped.items()
+        )
+
+    def record_spotify_run(self, artist, results, collected_at=None):
+        """Ergebnisse von scrape_spotify_data: {timeframe: {"total", "daily"}}."""
+        return self.write_rows(spotify_run_rows(artist, results), collected_at)
+
+    def record_spotify_public_run(self, artist, result, collected_at=None):
+        """Ergebnis von scrape_spotify_artist_tracks: monatliche Hörer und Playzahlen der Top-Tracks."""
+        return self.write_rows(spotify_public_rows(artist, result), collected_at)
+
+    def record_soundcloud_run(self, combined, artist=SOUNDCLOUD_ARTIST, collected_at=None):
+        """Ergebnis von soundcloud_7Dstreams.main (streams7days, streams30days, tooltip12months)."""
+        return self.write_rows(soundcloud_run_rows(combined, artist), collected_at)
+
+    def import_json_archive(self, directory, spotify_artist):
+        """Importiert vorhandene spotify_streams_*.json und SoundcloudStreams_*.json."""
+        changed, files = 0, 0
+        for path in sorted(glob.glob(os.path.join(directory, "**", "*.json"), recursive=True)):
+            name = os.path.basename(path)
+            collected_at = datetime.datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds")
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if name.startswith("spotify_streams_"):
+                changed += self.record_spotify_run(spotify_artist, data, collected_at)
+            elif name.startswith("SoundcloudStreams_"):
+                changed += self.record_soundcloud_run(data, collected_at=collected_at)
+            else:
+                continue
+            files += 1
+        return files, changed
+
+
+# ---------------------------------------------------------------------------
+# Scraper-Ergebnisse -> Zeilen (platform, artist, metric, date, value)
+# ---------------------------------------------------------------------------
+
+def spotify_run_rows(artist, results):
+    """{timeframe: {"total", "daily"}} von scrape_data bzw. scrape_spotify_data."""
+    rows = []
+    for timeframe, result in results.items():
+        days = []
+        for label, value in (result.get("daily") or {}).items():
+            day = parse_spotify_label(label)
+            if day and value is not None:
+                rows.append(("spotify", artist, "streams", day, value))
+                days.append(day)
+        # Gesamtwerte nur für die festen Fenster (nicht für inkrementelle Teilbereiche)
+        if days and result.get("total") is not None and timeframe in SPOTIFY_WINDOWS:
+            rows.append(("spotify", artist, f"streams_total_{SPOTIFY_WINDOWS[timeframe]}d", max(days), result["total"]))
+    return rows
+
+
+def spotify_public_rows(artist, result):
+    """Ergebnis von scrape_spotify_artist_tracks."""
+    day = (_parse_timestamp(result.get("scrape_time")) or datetime.datetime.now()).date()
+    data = result.get("data") or {}
+    rows = []
+    if data.get("monthly_listeners") is not None:
+        rows.append(("spotify_public", artist, "monthly_listeners", day, data["monthly_listeners"]))
+    for track in data.get("tracks") or []:
+        if track.get("play_count") is not None:
+            rows.append(("spotify_public", artist, f"track_plays:{track['track_name']}", day, track["play_count"]))
+    return rows
+
+
+def soundcloud_streams_rows(result, window, artist=SOUNDCLOUD_ARTIST, reference=None):
+    """Ergebnis von extract_streams (window = 7 oder 30 Tage)."""
+    reference = _parse_timestamp(result.get("timestamp")) or reference or datetime.datetime.now()
+    rows = []
+    for label, value in (result.get("daily") or {}).items():
+        day = parse_label_without_year(label, reference.date())
+        if day and value is not None:
+            rows.append(("soundcloud", artist, "plays", day, value))
+    if result.get("total") is not None:
+        rows.append(("soundcloud", artist, f"plays_total_{window}d", reference.date(), result["total"]))
+    return rows
+
+
+def soundcloud_run_rows(combined, artist=SOUNDCLOUD_ARTIST):
+    """Ergebnis von soundcloud_7Dstreams.main (streams7days, streams30days, tooltip12months)."""
+    run_time = _parse_timestamp(combined.get("timestamp")) or datetime.datetime.now()
+    rows = []
+    for key, window in (("streams7days", 7), ("streams30days", 30)):
+        rows += soundcloud_streams_rows(combined.get(key) or {}, window, artist, run_time)
+    rows += soundcloud_monthly_rows((combined.get("tooltip12months") or {}).get("data") or {}, artist, run_time)
+    return rows
+
+
+def soundcloud_monthly_rows(tooltips, artist=SOUNDCLOUD_ARTIST, reference=None):
+    """Ergebnis von extract_tooltip_data: {bar: {"plays", "month"}}."""
+    reference = reference or datetime.datetime.now()
+    rows = []
+    for bar in tooltips.values():
+        month = parse_month_label(bar.get("month"), reference.date())
+        plays = parse_count(bar.get("plays"))
+        if month and plays is not None:
+            rows.append(("soundcloud", artist, "plays_monthly", month, plays))
+    return rows
+
+
+def _iso(day):
+    return day.isoformat() if isinstance(day, (datetime.date, datetime.datetime)) else str(day)
+
+
+def _parse_timestamp(value):
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_spotify_label(label):
+    """'Mar 5, 2025' -> date"""
+    try:
+        return datetime.datetime.strptime(label, "%b %d, %Y").date()
+    except ValueError:
+        return None
+
+
+def parse_label_without_year(label, reference):
+    """'Mar 05' -> date; das Jahr wird so gewählt, dass das Datum nicht nach reference liegt."""
+    try:
+        day = datetime.datetime.strptime(f"{label} {reference.year}", "%b %d %Y").date()
+    except ValueError:
+        return None
+    if day > reference + datetime.timedelta(days=1):
+        day = day.replace(year=day.year - 1)
+    return day
+
+
+def parse_month_label(label, reference):
+    """'March 2025', 'Mar 2025', 'Mar' -> erster Tag des Monats."""
+    if not label:
+        return None
+    for fmt in ("%B %Y", "%b %Y"):
+        try:
+            return datetime.datetime.strptime(label.strip(), fmt).date().replace(day=1)
+        except ValueError:
+            pass
+    for fmt in ("%B", "%b"):
+        try:
+            month = datetime.datetime.strptime(label.strip(), fmt).month
+        except ValueError:
+            continue
+        year = reference.year if month <= reference.month else reference.year - 1
+        return datetime.date(year, month, 1)
+    return None
+
+
+def parse_count(text):
+    """'1,234' / '1.2K' / '3M' -> int"""
+    if text is None:
+        return None
+    m = re.search(r"([\d.,]+)\s*([KkMm]?)", str(text))
+    if not m:
+        return None
+    number, suffix = m.group(1), m.group(2).upper()
+    if suffix:
+        return int(round(float(number.replace(",", ".")) * (1000 if suffix == "K" else 1000000)))
+    return int(number.replace(",", "").replace(".", ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zeitreihen-Ablage: Import und Abfrage")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="JSON-Archiv importieren")
+    p_import.add_argument("directory")
+    p_import.add_argument("--spotify-artist", default="3OOeP2opYuTEm0QIU4gQ6M")
+    p_query = sub.add_parser("query", help="Werte eines Zeitraums ausgeben")
+    p_query.add_argument("platform")
+    p_query.add_argument("artist")
+    p_query.add_argument("metric")
+    p_query.add_argument("--start")
+    p_query.add_argument("--end")
+    parser.add_argument("--db", default=TIMESERIES_DB_PATH)
+    args = parser.parse_args()
+
+    store = TimeSeriesStore(args.db)
+    if args.command == "import":
+        files, changed = store.import_json_archive(args.directory, args.spotify_artist)
+        print(f"✅ {files} Dateien importiert, {changed} Werte neu oder geändert")
+    else:
+        for day, value in store.query(args.platform, args.artist, args.metric, args.start, args.end):
+            print(f"{day}\t{value}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests laufen aus railwaytest/ (python -m pytest); Paket "scrapers" auch bei anderem Arbeitsverzeichnis finden
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+from scrapers import admission
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/proc"), reason="benötigt Linux /proc")
+
+
+def test_sample_memory_prefers_cgroup_usage(monkeypatch):
+    monkeypatch.setattr(admission, "cgroup_usage_mb", lambda: 512.0)
+
+    used, browsers = admission.sample_memory()
+
+    assert used == 512.0
+    assert browsers == []
+
+
+def test_sample_memory_falls_back_to_pss_of_process_tree(monkeypatch):
+    monkeypatch.setattr(admission, "cgroup_usage_mb", lambda: None)
+
+    used, _ = admission.sample_memory()
+
+    # PSS zählt geteilte Seiten anteilig: nie mehr als der RSS
+    assert 0 < used <= admission.rss_mb(os.getpid()) + 1
+
+
+def test_capacity_uses_measured_usage():
+    # Ein laufender Scrape außerhalb der Anlaufzeit: nur der gemessene Verbrauch zählt
+    controller = admission.AdmissionController(budget_mb=1000, estimate_mb=300, ramp_seconds=0)
+    controller._active.add(admission._Ticket(None))
+    controller.used_mb = 600
+    assert controller.has_capacity()
+    controller.used_mb = 800
+    assert not controller.has_capacity()
@@ -0,0 +1,35 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+from scrapers.admission import AdmissionRejected, ScrapeDeadlineExceeded
+from scrapers.rate_limit import BlockedError
+
+
+def failing_get(error):
+    async def get(artist_id):
+        raise error
+
+    return get
+
+
+@pytest.fixture
+def client():
+    # Ohne "with": keine Startup-Hooks (Warm-up, Watchdog, Job-Worker)
+    return TestClient(app.app)
+
+
+@pytest.mark.parametrize("error, status, retry_after", [
+    (AdmissionRejected("Warteschlange voll", retry_after=7), 503, "7"),
+    (BlockedError("HTTP 429", "https://open.spotify.com/artist/abc", retry_after=12), 429, "12"),
+    (BlockedError("captcha"), 429, "30"),
+    (ScrapeDeadlineExceeded("Scrape nach 120s abgebrochen"), 504, None),
+    (RuntimeError("Selektor fehlt"), 500, None),
+])
+def test_scrape_errors_map_to_status(client, monkeypatch, error, status, retry_after):
+    monkeypatch.setattr(app.spotify_cache, "get", failing_get(error))
+
+    response = client.post("/scrape/spotify", json={"artist_id": "abc"})
+
+    assert response.status_code == status
+    assert response.headers.get("retry-after") == retry_after
@@ -0,0 +1,63 @@
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+
+import scrapers
+
+
+def test_load_backend_waits_for_import_running_in_another_thread(tmp_path, monkeypatch):
+    (tmp_path / "slow_test_backend.py").write_text("import time\ntime.sleep(0.5)\ndef scrape():\n    return 'ok'\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setitem(scrapers.BACKENDS, "slow_test", "slow_test_backend")
+    monkeypatch.delitem(sys.modules, "slow_test_backend", raising=False)
+
+    # Wie das Warm-up: Import im Thread, währenddessen fordert ein Request dasselbe Backend an
+    warmup = threading.Thread(target=scrapers.preload, args=(["slow_test"],))
+    warmup.start()
+    time.sleep(0.1)
+    module = scrapers.load_backend("slow_test")
+    warmup.join()
+
+    assert module.scrape() == "ok"
+    assert "slow_test" in scrapers.load_timings
+
+
+def test_load_backend_rejects_unknown_name():
+    with pytest.raises(ValueError, match="gibt_es_nicht"):
+        scrapers.load_backend("gibt_es_nicht")
+
+
+def test_first_scrape_does_not_block_event_loop_during_import(tmp_path, monkeypatch):
+    import app
+
+    (tmp_path / "slow_spotify_backend.py").write_text(
+        "import time\ntime.sleep(0.5)\n"
+        "async def scrape_spotify_artist_tracks(artist_id, pool=None):\n    return {'artist_id': artist_id}\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setitem(scrapers.BACKENDS, "spotify_public", "slow_spotify_backend")
+    monkeypatch.delitem(sys.modules, "slow_spotify_backend", raising=False)
+    monkeypatch.setattr(app, "supabase_writer", None)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        result = await app.load_artist_tracks("abc")
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(run())
+
+    assert result == {"artist_id": "abc"}
+    # Während des 0,5 s langen Imports läuft die Event-Loop weiter (/metrics, Job-Worker, Watchdog)
+    assert ticks >= 20
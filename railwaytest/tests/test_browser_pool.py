@@ -0,0 +1,52 @@
+import asyncio
+
+from scrapers.admission import AdmissionController
+from scrapers.browser_pool import BrowserPool
+
+
+class FakeContext:
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def is_connected(self):
+        return True
+
+    async def new_context(self, **options):
+        return FakeContext()
+
+
+def started_pool(**options):
+    pool = BrowserPool(**options)
+    pool._playwright = object()  # gilt als gestartet, ohne Playwright
+    pool._browsers = [FakeBrowser()]
+    return pool
+
+
+def test_queueing_behind_pool_limit_does_not_count_towards_deadline():
+    async def run():
+        # Budget ohne Limit: nur Pool-Limit und Deadline wirken
+        admission = AdmissionController(budget_mb=None, deadline=1, interval=0.05)
+        pool = started_pool(max_concurrency=1, admission=admission)
+        in_flight = []
+
+        async def scrape():
+            async with pool.context():
+                in_flight.append(admission.in_flight)
+                await asyncio.sleep(0.8)
+            return "ok"
+
+        await admission.start()
+        try:
+            results = await asyncio.gather(scrape(), scrape(), scrape(), return_exceptions=True)
+        finally:
+            await admission.stop()
+        return results, in_flight, admission.stats()
+
+    results, in_flight, stats = asyncio.run(run())
+
+    assert results == ["ok", "ok", "ok"]
+    # Wartende Scrapes belegen weder Ticket noch Speicherreserve
+    assert in_flight == [1, 1, 1]
+    assert stats["deadline_kills"] == 0
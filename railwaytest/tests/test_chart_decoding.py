@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from benchmarks.fixtures import load_fixture
+from scrapers.extraction import (
+    _tick_value,
+    axis_fit_from_ticks,
+    chart_data_from_html,
+    conversion_factor_from_ticks,
+    decode_chart,
+)
+from scrapers.network_capture import series_parser, soundcloud_day_label
+
+CHART_URL = "http://fixture/?timewindow=DAYS_30&from=0&to=0&resolution=DAY"
+
+
+def ticks(values, bottom=290.0, px_per_value=0.5, labels=str):
+    return [[f"translate(0, {bottom - value * px_per_value})", labels(value)] for value in values]
+
+
+def min_max_factor(ticks):
+    """Bisherige Berechnung: Wertdifferenz / Pixeldifferenz zwischen kleinstem und größtem Tick."""
+    points = [(float(t.split(",")[1].rstrip(")")), float(text)) for t, text in ticks]
+    (y_min, v_min), (y_max, v_max) = min(points, key=lambda p: p[1]), max(points, key=lambda p: p[1])
+    return abs(v_max - v_min) / abs(y_min - y_max)
+
+
+@pytest.mark.parametrize("values, px_per_value", [
+    (range(0, 600, 100), 0.5),
+    (range(0, 2500, 500), 0.1),
+    ((0, 40, 80), 3.0),
+])
+def test_exact_linear_ticks_give_min_max_factor(values, px_per_value):
+    axis = ticks(values, px_per_value=px_per_value)
+    assert conversion_factor_from_ticks(axis) == pytest.approx(min_max_factor(axis))
+    assert conversion_factor_from_ticks(axis) == pytest.approx(1 / px_per_value)
+
+
+def test_axis_fit_maps_chart_bottom_to_zero():
+    slope, intercept = axis_fit_from_ticks(ticks(range(0, 600, 100)))
+    assert slope == pytest.approx(-2)
+    assert slope * 290 + intercept == pytest.approx(0)
+
+
+def test_single_misplaced_tick_barely_moves_factor():
+    axis = ticks(range(0, 1100, 100))
+    axis[5][0] = "translate(0, 45)"  # Tick 500 um 5 px verschoben (richtig: y=40)
+    assert conversion_factor_from_ticks(axis) == pytest.approx(2, rel=0.02)
+
+
+@pytest.mark.parametrize("text, value", [
+    ("500", 500), ("1,000", 1000), ("1.5K", 1500), ("2k", 2000), ("2M", 2000000), (" 0 ", 0), ("0.5", 0.5),
+])
+def test_tick_labels_parse(text, value):
+    assert _tick_value(text) == value
+
+
+@pytest.mark.parametrize("text", [None, "", "abc", "1.5G"])
+def test_unparsable_tick_labels(text):
+    assert _tick_value(text) is None
+
+
+def test_suffixed_ticks_give_same_factor_as_plain():
+    plain = ticks(range(0, 5000, 1000), px_per_value=0.05)
+    suffixed = ticks(range(0, 5000, 1000), px_per_value=0.05, labels=lambda v: f"{v / 1000:g}K")
+    assert conversion_factor_from_ticks(suffixed) == pytest.approx(conversion_factor_from_ticks(plain))
+
+
+@pytest.mark.parametrize("axis", [[], ticks([100]), [["translate(0, 10)", "a"], ["translate(0, 20)", "b"]]])
+def test_fallback_factor_without_usable_ticks(axis):
+    assert conversion_factor_from_ticks(axis) == 0.5
+
+
+def test_decode_chart_bars():
+    raw = {
+        "ticks": ticks(range(0, 600, 100)),
+        "x_axis_transform": "translate(0, 290)",
+        "bars": [
+            "transform: translate3d(0px, 240.0px, 0px);",
+            "transform: translate3d(18px, 90.0px, 0px);",
+            "",
+        ],
+        "labels": ["Mar 01", "Mar 02", "Mar 03"],
+    }
+    assert decode_chart(raw, CHART_URL) == (500, {"Mar 01": 100, "Mar 02": 400, "Mar 03": 0})
+
+
+def test_decoded_fixture_matches_insights_series():
+    decoded_total, decoded = decode_chart(chart_data_from_html(load_fixture("soundcloud_chart.html")), CHART_URL)
+    total, daily = series_parser(soundcloud_day_label)(json.loads(load_fixture("soundcloud_insights.json")))
+
+    assert decoded == daily
+    assert decoded_total == total == 6871
@@ -0,0 +1,60 @@
+import datetime
+
+from scrapers.incremental import mark_checked, plan_range, plan_spotify_urls
+from scrapers.timeseries_store import TimeSeriesStore
+
+TODAY = datetime.date(2025, 6, 30)
+
+
+def build_url(artist_id, from_date, to_date):
+    return f"https://artists.spotify.com/c/artist/{artist_id}/stats?fromDate={from_date}&toDate={to_date}"
+
+
+def make_store(tmp_path, days, gap=()):
+    """Store mit Tageswerten für die letzten days Tage bis TODAY, ohne die Tage in gap."""
+    store = TimeSeriesStore(str(tmp_path / "timeseries.sqlite3"))
+    points = {}
+    for i in range(days):
+        day = TODAY - datetime.timedelta(days=i)
+        if day not in gap:
+            points[day] = 100 + i
+    store.write_points("spotify", "artist", "streams", points)
+    return store
+
+
+def test_plan_range_requests_missing_day(tmp_path):
+    gap = TODAY - datetime.timedelta(days=100)
+    store = make_store(tmp_path, 365, gap={gap})
+    assert plan_range(store, "spotify", "artist", "streams", TODAY, settle_days=3) == gap
+
+
+def test_permanent_gap_is_not_requested_again_once_checked(tmp_path):
+    gap = TODAY - datetime.timedelta(days=100)
+    store = make_store(tmp_path, 365, gap={gap})
+    window_start = TODAY - datetime.timedelta(days=364)
+    store.mark_checked("spotify", "artist", "streams", window_start, TODAY)
+
+    # Nur noch die nicht abgeschlossenen letzten Tage
+    assert plan_range(store, "spotify", "artist", "streams", TODAY, settle_days=3) == TODAY - datetime.timedelta(days=2)
+
+
+def test_young_artist_gets_small_page_after_first_run(tmp_path):
+    store = make_store(tmp_path, 30)
+    urls = plan_spotify_urls(store, "artist", TODAY, build_url)
+    (timeframe, url), = urls.items()
+    assert f"fromDate={TODAY - datetime.timedelta(days=364)}" in url
+
+    # Der volle Lauf liefert nur die 30 Tage, die es gibt
+    results = {timeframe: {"total": 1, "daily": {"Jun 30": 1}}}
+    mark_checked(store, "artist", urls, results)
+
+    (url,) = plan_spotify_urls(store, "artist", TODAY, build_url).values()
+    assert f"fromDate={TODAY - datetime.timedelta(days=2)}" in url
+
+
+def test_failed_fetch_is_not_marked_checked(tmp_path):
+    store = make_store(tmp_path, 30)
+    urls = plan_spotify_urls(store, "artist", TODAY, build_url)
+    mark_checked(store, "artist", urls, {timeframe: {"total": 0, "daily": {}} for timeframe in urls})
+
+    assert store.checked_dates("spotify", "artist", "streams") == set()
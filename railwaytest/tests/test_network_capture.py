@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+from scrapers.network_capture import (
+    NetworkCapture,
+    series_parser,
+    soundcloud_day_label,
+    soundcloud_month_label,
+    spotify_day_label,
+)
+
+INSIGHTS_URL = "https://insights-api.soundcloud.com/v1/timeseries?metric=plays&resolution=DAY"
+TIMELINE_URL = "https://generic.wg.spotify.com/s4x-insights-api/v1/artist/abc/streams?aggregation=recording"
+LOCATIONS_URL = "https://generic.wg.spotify.com/s4x-insights-api/v1/artist/abc/locations"
+
+
+def insights_response(points):
+    return {"data": {"timeseries": [{"timestamp": f"{day}T00:00:00Z", "value": value} for day, value in points]}}
+
+
+def timeline_response(points):
+    return {"timelinePoint": [{"date": day, "num": value} for day, value in points]}
+
+
+# Längere Liste mit allgemeinen Schlüsseln (x/y), die die generische Suche statt der Tageswerte nehmen würde
+DECOY = {"topCities": [{"x": f"2025-03-{day:02d}", "y": 99} for day in range(1, 21)]}
+
+
+def test_month_labels_sum_daily_points():
+    data = insights_response([("2025-03-30", 5), ("2025-03-31", 7), ("2025-04-01", 11), ("2025-04-02", 13)])
+
+    total, monthly = series_parser(soundcloud_month_label, "soundcloud")(data, INSIGHTS_URL)
+
+    assert monthly == {"March 2025": 12, "April 2025": 24}
+    assert total == 36
+
+
+def test_day_labels_keep_one_value_per_day():
+    data = insights_response([("2025-03-30", 5), ("2025-03-31", 7)])
+
+    assert series_parser(soundcloud_day_label, "soundcloud")(data, INSIGHTS_URL) == (12, {"Mar 30": 5, "Mar 31": 7})
+
+
+def test_known_endpoint_wins_over_longer_generic_list():
+    data = {**timeline_response([("2025-03-01", 10), ("2025-03-02", 20)]), **DECOY}
+
+    assert series_parser(spotify_day_label, "spotify_artists")(data, TIMELINE_URL) == (
+        30, {"Mar 1, 2025": 10, "Mar 2, 2025": 20},
+    )
+
+
+def test_unknown_response_only_with_generic_search(capsys):
+    parse = series_parser(spotify_day_label, "spotify_artists")
+
+    assert parse.specific(DECOY, LOCATIONS_URL) is None
+    assert parse(DECOY, LOCATIONS_URL, generic=False) is None
+    total, daily = parse(DECOY, LOCATIONS_URL)
+    assert len(daily) == 20
+    assert "generischer Suche" in capsys.readouterr().out
+
+
+def test_capture_prefers_known_response_over_newer_decoy():
+    capture = NetworkCapture("spotify_artists")
+    capture.add(TIMELINE_URL, json.dumps(timeline_response([("2025-03-01", 10)])))
+    capture.add(LOCATIONS_URL, json.dumps(DECOY))
+
+    result = asyncio.run(capture.wait_for(series_parser(spotify_day_label, "spotify_artists"), timeout=1))
+
+    assert result == (10, {"Mar 1, 2025": 10})
+
+
+def test_capture_uses_generic_search_only_after_timeout():
+    capture = NetworkCapture("spotify_artists")
+    capture.add(LOCATIONS_URL, json.dumps(DECOY))
+    parse = series_parser(spotify_day_label, "spotify_artists")
+
+    assert asyncio.run(capture.wait_for(parse.specific, timeout=0.1)) is None
+    assert len(asyncio.run(capture.wait_for(parse, timeout=0.1))[1]) == 20
@@ -0,0 +1,32 @@
+import asyncio
+
+from scrapers import readiness
+
+
+class NodriverLikePage:
+    """Wertet nur die Ressourcen-Abfrage aus; falsy Ergebnisse kommen wie bei nodriver als None zurück."""
+
+    def __init__(self, resources):
+        self.resources = resources
+
+    async def evaluate(self, expression):
+        count = self.resources
+        value = str(count) if expression.startswith("String(") else count
+        return value or None
+
+
+def test_network_idle_accepts_page_without_resources():
+    page = NodriverLikePage(resources=0)
+
+    ok = asyncio.run(readiness.wait_for_network_idle(page, timeout=2, idle_for=0.1))
+
+    assert ok
+    assert readiness.wait_timings[-1]["seconds"] < 1
+
+
+def test_network_idle_times_out_when_evaluate_fails():
+    class BrokenPage:
+        async def evaluate(self, expression):
+            raise RuntimeError("Tab geschlossen")
+
+    assert not asyncio.run(readiness.wait_for_network_idle(BrokenPage(), timeout=0.3, idle_for=0.1))
@@ -0,0 +1,25 @@
+from nodriver import cdp
+
+from scrapers.session_store import _cookie_json
+
+SESSION_COOKIE = {
+    "name": "sp_dc", "value": "abc", "domain": ".spotify.com", "path": "/", "size": 8, "httpOnly": True,
+    "secure": True, "session": True, "priority": "Medium", "sourceScheme": "Secure", "sourcePort": 443,
+    "expires": -1, "sameSite": "Lax",
+}
+
+
+def test_session_cookie_round_trip_drops_negative_expires():
+    exported = _cookie_json(cdp.network.Cookie.from_json(SESSION_COOKIE).to_json())
+
+    param = cdp.network.CookieParam.from_json(exported)
+
+    assert "expires" not in exported
+    assert param.expires is None
+    assert (param.name, param.domain, param.secure) == ("sp_dc", ".spotify.com", True)
+
+
+def test_persistent_cookie_keeps_expires():
+    cookie = {**SESSION_COOKIE, "session": False, "expires": 1767225600.0}
+
+    assert cdp.network.CookieParam.from_json(_cookie_json(cookie)).expires == 1767225600.0
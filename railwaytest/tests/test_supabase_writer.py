@@ -0,0 +1,92 @@
+import asyncio
+import datetime
+
+import pytest
+
+from benchmarks.fake_postgrest import FakePostgrest
+from scrapers.supabase_writer import SupabaseWriter
+
+DAY = datetime.date(2025, 6, 1)
+
+
+def rows(count, artist="artist", value=1):
+    return [("spotify", artist, "streams", DAY + datetime.timedelta(days=i), value) for i in range(count)]
+
+
+@pytest.fixture
+def postgrest():
+    with FakePostgrest() as server:
+        yield server
+
+
+def writer_for(server, **options):
+    options.setdefault("retry_base", 0.001)
+    return SupabaseWriter(server.base_url, "fake-postgrest", **options)
+
+
+def test_batches_are_upserted_and_deduplicated(postgrest):
+    async def run():
+        async with writer_for(postgrest, batch_size=3, flush_interval=0.05) as writer:
+            await writer.put(rows(5, value=1))
+            await writer.put(rows(2, value=7))  # neuere Werte derselben Tage
+        return writer.stats()
+
+    stats = asyncio.run(run())
+
+    stored = {row["date"]: row["value"] for row in postgrest.rows("stream_points")}
+    assert len(stored) == 5
+    assert stored["2025-06-01"] == stored["2025-06-02"] == 7
+    assert stats["buffered"] == 0 and stats["failed_batches"] == 0
+
+
+def test_failed_requests_are_retried(postgrest):
+    postgrest.fail_rate = 0.5
+
+    async def run():
+        async with writer_for(postgrest, batch_size=2, max_retries=20) as writer:
+            await writer.put(rows(10))
+        return writer.stats()
+
+    stats = asyncio.run(run())
+
+    assert stats["retries"] == postgrest.failures > 0
+    assert stats["rows_written"] == 10
+    assert len(postgrest.rows("stream_points")) == 10
+
+
+def test_rows_stay_buffered_when_retries_are_exhausted(postgrest):
+    postgrest.fail_rate = 1.0
+
+    async def run():
+        writer = writer_for(postgrest, max_retries=1)
+        await writer.start()
+        await writer.put(rows(3))
+        ok = await writer.flush()
+        # Datenbank wieder erreichbar: der nächste Lauf schreibt die behaltenen Zeilen
+        postgrest.fail_rate = 0.0
+        await writer.stop()
+        return ok, writer.stats()
+
+    ok, stats = asyncio.run(run())
+
+    assert ok is False
+    assert stats["failed_batches"] == 1 and stats["retries"] == 1
+    assert stats["rows_written"] == 3 and stats["buffered"] == 0
+
+
+def test_put_waits_while_buffer_is_full(postgrest):
+    postgrest.latency = 0.05
+
+    async def run():
+        async with writer_for(postgrest, batch_size=2, max_buffer=4, flush_interval=0.01) as writer:
+            peak = 0
+            for i in range(6):
+                await writer.put(rows(2, artist=f"artist-{i}"))
+                peak = max(peak, writer.buffered)
+        return peak, writer.stats()
+
+    peak, stats = asyncio.run(run())
+
+    assert peak <= 4
+    assert stats["backpressure_waits"] > 0 and stats["backpressure_seconds"] > 0
+    assert len(postgrest.rows("stream_points")) == 12
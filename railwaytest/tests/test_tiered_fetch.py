@@ -0,0 +1,21 @@
+import asyncio
+
+from scrapers import tiered_fetch
+from scrapers.rate_limit import BlockedError
+
+URL = "https://open.spotify.com/artist/abc"
+
+
+def test_throttled_http_tier_falls_back_to_browser(monkeypatch):
+    def throttled(url):
+        raise BlockedError("HTTP 429", url, retry_after=30)
+
+    monkeypatch.setattr(tiered_fetch, "fetch_html", throttled)
+
+    assert asyncio.run(tiered_fetch.fetch_artist_http(URL, "abc")) is None
+
+
+def test_incomplete_http_page_falls_back_to_browser(monkeypatch):
+    monkeypatch.setattr(tiered_fetch, "fetch_html", lambda url: "<html><body>Spotify</body></html>")
+
+    assert asyncio.run(tiered_fetch.fetch_artist_http(URL, "abc")) is None